@@ -0,0 +1,156 @@
+"""
+Inference result cache for the AI stages.
+
+Results are keyed by (model id, task, hash of the normalized input), so a
+verbatim repost, a re-scrape that only touched metadata, or a backlog
+reprocessed after a deploy costs a lookup instead of a model call. A
+different model id (or task version) misses, which is what a model upgrade
+needs.
+
+Two tiers: a size-bounded in-process LRU in front of a shared, persistent
+Django cache (``AI_CACHE_ALIAS``, Redis by default, entries kept for
+``AI_CACHE_TIMEOUT``). Hits per tier and misses are counted per process and
+in the shared cache; see ``stats()`` and the ``ai_cache_stats`` command.
+"""
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Sequence
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+INVISIBLE = re.compile('[\u200b\u200c\u200d\u2060\ufeff]')
+
+# Every cache created in this process, for stats()
+registry: Dict[str, 'InferenceCache'] = {}
+
+
+def normalize(text: str) -> str:
+    """Canonical form of an input: NFKC, no invisible characters, single spaces."""
+    return ' '.join(INVISIBLE.sub('', unicodedata.normalize('NFKC', text)).split())
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize(text).encode('utf-8')).hexdigest()
+
+
+class InferenceCache:
+    """Cache of one task's results for one model."""
+
+    def __init__(self, model_id: str, task: str, max_local_entries: int = 2048):
+        self.model_id = model_id
+        self.task = task
+        self.prefix = f'ai:{task}:{model_id}'
+        self.max_local_entries = max_local_entries
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.counts = Counter()
+        registry[self.prefix] = self
+
+    def shared(self):
+        return caches[settings.AI_CACHE_ALIAS]
+
+    def key(self, text: str) -> str:
+        return f'{self.prefix}:{content_hash(text)}'
+
+    def _get_local(self, key):
+        with self._lock:
+            if key not in self._local:
+                return None
+            self._local.move_to_end(key)
+            return self._local[key]
+
+    def _set_local(self, key, value):
+        with self._lock:
+            self._local[key] = value
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def _count(self, **counts):
+        counts = {name: n for name, n in counts.items() if n}
+        self.counts.update(counts)
+        try:
+            shared = self.shared()
+            for name, n in counts.items():
+                key = f'{self.prefix}:stats:{name}'
+                shared.add(key, 0, timeout=None)
+                shared.incr(key, n)
+        except Exception as e:
+            logger.debug(f"Could not record {self.prefix} stats: {e}")
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Cached results for cache keys (see key()); missing keys are absent."""
+        keys = set(keys)
+        found = {}
+        for key in keys:
+            value = self._get_local(key)
+            if value is not None:
+                found[key] = value
+        local_hits = len(found)
+
+        missing = [key for key in keys if key not in found]
+        shared_hits = {}
+        if missing:
+            try:
+                shared_hits = self.shared().get_many(missing)
+            except Exception as e:
+                logger.warning(f"Inference cache unavailable: {e}")
+        for key, value in shared_hits.items():
+            self._set_local(key, value)
+        found.update(shared_hits)
+
+        self._count(local_hits=local_hits, shared_hits=len(shared_hits), misses=len(keys) - len(found))
+        return found
+
+    def set_many(self, results: Dict[str, Any]):
+        """Store results by cache key in both tiers."""
+        for key, value in results.items():
+            self._set_local(key, value)
+        try:
+            self.shared().set_many(results, timeout=settings.AI_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Inference cache unavailable: {e}")
+
+    def map(self, texts: Sequence[str], compute: Callable[[List[str]], List[Any]]) -> List[Any]:
+        """
+        Results for texts, in order. compute is called once, with the
+        distinct texts that are not cached, and must return their results
+        in the same order.
+        """
+        keys = [self.key(text) for text in texts]
+        results = self.get_many(keys)
+
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in results:
+                pending.setdefault(key, text)
+        if pending:
+            computed = dict(zip(pending, compute(list(pending.values()))))
+            self.set_many(computed)
+            results.update(computed)
+        return [results[key] for key in keys]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counts across all processes (since the counters were created)."""
+        names = ('local_hits', 'shared_hits', 'misses')
+        try:
+            values = self.shared().get_many([f'{self.prefix}:stats:{name}' for name in names])
+        except Exception:
+            values = {}
+        return {name: values.get(f'{self.prefix}:stats:{name}', 0) for name in names}
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """Shared hit/miss counts for every inference cache known to this process."""
+    return {prefix: cache.stats() for prefix, cache in registry.items()}
@@ -0,0 +1,305 @@
+"""
+Claim matching for fact-checks.
+
+Every checked claim is embedded with a multilingual sentence encoder and
+stored as one row of a compact matrix on disk (int8 with a per-row scale,
+or float32). The matrix is memory-mapped, so every process shares one copy
+in the page cache, and a query is a vectorized dot product over it: a few
+milliseconds for tens of thousands of claims.
+
+On-disk layout, in the index directory::
+
+    meta.json            model id, dimension, dtype and the current data file
+    claims-<gen>.bin     append-only records: (claim id, scale, vector)
+    .lock                flocked by writers
+
+New and edited claims are appended; the latest row for an id wins, and a
+row with scale 0 is a tombstone for a deleted claim. ``ClaimIndex.build``
+writes a compacted data file and then swaps ``meta.json`` in one rename, so
+readers never see a half-written index; they reopen when it changes.
+Builds and appends hold the directory lock, so an append never lands in a
+data file a concurrent build is replacing, and rows appended while a build
+was embedding its snapshot are carried over into the new file.
+"""
+import fcntl
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cache import InferenceCache
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.getenv('FACT_EMBEDDING_MODEL', 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2')
+EMBEDDING_BATCH_SIZE = int(os.getenv('FACT_EMBEDDING_BATCH_SIZE', 32))
+SEARCH_CHUNK_ROWS = 1024
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+')
+MIN_CLAIM_WORDS = 5
+
+
+def record_dtype(dim: int, dtype: str) -> np.dtype:
+    return np.dtype([('id', '<i8'), ('scale', '<f4'), ('vector', dtype, (dim,))])
+
+
+def quantize(vectors: np.ndarray, dtype: str):
+    """(stored vectors, per-row scales) for float32 input rows."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == 'float32':
+        return vectors, np.ones(len(vectors), dtype=np.float32)
+    peaks = np.abs(vectors).max(axis=1)
+    scales = np.where(peaks > 0, peaks / 127, 1).astype(np.float32)
+    return np.round(vectors / scales[:, None]).astype(np.int8), scales
+
+
+@contextmanager
+def directory_lock(directory: str):
+    """Exclusive flock on the index directory's lock file, across processes."""
+    with open(os.path.join(directory, '.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def split_claims(text: str) -> List[str]:
+    """Sentences of a text long enough to carry a checkable claim."""
+    sentences = (' '.join(s.split()) for s in SENTENCE_PATTERN.split(text or ''))
+    return [s for s in sentences if len(s.split()) >= MIN_CLAIM_WORDS]
+
+
+class ClaimIndex:
+    """Memory-mapped matrix of claim embeddings."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.meta_path = os.path.join(directory, 'meta.json')
+        self._open_meta()
+        # (records, live, data file size), swapped as one so readers never mix two maps
+        self._state = (None, None, -1)
+        self._lock = threading.Lock()
+
+    def _open_meta(self):
+        with open(self.meta_path, encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.meta_mtime = os.path.getmtime(self.meta_path)
+        self.model_id = self.meta['model']
+        self.dim = self.meta['dim']
+        self.dtype = record_dtype(self.dim, self.meta['dtype'])
+        self.data_path = os.path.join(self.directory, self.meta['data'])
+
+    def position(self) -> Tuple[str, int]:
+        """(data file, size) to pass as ``build(since=...)`` before reading the claims to rebuild from."""
+        return self.meta['data'], os.path.getsize(self.data_path)
+
+    @classmethod
+    def build(cls, directory: str, model_id: str, ids: Sequence[int], vectors: np.ndarray,
+              dtype: str = 'int8', dim: Optional[int] = None,
+              since: Optional[Tuple[str, int]] = None) -> 'ClaimIndex':
+        """
+        Write a fresh index (replacing any existing one) and open it. dim is
+        only needed when there are no vectors yet. With ``since`` (from
+        ``position()``), rows appended to the old index after that point
+        are kept on top of the new one.
+        """
+        os.makedirs(directory, exist_ok=True)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.size:
+            dim = vectors.shape[1]
+        if not dim:
+            raise ValueError('dim is required to build an empty index')
+        records = cls._encode(ids, vectors.reshape(-1, dim), dim, dtype)
+        data_name = f'claims-{time.time_ns()}.bin'
+        meta_path = os.path.join(directory, 'meta.json')
+
+        with directory_lock(directory):
+            previous = None
+            if os.path.exists(meta_path):
+                with open(meta_path, encoding='utf-8') as f:
+                    previous = json.load(f)
+            with open(os.path.join(directory, data_name), 'wb') as f:
+                f.write(records.tobytes())
+                if since and previous and since[0] == previous['data'] \
+                        and (previous['model'], previous['dim'], previous['dtype']) == (model_id, dim, dtype):
+                    with open(os.path.join(directory, previous['data']), 'rb') as appended:
+                        appended.seek(since[1])
+                        f.write(appended.read())
+
+            with open(f'{meta_path}.part', 'w', encoding='utf-8') as f:
+                json.dump({'model': model_id, 'dim': dim, 'dtype': dtype, 'data': data_name}, f)
+            os.replace(f'{meta_path}.part', meta_path)
+            if previous and previous['data'] != data_name:
+                # Open maps keep the old file's pages until their readers reopen
+                try:
+                    os.remove(os.path.join(directory, previous['data']))
+                except OSError:
+                    pass
+        return cls(directory)
+
+    @staticmethod
+    def _encode(ids, vectors, dim, dtype) -> np.ndarray:
+        stored, scales = quantize(vectors, dtype)
+        records = np.zeros(len(ids), dtype=record_dtype(dim, dtype))
+        records['id'] = ids
+        records['scale'] = scales
+        records['vector'] = stored
+        return records
+
+    def is_stale(self) -> bool:
+        """Whether another process rebuilt the index since it was opened."""
+        try:
+            return os.path.getmtime(self.meta_path) != self.meta_mtime
+        except OSError:
+            return True
+
+    def append(self, ids: Sequence[int], vectors: Optional[np.ndarray] = None):
+        """
+        Add or replace claims; ids without vectors (None) are removed.
+        Safe to call from several processes at once, and during a rebuild.
+        Raises ValueError if the index was rebuilt for another model.
+        """
+        with directory_lock(self.directory):
+            if self.is_stale():
+                # Rebuilt since we opened it: write to the new data file
+                model_id, dim = self.model_id, self.dim
+                with self._lock:
+                    self._open_meta()
+                    self._state = (None, None, -1)
+                if (self.model_id, self.dim) != (model_id, dim):
+                    raise ValueError(f'The claim index was rebuilt for {self.model_id}')
+            if vectors is None:
+                records = np.zeros(len(ids), dtype=self.dtype)
+                records['id'] = ids
+            else:
+                records = self._encode(ids, np.asarray(vectors, dtype=np.float32), self.dim, self.meta['dtype'])
+            with open(self.data_path, 'ab') as f:
+                f.write(records.tobytes())
+
+    def _refresh(self):
+        """
+        Remap the data file if it changed, and recompute which rows are
+        live. Returns the (records, live, size) state to read from.
+        """
+        with self._lock:
+            records, live, size = self._state
+            data_path = self.data_path
+            try:
+                current = os.path.getsize(data_path)
+            except FileNotFoundError:
+                return self._state  # replaced by a rebuild; the open map stays readable
+            if current == size:
+                return self._state
+            count = current // self.dtype.itemsize
+            if count:
+                records = np.memmap(data_path, dtype=self.dtype, mode='r', shape=(count,))
+                ids = np.asarray(records['id'])
+                # The last row written for an id is the live one; scale 0 marks a deletion
+                _, last_from_end = np.unique(ids[::-1], return_index=True)
+                live = np.zeros(count, dtype=bool)
+                live[count - 1 - last_from_end] = True
+                live &= np.asarray(records['scale']) > 0
+            else:
+                records, live = None, None
+            self._state = (records, live, current)
+            return self._state
+
+    def __len__(self):
+        _, live, _ = self._refresh()
+        return int(live.sum()) if live is not None else 0
+
+    def search(self, queries: np.ndarray, k: int = 5, min_score: float = 0.0) -> List[List[Tuple[int, float]]]:
+        """
+        Top k (claim id, cosine similarity) per query row, best first.
+        Queries and stored vectors are unit length.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        records, live, _ = self._refresh()
+        if records is None:
+            return [[] for _ in queries]
+
+        count = len(records)
+        vectors, scales = records['vector'], records['scale']
+        scores = np.empty((count, len(queries)), dtype=np.float32)
+        # Dequantize a cache-sized block at a time into one reused buffer;
+        # converting the whole matrix at once costs more than the product
+        buffer = np.empty((min(SEARCH_CHUNK_ROWS, count), self.dim), dtype=np.float32)
+        for start in range(0, count, SEARCH_CHUNK_ROWS):
+            stop = min(start + SEARCH_CHUNK_ROWS, count)
+            block = buffer[:stop - start]
+            np.copyto(block, vectors[start:stop], casting='unsafe')
+            np.matmul(block, queries.T, out=scores[start:stop])
+        scores *= scales[:, None]
+        scores[~live] = -np.inf
+        scores = scores.T
+
+        k = min(k, count)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            ranked = candidates[np.argsort(-row[candidates])]
+            results.append([
+                (int(records[i]['id']), float(row[i])) for i in ranked if row[i] >= min_score
+            ])
+        return results
+
+
+class Embedder:
+    """Mean-pooled sentence embeddings from a transformers encoder, cached by content."""
+
+    def __init__(self, model_id: str = EMBEDDING_MODEL, batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.model_id = model_id
+        self.batch_size = batch_size
+        self.cache = InferenceCache(model_id, 'embed')
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                from transformers import AutoModel, AutoTokenizer
+
+                logger.info(f"Loading embedding model {self.model_id}")
+                self._tokenizer = AutoTokenizer.from_pretrained(self.model_id)
+                self._model = AutoModel.from_pretrained(self.model_id).eval()
+        return self._tokenizer, self._model
+
+    def _compute(self, texts: List[str]) -> List[np.ndarray]:
+        import torch
+
+        tokenizer, model = self._load()
+        # Sorted by length so each batch pads as little as possible
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        by_index = {}
+        for start in range(0, len(order), self.batch_size):
+            batch = [texts[i] for i in order[start:start + self.batch_size]]
+            encoded = tokenizer(batch, padding=True, truncation=True, max_length=256, return_tensors='pt')
+            with torch.inference_mode():
+                hidden = model(**encoded).last_hidden_state
+            mask = encoded['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+            pooled = ((hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)).numpy()
+            pooled /= np.linalg.norm(pooled, axis=1, keepdims=True).clip(min=1e-12)
+            for i, vector in zip(order[start:start + self.batch_size], pooled):
+                by_index[i] = vector.astype(np.float32)
+        return [by_index[i] for i in range(len(texts))]
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Unit-length float32 embeddings, one row per text."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack(self.cache.map(list(texts), self._compute))
+
+
+_embedders: Dict[str, Embedder] = {}
+
+
+def get_embedder(model_id: str = EMBEDDING_MODEL) -> Embedder:
+    if model_id not in _embedders:
+        _embedders[model_id] = Embedder(model_id)
+    return _embedders[model_id]
@@ -0,0 +1,232 @@
+"""
+Batched sentiment scoring and rollups for scraped social items.
+
+Item texts are scored in length-bucketed batches by one transformers
+text-classification pipeline per process, and scores are cached by content
+(core.ai.cache), so reposts cost a lookup. A score is the polarity in
+[-1, 1]: P(positive) - P(negative).
+
+Scores are not kept per item. ``rollup`` groups them by hour, county and
+topic with NumPy and returns one row of additive sums per group (item
+count, score sum, engagement-weighted sums, positive/negative counts), so
+rollups from separate batches merge by adding and a mean is one division.
+Every item also counts towards its county's all-topics row (topic '').
+
+An item weighs 1 + log1p(weighted engagement), so a post shared a thousand
+times moves the weighted mean more than one nobody saw, without a single
+viral post drowning the rest.
+
+Settings (environment)::
+
+    SENTIMENT_MODEL         Hugging Face model id
+    SENTIMENT_BATCH_SIZE    texts per inference batch
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .cache import InferenceCache
+from .summarizer import length_buckets
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = os.getenv('SENTIMENT_MODEL', 'cardiffnlp/twitter-xlm-roberta-base-sentiment')
+BATCH_SIZE = int(os.getenv('SENTIMENT_BATCH_SIZE', 32))
+MAX_TOKENS = 256
+BUCKET_SECONDS = 3600
+# Scores beyond these count as positive / negative items
+POSITIVE_THRESHOLD = 0.25
+NEGATIVE_THRESHOLD = -0.25
+
+# Labels of the common sentiment heads; LABEL_n for models without names
+LABEL_POLARITY = {
+    'negative': -1.0, 'neutral': 0.0, 'positive': 1.0,
+    'label_0': -1.0, 'label_1': 0.0, 'label_2': 1.0,
+}
+
+# Relative worth of each engagement metric the scrapers report
+ENGAGEMENT_WEIGHTS = {
+    'likes': 1.0,
+    'upvotes': 1.0,
+    'comments': 2.0,
+    'retweets': 3.0,
+    'shares': 3.0,
+    'forwards': 3.0,
+    'views': 0.01,
+}
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+CACHE = InferenceCache(MODEL_NAME, 'sentiment')
+
+
+class Rollup(NamedTuple):
+    bucket: datetime
+    county: str
+    topic: str
+    item_count: int
+    score_sum: float
+    weighted_score_sum: float
+    weight_sum: float
+    positive_count: int
+    negative_count: int
+
+
+def get_pipeline():
+    """This process's sentiment pipeline, loaded on first use."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            from transformers import pipeline
+
+            logger.info(f"Loading sentiment model {MODEL_NAME}")
+            _pipeline = pipeline('text-classification', model=MODEL_NAME, top_k=None, device=-1)
+        return _pipeline
+
+
+def polarity(labels: Sequence[Dict]) -> float:
+    """Polarity in [-1, 1] from one text's label probabilities."""
+    return float(sum(label['score'] * LABEL_POLARITY.get(label['label'].lower(), 0.0) for label in labels))
+
+
+def classify(texts: Sequence[str], batch_size: int = BATCH_SIZE, pipe: Optional[Callable] = None) -> List[float]:
+    """Run the model over texts in length-bucketed batches; polarities in order."""
+    pipe = pipe or get_pipeline()
+    scores: List[float] = [0.0] * len(texts)
+    for bucket in length_buckets([len(text) for text in texts], batch_size):
+        outputs = pipe([texts[i] for i in bucket], batch_size=len(bucket), truncation=True, max_length=MAX_TOKENS)
+        for i, labels in zip(bucket, outputs):
+            scores[i] = polarity(labels)
+    return scores
+
+
+def score(texts: Sequence[str], batch_size: int = BATCH_SIZE, pipe: Optional[Callable] = None,
+          cache: Optional[InferenceCache] = CACHE) -> np.ndarray:
+    """Polarity per text as float32. Pass cache=None to always run the model."""
+    if not texts:
+        return np.zeros(0, dtype=np.float32)
+
+    def compute(batch):
+        return classify(batch, batch_size, pipe)
+
+    texts = list(texts)
+    return np.asarray(cache.map(texts, compute) if cache is not None else compute(texts), dtype=np.float32)
+
+
+def engagement_weights(metrics: Sequence[Optional[Dict]], weights: Dict[str, float] = ENGAGEMENT_WEIGHTS) -> np.ndarray:
+    """1 + log1p(weighted engagement) per item; items without metrics weigh 1."""
+    names = list(weights)
+    counts = np.zeros((len(metrics), len(names)), dtype=np.float64)
+    for row, item_metrics in enumerate(metrics):
+        for column, name in enumerate(names):
+            value = (item_metrics or {}).get(name)
+            if isinstance(value, (int, float)) and value > 0:
+                counts[row, column] = value
+    return 1 + np.log1p(counts @ np.array([weights[name] for name in names]))
+
+
+def timestamp(value) -> Optional[float]:
+    """Epoch seconds of a datetime or ISO string (naive means UTC), or None."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def aggregate(times: np.ndarray, counties: Sequence[str], topics: Sequence[str], scores: np.ndarray,
+              weights: np.ndarray, bucket_seconds: int = BUCKET_SECONDS) -> List[Rollup]:
+    """Sum rows into one Rollup per (time bucket, county, topic)."""
+    if not len(scores):
+        return []
+    buckets = (np.asarray(times, dtype=np.int64) // bucket_seconds) * bucket_seconds
+    bucket_values, bucket_codes = np.unique(buckets, return_inverse=True)
+    county_values, county_codes = np.unique(np.asarray(counties, dtype=object).astype(str), return_inverse=True)
+    topic_values, topic_codes = np.unique(np.asarray(topics, dtype=object).astype(str), return_inverse=True)
+
+    keys = (bucket_codes * len(county_values) + county_codes) * len(topic_values) + topic_codes
+    groups, group_of = np.unique(keys, return_inverse=True)
+    size = len(groups)
+    scores = np.asarray(scores, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    counts = np.bincount(group_of, minlength=size)
+    score_sums = np.bincount(group_of, scores, minlength=size)
+    weighted_sums = np.bincount(group_of, scores * weights, minlength=size)
+    weight_sums = np.bincount(group_of, weights, minlength=size)
+    positives = np.bincount(group_of, scores > POSITIVE_THRESHOLD, minlength=size)
+    negatives = np.bincount(group_of, scores < NEGATIVE_THRESHOLD, minlength=size)
+
+    group_topics = groups % len(topic_values)
+    group_counties = (groups // len(topic_values)) % len(county_values)
+    group_buckets = groups // (len(topic_values) * len(county_values))
+    return [
+        Rollup(
+            bucket=datetime.fromtimestamp(int(bucket_values[group_buckets[g]]), tz=timezone.utc),
+            county=str(county_values[group_counties[g]]),
+            topic=str(topic_values[group_topics[g]]),
+            item_count=int(counts[g]),
+            score_sum=float(score_sums[g]),
+            weighted_score_sum=float(weighted_sums[g]),
+            weight_sum=float(weight_sums[g]),
+            positive_count=int(positives[g]),
+            negative_count=int(negatives[g]),
+        )
+        for g in range(size)
+    ]
+
+
+def merge(rollups: Sequence[Rollup]) -> List[Rollup]:
+    """Add up rollups that share a (bucket, county, topic) key."""
+    merged: Dict[tuple, Rollup] = {}
+    for row in rollups:
+        key = (row.bucket, row.county, row.topic)
+        if key in merged:
+            row = Rollup(*key, *(a + b for a, b in zip(merged[key][3:], row[3:])))
+        merged[key] = row
+    return list(merged.values())
+
+
+def item_text(item: Dict) -> str:
+    return ' '.join((item.get('content') or item.get('title') or '').split())
+
+
+def item_topics(item: Dict) -> List[str]:
+    # Editorial categories, else the tags of core.scrapers.tagging
+    topics = item.get('categories') or item.get('topics') or ([item['topic']] if item.get('topic') else [])
+    return sorted({str(topic).strip().lower() for topic in topics if str(topic).strip()})
+
+
+def rollup(items: Sequence[Dict], scores: np.ndarray, now: Optional[datetime] = None,
+           bucket_seconds: int = BUCKET_SECONDS) -> List[Rollup]:
+    """
+    Rollups for scored items (scores in item order). Undated items fall in
+    the bucket of now; an item with several topics counts once per topic.
+    """
+    if not items:
+        return []
+    fallback = (now or datetime.now(timezone.utc)).timestamp()
+    times = np.array([timestamp(item.get('published_date')) or fallback for item in items])
+    counties = [str(item.get('county') or '') for item in items]
+    weights = engagement_weights([item.get('engagement_metrics') for item in items])
+
+    # One row per item for the all-topics rollup, plus one per item topic
+    rows, topics = list(range(len(items))), [''] * len(items)
+    for i, item in enumerate(items):
+        for topic in item_topics(item):
+            rows.append(i)
+            topics.append(topic)
+    rows = np.array(rows)
+    return aggregate(
+        times[rows], [counties[i] for i in rows], topics,
+        np.asarray(scores)[rows], weights[rows], bucket_seconds,
+    )
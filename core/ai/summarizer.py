@@ -0,0 +1,117 @@
+"""
+Batched abstractive summarization.
+
+One transformers summarization pipeline is loaded per process and reused
+(workers load it at start-up, see core.tasks), and texts are summarized in
+batches. Batches are built from texts of similar length, so little of each
+batch is padding: a 60-word post is not padded out to the 900 words of the
+article next to it.
+
+Texts too short to be worth a model call are shortened by truncation, as
+the forum did before. Model outputs are cached by content (core.ai.cache),
+so reposts and unchanged articles are never summarized twice.
+
+Settings (environment)::
+
+    SUMMARIZER_MODEL         Hugging Face model id
+    SUMMARIZER_BATCH_SIZE    texts per inference batch
+    SUMMARIZER_THREADS       torch threads per process (default: torch's own)
+"""
+import logging
+import os
+import threading
+from typing import Callable, List, Optional, Sequence
+
+from django.utils.text import Truncator
+
+from .cache import InferenceCache
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = os.getenv('SUMMARIZER_MODEL', 'sshleifer/distilbart-cnn-12-6')
+BATCH_SIZE = int(os.getenv('SUMMARIZER_BATCH_SIZE', 8))
+SUMMARY_MIN_TOKENS = 30
+SUMMARY_MAX_TOKENS = 130
+# Below this many words a text is its own summary, truncated
+MIN_WORDS = 60
+TRUNCATE_WORDS = 30
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+# Generation settings are part of the task: changing them must not reuse old summaries
+CACHE = InferenceCache(MODEL_NAME, f'summarize:{SUMMARY_MIN_TOKENS}-{SUMMARY_MAX_TOKENS}')
+
+
+def get_pipeline():
+    """This process's summarization pipeline, loaded on first use."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            import torch
+            from transformers import pipeline
+
+            if os.getenv('SUMMARIZER_THREADS'):
+                torch.set_num_threads(int(os.getenv('SUMMARIZER_THREADS')))
+            logger.info(f"Loading summarization model {MODEL_NAME}")
+            _pipeline = pipeline('summarization', model=MODEL_NAME, device=-1)
+        return _pipeline
+
+
+def preload():
+    """Load the model now rather than on the first task."""
+    try:
+        get_pipeline()
+    except ImportError as e:
+        logger.warning(f"Summarization model not preloaded: {e}")
+
+
+def length_buckets(lengths: Sequence[int], batch_size: int) -> List[List[int]]:
+    """
+    Group indexes into batches of similar length (longest first, so an
+    out-of-memory batch shows up on the first call, not the last).
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def generate(texts: Sequence[str], batch_size: int = BATCH_SIZE, pipe: Optional[Callable] = None) -> List[str]:
+    """Run the model over texts in length-bucketed batches; results in order."""
+    pipe = pipe or get_pipeline()
+    summaries: List[Optional[str]] = [None] * len(texts)
+    for bucket in length_buckets([len(text.split()) for text in texts], batch_size):
+        batch = [texts[i] for i in bucket]
+        outputs = pipe(
+            batch,
+            batch_size=len(batch),
+            truncation=True,
+            max_length=SUMMARY_MAX_TOKENS,
+            min_length=SUMMARY_MIN_TOKENS,
+            do_sample=False,
+        )
+        for i, output in zip(bucket, outputs):
+            summaries[i] = output['summary_text'].strip()
+    return summaries
+
+
+def summarize(texts: Sequence[str], batch_size: int = BATCH_SIZE, pipe: Optional[Callable] = None,
+              cache: Optional[InferenceCache] = CACHE) -> List[str]:
+    """Summaries for texts, in order. Pass cache=None to always run the model."""
+    summaries: List[Optional[str]] = [None] * len(texts)
+    long_texts = []
+    for i, text in enumerate(texts):
+        if len(text.split()) < MIN_WORDS:
+            summaries[i] = Truncator(text).words(TRUNCATE_WORDS)
+        else:
+            long_texts.append(i)
+    if not long_texts:
+        return summaries
+
+    def compute(batch):
+        return generate(batch, batch_size, pipe)
+
+    batch = [texts[i] for i in long_texts]
+    results = cache.map(batch, compute) if cache is not None else compute(batch)
+    for i, summary in zip(long_texts, results):
+        summaries[i] = summary
+    return summaries
@@ -0,0 +1,192 @@
+"""
+Response cache for anonymous read-only API endpoints.
+
+Responses are cached per normalized URL in Redis (the ``default`` cache)
+with a small in-process LRU (the ``local`` cache) in front of it.
+
+Invalidation is generational: each view depends on one or more namespaces
+(``news``, ``categories``, ...) whose generation numbers are bumped by model
+signals. An entry cached under an older generation is not dropped but
+treated as stale, and stale entries are served while exactly one request
+(holding a short lock) recomputes them. Neither an invalidation nor an
+expiry on the front page can stampede the database.
+"""
+import functools
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+IGNORED_PARAM_PREFIXES = ('utm_', '_')
+
+
+def shared_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def local_cache():
+    return caches[settings.RESPONSE_CACHE_LOCAL_ALIAS]
+
+
+def generation_key(namespace):
+    return f'respgen:{namespace}'
+
+
+def get_generations(namespaces):
+    """Return the current generation of each namespace as a tuple."""
+    keys = [generation_key(ns) for ns in namespaces]
+    current = shared_cache().get_many(keys)
+    return tuple(current.get(key, 0) for key in keys)
+
+
+def invalidate(*namespaces):
+    """Mark every cached response depending on these namespaces as stale."""
+    def bump():
+        cache = shared_cache()
+        for namespace in namespaces:
+            key = generation_key(namespace)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, 1, timeout=None)
+            except Exception as e:
+                logger.warning(f"Could not invalidate response cache {namespace}: {e}")
+    transaction.on_commit(bump)
+
+
+def response_cache_key(request):
+    """Key a request by host, path and its sorted, de-noised query params."""
+    params = sorted(
+        (key, value)
+        for key in request.query_params
+        if not key.startswith(IGNORED_PARAM_PREFIXES)
+        for value in sorted(request.query_params.getlist(key))
+        if value != ''
+    )
+    raw = f"{request.get_host()}|{request.path}|{params}"
+    return f"resp:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def is_cacheable(request):
+    return request.method == 'GET' and not request.user.is_authenticated
+
+
+def cached_response(request, namespaces, compute):
+    """
+    Return a cached Response for request, calling ``compute()`` to build it
+    on a miss. Only anonymous GETs are cached.
+    """
+    if not is_cacheable(request):
+        return compute()
+
+    key = response_cache_key(request)
+    try:
+        generations = get_generations(namespaces)
+        entry = local_cache().get(key)
+        if not _is_fresh(entry, generations):
+            entry = shared_cache().get(key) or entry
+            if _is_fresh(entry, generations):
+                local_cache().set(key, entry, timeout=settings.RESPONSE_CACHE_LOCAL_TTL)
+    except Exception as e:
+        logger.warning(f"Response cache unavailable: {e}")
+        return compute()
+
+    if _is_fresh(entry, generations):
+        return _replay(entry, 'HIT')
+
+    # Only one request recomputes; everybody else gets the stale copy
+    lock_key = f'{key}:lock'
+    try:
+        locked = shared_cache().add(lock_key, 1, timeout=settings.RESPONSE_CACHE_LOCK_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Response cache unavailable: {e}")
+        return compute()
+    if not locked:
+        if entry is not None:
+            return _replay(entry, 'STALE')
+        entry = _wait_for_entry(key)
+        if entry is not None:
+            return _replay(entry, 'HIT')
+        return compute()
+
+    try:
+        response = compute()
+        if response.status_code == 200:
+            entry = {
+                'data': response.data,
+                'status': response.status_code,
+                'generation': generations,
+                'fresh_until': time.time() + settings.RESPONSE_CACHE_TTL,
+            }
+            try:
+                shared_cache().set(key, entry, timeout=settings.RESPONSE_CACHE_TTL + settings.RESPONSE_CACHE_STALE_TTL)
+                local_cache().set(key, entry, timeout=settings.RESPONSE_CACHE_LOCAL_TTL)
+            except Exception as e:
+                logger.warning(f"Could not store cached response: {e}")
+        response['X-Cache'] = 'MISS'
+        return response
+    finally:
+        try:
+            shared_cache().delete(lock_key)
+        except Exception as e:
+            # The lock expires on its own after RESPONSE_CACHE_LOCK_TIMEOUT
+            logger.warning(f"Could not release response cache lock: {e}")
+
+
+def _is_fresh(entry, generations):
+    return entry is not None and entry['generation'] == generations and entry['fresh_until'] > time.time()
+
+
+def _wait_for_entry(key):
+    """Cold miss while another request computes: poll briefly for its result."""
+    deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_TIMEOUT / 10
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        try:
+            entry = shared_cache().get(key)
+        except Exception as e:
+            logger.warning(f"Response cache unavailable: {e}")
+            return None
+        if entry is not None:
+            return entry
+    return None
+
+
+def _replay(entry, state):
+    response = Response(entry['data'], status=entry['status'])
+    response['X-Cache'] = state
+    return response
+
+
+def cache_anonymous_response(*namespaces):
+    """Decorate a viewset action so anonymous GETs are served from the response cache."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, request, *args, **kwargs):
+            return cached_response(request, namespaces, lambda: func(self, request, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+class AnonymousResponseCacheMixin:
+    """Serve anonymous list/retrieve requests of a read-only viewset from the response cache."""
+
+    cache_namespaces = ()
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            request, self.cache_namespaces,
+            lambda: super(AnonymousResponseCacheMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            request, self.cache_namespaces,
+            lambda: super(AnonymousResponseCacheMixin, self).retrieve(request, *args, **kwargs),
+        )
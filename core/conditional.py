@@ -0,0 +1,123 @@
+"""
+Conditional GET (ETag / Last-Modified) for detail endpoints.
+
+Views compute a few cheap version columns for the object (its updated_at,
+plus whatever related rows change the rendered body) in one query. If the
+client's If-None-Match / If-Modified-Since still matches, a 304 is returned
+without loading or serializing the object at all.
+
+Last-Modified is only sent (and If-Modified-Since only honoured) when every
+version column is a timestamp: counts and viewer flags change without any
+timestamp moving, so for those versions the ETag is the only validator.
+
+Related rows the body renders are covered in two ways. Adding or removing
+them (categories, tags) bumps the object's updated_at (``touch_owners``, an
+m2m_changed receiver), and renaming one moves the response cache generation
+of its namespace, which views add to their version (``relation_versions``).
+"""
+import hashlib
+import logging
+
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_generations
+
+logger = logging.getLogger(__name__)
+
+
+def make_etag(version, request):
+    """
+    Build a weak ETag from the version columns. The body depends on the
+    viewer (language, saved/upvoted flags), so the user id is part of it.
+    """
+    user = request.user
+    viewer = user.pk if user.is_authenticated else 'anon'
+    raw = '|'.join(str(version[key]) for key in sorted(version)) + f'|{viewer}'
+    return 'W/' + quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def last_modified_of(version):
+    """
+    Latest datetime among the version columns, as a Unix timestamp, or None
+    unless every column other than the pk holds a timestamp (a NULL may be
+    an empty count as well as a missing date).
+    """
+    values = [value for key, value in version.items() if key != 'pk']
+    if not values or not all(hasattr(value, 'timestamp') for value in values):
+        return None
+    return int(max(values).timestamp())
+
+
+def relation_versions(namespaces):
+    """Response cache generations of the namespaces, or None while the cache is unavailable."""
+    try:
+        return get_generations(namespaces)
+    except Exception as e:
+        logger.warning(f"Response cache unavailable: {e}")
+        return None
+
+
+def touch_owners(owner, sender, instance, action, pk_set, **kwargs):
+    """
+    m2m_changed receiver body: bump ``owner.updated_at`` for the owner rows
+    whose relation through ``sender`` changed, from either side.
+    """
+    owner_field = next(field.name for field in sender._meta.fields if field.related_model is owner)
+    if action == 'pre_clear' and not isinstance(instance, owner):
+        # tag.news.clear(): remember which rows lose the relation
+        other_field = next(field.name for field in sender._meta.fields if field.related_model is type(instance))
+        instance._cleared_owner_pks = set(
+            sender.objects.filter(**{other_field: instance.pk}).values_list(owner_field, flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if isinstance(instance, owner):
+        pks = [instance.pk]
+    elif action == 'post_clear':
+        pks = getattr(instance, '_cleared_owner_pks', ())
+    else:
+        pks = pk_set or ()
+    if pks:
+        owner.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+class ConditionalGetMixin:
+    """
+    Answer If-None-Match / If-Modified-Since on detail endpoints with 304.
+
+    Subclasses implement ``get_version()`` returning a dict of version
+    columns for the requested object (raising Http404 when it is missing).
+    """
+
+    def get_version(self):
+        raise NotImplementedError
+
+    def get_lookup_value(self, model):
+        """The URL lookup converted for the lookup field; Http404 when it cannot be one."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        field = model._meta.pk if self.lookup_field == 'pk' else model._meta.get_field(self.lookup_field)
+        try:
+            return field.to_python(self.kwargs[lookup_url_kwarg])
+        except (ValidationError, ValueError, TypeError):
+            raise Http404
+
+    def conditional_response(self, request, version, render):
+        """Return a 304 if the client's copy is current, otherwise ``render()``."""
+        etag = make_etag(version, request)
+        last_modified = last_modified_of(version)
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = render()
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ['Authorization'])
+        return response
@@ -0,0 +1,260 @@
+"""
+Write-behind counters for hot engagement fields.
+
+Requests record increments in a buffer (Redis, or an in-process aggregator)
+instead of doing a read-modify-write on the row. The buffered deltas are then
+folded into the database in bulk with a single F() UPDATE per model field,
+either by the ``core.tasks.flush_counters`` beat task or, for the local
+buffer, by a timer thread in the process that buffered them; requests never
+run the UPDATEs themselves.
+
+Deltas are removed from a buffer only once they are in the database, so a
+failed flush leaves them for the next one.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Case, F, IntegerField, Value, When
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'counters'
+KEYS_INDEX = f'{KEY_PREFIX}:keys'
+FLUSH_LOCK_KEY = f'{KEY_PREFIX}:flush-lock'
+FLUSH_LOCK_TIMEOUT = 300  # seconds; far longer than a flush takes
+FLUSH_BATCH_SIZE = 500
+
+
+def counter_key(model, field):
+    """Return the buffer key for ``model.field``, e.g. ``counters:news.news:view_count``."""
+    return f'{KEY_PREFIX}:{model._meta.label_lower}:{field}'
+
+
+def parse_counter_key(key):
+    """Inverse of counter_key(): return (model, field)."""
+    _, label, field = key.split(':')
+    return apps.get_model(label), field
+
+
+class LocalCounterBuffer:
+    """
+    In-process aggregator used when Redis is not configured or unreachable.
+
+    A daemon thread flushes it every COUNTERS_LOCAL_FLUSH_INTERVAL seconds
+    (0 stops the timer, leaving flushes to explicit flush() calls), and it is
+    flushed once more when the process exits. The setting is read on every
+    round, so overriding it takes effect without a new buffer.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(lambda: defaultdict(int))
+        self._flusher_pid = None
+
+    def incr(self, key, pk, amount=1):
+        with self._lock:
+            self._pending[key][pk] += amount
+            # Threads do not survive a fork, so each process starts its own
+            if settings.COUNTERS_LOCAL_FLUSH_INTERVAL > 0 and self._flusher_pid != os.getpid():
+                self._flusher_pid = os.getpid()
+                threading.Thread(target=self._run, name='counter-flusher', daemon=True).start()
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(lambda: defaultdict(int))
+        return {key: dict(deltas) for key, deltas in pending.items()}
+
+    def restore(self, drained):
+        """Put back deltas that could not be applied."""
+        with self._lock:
+            for key, deltas in drained.items():
+                for pk, delta in deltas.items():
+                    self._pending[key][pk] += delta
+
+    def _run(self):
+        while True:
+            interval = settings.COUNTERS_LOCAL_FLUSH_INTERVAL
+            if interval <= 0:
+                with self._lock:
+                    self._flusher_pid = None  # the next increment restarts the timer
+                return
+            time.sleep(interval)
+            close_old_connections()
+            try:
+                flush_local()
+            except Exception as e:
+                logger.warning(f"Could not flush local counters, keeping them for the next flush: {e}")
+
+
+class RedisCounterBuffer:
+    """Buffer increments in Redis hashes shared by every web process."""
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def incr(self, key, pk, amount=1):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hincrby(key, pk, amount)
+        pipe.sadd(KEYS_INDEX, key)
+        pipe.execute()
+
+    def flush(self, apply):
+        """
+        Pass each buffered hash to ``apply(key, deltas)``, which removes the
+        deltas it has written from ``deltas``. One flush runs at a time across
+        processes; a concurrent call returns without flushing.
+        """
+        import redis
+        from redis.exceptions import LockError
+
+        lock = self.client.lock(FLUSH_LOCK_KEY, timeout=FLUSH_LOCK_TIMEOUT)
+        if not lock.acquire(blocking=False):
+            return
+        try:
+            for raw_key in self.client.smembers(KEYS_INDEX):
+                key = raw_key.decode()
+                flushing = f'{key}:flushing'
+                # A failed or killed flush leaves its snapshot behind; finish it first
+                self._flush_snapshot(key, flushing, apply)
+                try:
+                    # RENAME is atomic, so increments landing mid-flush go to a fresh hash
+                    self.client.rename(key, flushing)
+                except redis.ResponseError:
+                    continue  # Nothing buffered since the last flush
+                self._flush_snapshot(key, flushing, apply)
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                logger.warning("Counter flush outlived its lock")
+
+    def _flush_snapshot(self, key, flushing, apply):
+        """
+        Apply a snapshot hash, then delete what was applied. Only a worker
+        dying between an UPDATE and the HDEL after it can count deltas twice.
+        """
+        values = self.client.hgetall(flushing)
+        if not values:
+            return
+        deltas = {int(pk): int(delta) for pk, delta in values.items()}
+        pending = dict(deltas)
+        try:
+            apply(key, pending)
+        finally:
+            applied = [pk for pk in deltas if pk not in pending]
+            if not pending:
+                self.client.delete(flushing)
+            elif applied:
+                self.client.hdel(flushing, *applied)
+
+
+_local_buffer = None
+_redis_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_local_buffer():
+    global _local_buffer
+    with _buffer_lock:
+        if _local_buffer is None:
+            _local_buffer = LocalCounterBuffer()
+            atexit.register(_flush_at_exit)
+        return _local_buffer
+
+
+def get_redis_buffer():
+    global _redis_buffer
+    with _buffer_lock:
+        if _redis_buffer is None:
+            _redis_buffer = RedisCounterBuffer(settings.COUNTERS_REDIS_URL)
+        return _redis_buffer
+
+
+def increment(model, field, pk, amount=1):
+    """Buffer ``amount`` to be added to ``model.field`` for the row ``pk``."""
+    key = counter_key(model, field)
+
+    if settings.COUNTERS_BACKEND == 'redis':
+        try:
+            get_redis_buffer().incr(key, pk, amount)
+            return
+        except Exception as e:
+            logger.warning(f"Counter buffer unavailable, aggregating locally: {e}")
+
+    get_local_buffer().incr(key, pk, amount)
+
+
+def apply_increments(model, field, deltas):
+    """
+    Add each delta to ``model.field`` with one UPDATE ... CASE per batch.
+    Written entries are removed from ``deltas`` batch by batch, so after a
+    failure it holds exactly what is left to apply.
+    """
+    items = [(pk, delta) for pk, delta in deltas.items() if delta]
+    for start in range(0, len(items), FLUSH_BATCH_SIZE):
+        batch = items[start:start + FLUSH_BATCH_SIZE]
+        increment_expr = Case(
+            *[When(pk=pk, then=Value(delta)) for pk, delta in batch],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        model.objects.filter(pk__in=[pk for pk, _ in batch]).update(
+            **{field: F(field) + increment_expr}
+        )
+        for pk, _ in batch:
+            del deltas[pk]
+    deltas.clear()  # zero deltas need no write
+
+
+def flush_local():
+    """Flush this process's local buffer; deltas that fail to apply go back into it."""
+    buffer = get_local_buffer()
+    drained = buffer.drain()
+    touched = {}
+    try:
+        for key, deltas in drained.items():
+            touched[key] = _apply_key(key, deltas)
+    finally:
+        buffer.restore({key: deltas for key, deltas in drained.items() if deltas})
+    return touched
+
+
+def _apply_key(key, deltas):
+    pks = set(deltas)
+    model, field = parse_counter_key(key)
+    apply_increments(model, field, deltas)
+    return pks
+
+
+def _flush_at_exit():
+    try:
+        flush_local()
+    except Exception as e:
+        logger.warning(f"Could not flush local counters at exit: {e}")
+
+
+def flush():
+    """
+    Fold every buffered increment into the database.
+
+    Returns a mapping of counter key to the primary keys that changed.
+    """
+    touched = {}
+
+    def apply(key, deltas):
+        touched.setdefault(key, set()).update(_apply_key(key, deltas))
+
+    if settings.COUNTERS_BACKEND == 'redis':
+        get_redis_buffer().flush(apply)
+    for key, pks in flush_local().items():
+        touched.setdefault(key, set()).update(pks)
+    return touched
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.ai import cache
+from core.ai import summarizer  # noqa: F401  registers its cache
+from core.ai.fact_checker import get_embedder
+
+
+class Command(BaseCommand):
+    help = 'Show hit and miss counts of the AI inference caches across all workers'
+
+    def handle(self, *args, **options):
+        get_embedder(settings.FACT_EMBEDDING_MODEL)  # registers the embedding cache
+        self.stdout.write(f"{'cache':<60} {'local':>9} {'shared':>9} {'misses':>9} {'hit rate':>9}")
+        for prefix, counts in sorted(cache.stats().items()):
+            hits = counts['local_hits'] + counts['shared_hits']
+            total = hits + counts['misses']
+            rate = f"{hits / total:.1%}" if total else '-'
+            self.stdout.write(
+                f"{prefix:<60} {counts['local_hits']:>9} {counts['shared_hits']:>9} {counts['misses']:>9} {rate:>9}"
+            )
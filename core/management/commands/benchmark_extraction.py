@@ -0,0 +1,81 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.scrapers.extraction import DEFAULT_SELECTORS, extract
+
+DEFAULT_FIXTURES = os.path.join(settings.BASE_DIR, 'tests', 'fixtures', 'html')
+
+
+def extract_bs4(body, config, base_url=''):
+    """The previous BlogScraper parsing: html.parser and select_one per field."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(body, 'html.parser')
+    articles = []
+    for article in soup.select(config.get('article_selector', 'article')):
+        try:
+            articles.append({
+                'title': article.select_one(config.get('title_selector', 'h1')).text.strip(),
+                'content': article.select_one(config.get('content_selector', '.content')).text.strip(),
+                'author': article.select_one(config.get('author_selector', '.author')).text.strip(),
+                'date': article.select_one(config.get('date_selector', 'time')).get('datetime'),
+                'url': article.select_one('a')['href'],
+            })
+        except (AttributeError, TypeError):
+            pass
+    return articles
+
+
+class Command(BaseCommand):
+    help = 'Measure blog extraction throughput (docs/sec) over a directory of saved HTML pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help='Directory of .html files')
+        parser.add_argument('--config', default='{}', help='scraping_config JSON applied to every page')
+        parser.add_argument('--repeat', type=int, default=200, help='Passes over the corpus')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        paths = sorted(
+            os.path.join(options['fixtures'], name)
+            for name in os.listdir(options['fixtures']) if name.endswith('.html')
+        )
+        if not paths:
+            raise CommandError(f"No .html fixtures in {options['fixtures']}")
+        pages = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+        corpus = pages * options['repeat']
+        config = {**DEFAULT_SELECTORS, **json.loads(options['config'])}
+
+        runs = [
+            ('lxml', lambda: [extract(body, config) for body in corpus]),
+            ('readability', lambda: [extract(body, {}) for body in corpus]),
+        ]
+        if options['workers'] > 1:
+            def pooled():
+                with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+                    chunksize = max(1, len(corpus) // (options['workers'] * 4))
+                    return list(pool.map(extract, corpus, [config] * len(corpus), chunksize=chunksize))
+            runs.append((f"lxml x{options['workers']}", pooled))
+        try:
+            import bs4  # noqa: F401
+            runs.insert(0, ('bs4', lambda: [extract_bs4(body, config) for body in corpus]))
+        except ImportError:
+            self.stdout.write('beautifulsoup4 not installed; skipping the html.parser baseline')
+
+        self.stdout.write(f"{len(paths)} pages x {options['repeat']} = {len(corpus)} docs")
+        self.stdout.write(f"{'engine':<12} {'seconds':>8} {'docs/s':>9} {'articles':>9}")
+        for name, run in runs:
+            start = time.perf_counter()
+            results = run()
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{name:<12} {elapsed:>8.2f} {len(corpus) / elapsed:>9.0f} {sum(map(len, results)):>9}"
+            )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from forum.models import Post
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search vectors for news articles and forum posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model in (News, Post):
+            pks = list(model.objects.order_by('pk').values_list('pk', flat=True))
+            for start in range(0, len(pks), batch_size):
+                batch = pks[start:start + batch_size]
+                model.objects.filter(pk__range=(batch[0], batch[-1])).update_search_vector()
+            self.stdout.write(self.style.SUCCESS(
+                f"Indexed {len(pks)} {model._meta.verbose_name_plural}"
+            ))
@@ -0,0 +1,253 @@
+"""
+Keyset (seek) pagination for feeds.
+
+Instead of ``OFFSET n`` plus a ``COUNT(*)`` over the filtered set, each page
+is fetched with a ``WHERE (published_date, id) < (last_seen)`` condition that
+an index on the ordering columns can satisfy directly, so deep pages cost the
+same as the first one.
+
+Clients that need page numbers can opt in with ``?page=N``, which falls back
+to page-number pagination with an estimated total count.
+
+Both kinds of page are fetched with one row beyond the page size, and that
+extra row decides whether another page follows. The estimated count is
+only shown to clients and never decides which pages exist.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page-number pagination without a COUNT(*) over the whole filtered set.
+    The total shown is the planner's row estimate on PostgreSQL (exact
+    elsewhere), raised to at least the rows already seen.
+    """
+
+    display_page_controls = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        try:
+            self.number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound('Invalid page.')
+        if self.number < 1:
+            raise NotFound('Invalid page.')
+
+        offset = (self.number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(results) > page_size
+        results = results[:page_size]
+        if not results and self.number > 1:
+            raise NotFound('Invalid page.')
+
+        self.count_is_estimate = connection.vendor == 'postgresql'
+        count = estimate_count(queryset) if self.count_is_estimate else queryset.count()
+        self.count = max(count, offset + len(results) + self.has_next)
+        return results
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        if self.number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.number - 1)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'count_is_estimate': self.count_is_estimate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+def estimate_count(queryset):
+    """Return Postgres' planner estimate of the number of rows in queryset."""
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the queryset's ordering plus the primary key.
+
+    The ordering is taken from the filtered queryset (so OrderingFilter and
+    search ranking keep working); ``pk`` is appended as a tie-breaker. Each
+    ordering term must be a plain column or annotation on the model.
+    """
+
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+    cursor_query_param = 'cursor'
+    page_query_param = 'page'
+    page_number_class = EstimatedCountPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.delegate = None
+
+        ordering = self.get_ordering(queryset)
+        if self.page_query_param in request.query_params or ordering is None:
+            return self.paginate_by_page_number(queryset, request, view)
+
+        self.ordering = ordering
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request, queryset.model)
+        self.reverse = bool(cursor and cursor['r'])
+
+        order_by = [self.invert(term) for term in ordering] if self.reverse else ordering
+        queryset = queryset.order_by(*order_by)
+        if cursor:
+            queryset = queryset.filter(self.seek_filter(queryset.model, order_by, cursor['v']))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.first, self.last = (results[0], results[-1]) if results else (None, None)
+        return results
+
+    def paginate_by_page_number(self, queryset, request, view):
+        self.delegate = self.page_number_class()
+        self.delegate.page_size = self.page_size
+        self.delegate.page_size_query_param = self.page_size_query_param
+        self.delegate.max_page_size = self.max_page_size
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.delegate is not None:
+            return self.delegate.get_paginated_response(data)
+        return Response({
+            'next': self.get_link(self.last, reverse=False) if self.has_next and self.last else None,
+            'previous': self.get_link(self.first, reverse=True) if self.has_previous and self.first else None,
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, queryset):
+        """
+        Return the keyset ordering for queryset, or None when it cannot be
+        seeked (expressions, related lookups or nullable columns).
+        """
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering or ['-pk'])
+        if not all(isinstance(term, str) and '__' not in term and '?' not in term for term in ordering):
+            return None
+        for term in ordering:
+            try:
+                if queryset.model._meta.get_field(term.lstrip('-')).null:
+                    return None
+            except FieldDoesNotExist:
+                pass
+        if not any(term.lstrip('-') in ('pk', queryset.model._meta.pk.name) for term in ordering):
+            ordering.append('-pk' if ordering[0].startswith('-') else 'pk')
+        return ordering
+
+    @staticmethod
+    def invert(term):
+        return term[1:] if term.startswith('-') else f'-{term}'
+
+    @staticmethod
+    def seek_filter(model, ordering, values):
+        """
+        Build ``WHERE`` for rows after ``values`` in ``ordering``:
+        ``a <= x AND (a < x OR (a = x AND b < y))`` for two keys, and so on.
+        The leading bound lets the database start an index range scan.
+        """
+        condition = Q()
+        equal = Q()
+        for term, value in zip(ordering, values):
+            name = term.lstrip('-')
+            lookup = 'lt' if term.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        first = ordering[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': values[0]}) & condition
+
+    @staticmethod
+    def to_python(model, name, value):
+        """Cursor value as the column's Python type; raises ValueError or ValidationError if invalid."""
+        try:
+            field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotation, e.g. search_rank
+            if not isinstance(value, (int, float, str)):
+                raise ValueError(value)
+            return value
+        if isinstance(value, str) and field.get_internal_type() == 'DateTimeField':
+            value = parse_datetime(value)
+        else:
+            value = field.to_python(value)
+        if value is None:
+            raise ValueError(name)
+        return value
+
+    def position(self, obj):
+        values = []
+        for term in self.ordering:
+            value = getattr(obj, term.lstrip('-'))
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = str(value)
+            values.append(value)
+        return values
+
+    def get_link(self, obj, reverse):
+        cursor = {'v': self.position(obj), 'r': reverse}
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, model):
+        """The request's cursor with its values converted for the ordering columns, or None."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if not isinstance(cursor, dict) or not isinstance(cursor.get('r'), bool) \
+                    or not isinstance(cursor.get('v'), list) or len(cursor['v']) != len(self.ordering):
+                raise ValueError
+            cursor['v'] = [
+                self.to_python(model, term.lstrip('-'), value) for term, value in zip(self.ordering, cursor['v'])
+            ]
+            return cursor
+        except (TypeError, ValueError, KeyError, ValidationError, json.JSONDecodeError):
+            raise NotFound('Invalid cursor')
@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
+
+from .concurrency import ScraperThrottle
+from .tagging import tag_item
 
 class BaseScraper(ABC):
     """Base class for all news scrapers"""
@@ -8,6 +11,10 @@ class BaseScraper(ABC):
     def __init__(self, source_name: str):
         self.source_name = source_name
         self.last_scraped = None
+        # High-water marks from earlier runs (see core.scrapers.state)
+        self.state: Dict = {}
+        # Rate limiter and executor slots for this scraper's blocking calls
+        self.throttle = ScraperThrottle(source_name)
 
     @abstractmethod
     async def scrape(self) -> List[Dict]:
@@ -24,15 +31,22 @@ class BaseScraper(ABC):
         """Validate scraped data"""
         pass
 
-    async def process(self) -> List[Dict]:
-        """Process the scraped data"""
-        raw_data = await self.scrape()
-        processed_data = []
-        
-        for item in raw_data:
+    async def iter_scrape(self) -> AsyncIterator[Dict]:
+        """
+        Yield raw items as they are fetched. Scrapers that page through an
+        API override this so items reach the sink before the run finishes.
+        """
+        for item in await self.scrape():
+            yield item
+
+    async def stream(self) -> AsyncIterator[Dict]:
+        """Yield validated, cleaned items as they are scraped, tagged with their county and topics"""
+        async for item in self.iter_scrape():
             if await self.validate_data(item):
-                cleaned_item = await self.clean_data(item)
-                processed_data.append(cleaned_item)
+                yield tag_item(await self.clean_data(item))
         
         self.last_scraped = datetime.now()
-        return processed_data
\ No newline at end of file
+
+    async def process(self) -> List[Dict]:
+        """Process the scraped data"""
+        return [item async for item in self.stream()]
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+Concurrency helpers for scrapers.
+
+Most platform SDKs (tweepy, praw, facebook-sdk) are synchronous. Calling them
+directly from ``async def scrape()`` blocks the event loop, so the pipeline's
+``asyncio.gather`` ends up running every source one after the other. Scrapers
+instead hand blocking calls to a shared, bounded thread pool and pace their
+requests with an async token bucket, so a full pipeline run takes as long as
+its slowest source rather than the sum of all of them.
+
+Per-scraper limits are read from the environment::
+
+    SCRAPER_<NAME>_CONCURRENCY   blocking calls in flight for that scraper
+    SCRAPER_<NAME>_RATE          requests per second (token refill rate)
+    SCRAPER_<NAME>_BURST         bucket size
+    SCRAPER_MAX_WORKERS          size of the shared thread pool
+"""
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+# Conservative defaults derived from each platform's published rate limits
+DEFAULT_LIMITS = {
+    'twitter': {'concurrency': 2, 'rate': 0.5, 'burst': 2},     # 450 req / 15 min (app auth)
+    'facebook': {'concurrency': 2, 'rate': 1.0, 'burst': 5},
+    'telegram': {'concurrency': 4, 'rate': 1.0, 'burst': 5},
+    'reddit': {'concurrency': 1, 'rate': 1.0, 'burst': 5},      # praw is not thread safe; 60 req / min
+}
+FALLBACK_LIMITS = {'concurrency': 4, 'rate': 2.0, 'burst': 4}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ScraperLimits:
+    concurrency: int
+    rate: float
+    burst: int
+
+
+def get_limits(name: str) -> ScraperLimits:
+    """Return the concurrency and rate limits for a scraper, environment first."""
+    defaults = DEFAULT_LIMITS.get(name, FALLBACK_LIMITS)
+    prefix = f'SCRAPER_{name.upper()}_'
+    return ScraperLimits(
+        concurrency=int(os.getenv(f'{prefix}CONCURRENCY', defaults['concurrency'])),
+        rate=float(os.getenv(f'{prefix}RATE', defaults['rate'])),
+        burst=int(os.getenv(f'{prefix}BURST', defaults['burst'])),
+    )
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by every scraper for blocking SDK calls."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv('SCRAPER_MAX_WORKERS', 16)),
+                thread_name_prefix='scraper',
+            )
+        return _executor
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket rate limiter for coroutines.
+
+    ``acquire()`` waits (without blocking the loop) until a token is
+    available. ``pause(seconds)`` empties the bucket and holds every caller
+    back, e.g. until an API's rate-limit window resets.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = self.paused_until
+
+
+class ScraperThrottle:
+    """Per-scraper rate limiter plus a cap on its blocking calls in flight."""
+
+    def __init__(self, name: str):
+        self.limits = get_limits(name)
+        self.bucket = AsyncTokenBucket(self.limits.rate, self.limits.burst)
+        self.semaphore = asyncio.Semaphore(self.limits.concurrency)
+
+    async def wait(self):
+        """Wait for a request token."""
+        await self.bucket.acquire()
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """Run a blocking call in the shared pool once a token and a slot are free."""
+        await self.bucket.acquire()
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+    async def iterate_blocking(self, iterable):
+        """
+        Async-iterate a blocking iterator (e.g. a paginator that performs a
+        request per page), fetching each item in the pool.
+        """
+        iterator = iter(iterable)
+        sentinel = object()
+        while True:
+            item = await self.run_blocking(next, iterator, sentinel)
+            if item is sentinel:
+                return
+            yield item
@@ -0,0 +1,193 @@
+"""
+Near-duplicate detection for scraped items.
+
+The same story reaches us from several platforms with small edits (a
+shortened link, a hashtag, a different intro). Each item's cleaned content
+is reduced to a MinHash signature over word shingles; signatures are split
+into bands and hashed into buckets (locality-sensitive hashing), so finding
+candidates is a handful of dict lookups instead of a scan, and candidates
+are confirmed by their estimated Jaccard similarity.
+
+The index lives in memory, is pruned to a sliding window, and persists as a
+compact ``.npz`` blob (to a file or any bytes store such as Redis), from
+which the buckets are rebuilt on load.
+"""
+import io
+import os
+import re
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .files import atomic_write
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+URL_PATTERN = re.compile(r'https?://\S+')
+WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def shingles(text: str, size: int = 3) -> List[str]:
+    """Word n-grams of normalized text; short texts become a single shingle."""
+    words = WORD_PATTERN.findall(URL_PATTERN.sub(' ', text.lower()))
+    if len(words) <= size:
+        return [' '.join(words)] if words else []
+    return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+class MinHashLSH:
+    """
+    MinHash signatures with banded LSH buckets.
+
+    With ``bands * rows == num_perm`` the probability that two items with
+    Jaccard similarity ``s`` share a bucket is ``1 - (1 - s**rows)**bands``;
+    the defaults (16 bands of 8 rows) put the S-curve's midpoint near 0.7.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.8,
+                 shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.seed = seed
+
+        generator = np.random.RandomState(seed)
+        # a < 2**32 and 32-bit shingle hashes keep a * x + b inside uint64
+        self._a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.timestamps: Dict[str, float] = {}
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(bands)]
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def __contains__(self, key):
+        return key in self.signatures
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return None
+        hashes = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in set(grams)), dtype=np.uint64)
+        permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return float(np.count_nonzero(first == second)) / len(first)
+
+    def query(self, signature: np.ndarray, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Indexed keys at or above the threshold, most similar first."""
+        candidates = set()
+        for band, bucket_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(bucket_key, ()))
+        candidates.discard(exclude)
+        if not candidates:
+            return []
+        keys = list(candidates)
+        scores = np.count_nonzero(np.stack([self.signatures[key] for key in keys]) == signature, axis=1) / self.num_perm
+        return sorted(
+            ((key, float(score)) for key, score in zip(keys, scores) if score >= self.threshold),
+            key=lambda match: match[1], reverse=True,
+        )
+
+    def add(self, key: str, signature: np.ndarray, timestamp: Optional[float] = None):
+        if key in self.signatures:
+            self.remove(key)
+        self.signatures[key] = signature
+        self.timestamps[key] = timestamp if timestamp is not None else time.time()
+        for band, bucket_key in self._band_keys(signature):
+            self._buckets[band].setdefault(bucket_key, set()).add(key)
+
+    def remove(self, key: str):
+        signature = self.signatures.pop(key, None)
+        self.timestamps.pop(key, None)
+        if signature is None:
+            return
+        for band, bucket_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(bucket_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][bucket_key]
+
+    def find_or_add(self, key: str, text: str, timestamp: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """
+        Return ``(canonical key, similarity)`` if text duplicates an indexed
+        item, otherwise index it under key and return None.
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        matches = self.query(signature, exclude=key)
+        if matches:
+            return matches[0]
+        self.add(key, signature, timestamp)
+        return None
+
+    def prune(self, max_age: float, now: Optional[float] = None) -> int:
+        """Drop items indexed more than max_age seconds ago."""
+        cutoff = (now if now is not None else time.time()) - max_age
+        expired = [key for key, stamp in self.timestamps.items() if stamp < cutoff]
+        for key in expired:
+            self.remove(key)
+        return len(expired)
+
+    # Persistence
+
+    def dumps(self) -> bytes:
+        keys = list(self.signatures)
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            params=np.array([self.num_perm, self.bands, self.shingle_size, self.seed]),
+            threshold=np.array([self.threshold]),
+            keys=np.array(keys, dtype=str),
+            timestamps=np.array([self.timestamps[key] for key in keys], dtype=np.float64),
+            signatures=np.array([self.signatures[key] for key in keys], dtype=np.uint32).reshape(len(keys), self.num_perm),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def loads(cls, data: bytes) -> 'MinHashLSH':
+        with np.load(io.BytesIO(data)) as blob:
+            num_perm, bands, shingle_size, seed = (int(value) for value in blob['params'])
+            index = cls(num_perm=num_perm, bands=bands, threshold=float(blob['threshold'][0]),
+                        shingle_size=shingle_size, seed=seed)
+            for key, stamp, signature in zip(blob['keys'], blob['timestamps'], blob['signatures']):
+                index.add(str(key), signature, float(stamp))
+        return index
+
+    def save(self, path: str):
+        """Atomically write the index to path."""
+        atomic_write(path, self.dumps())
+
+    @classmethod
+    def load(cls, path: str, **defaults) -> 'MinHashLSH':
+        """Load the index from path, or return an empty one built with defaults."""
+        try:
+            with open(path, 'rb') as f:
+                return cls.loads(f.read())
+        except FileNotFoundError:
+            return cls(**defaults)
+
+    def extend(self, items: Iterable[Tuple[str, str, float]]):
+        """Index (key, text, timestamp) triples without duplicate checks."""
+        for key, text, stamp in items:
+            signature = self.signature(text)
+            if signature is not None:
+                self.add(key, signature, stamp)
@@ -0,0 +1,263 @@
+"""
+HTML extraction for blog scrapers.
+
+Pages are parsed with lxml, which is many times faster than BeautifulSoup's
+``html.parser``. The CSS selectors in ``Source.scraping_config`` are
+translated to XPath once per distinct config and cached, instead of being
+re-parsed for every article on every page::
+
+    {
+        "article_selector": "article",
+        "title_selector": "h1",
+        "content_selector": ".content",
+        "author_selector": ".author",
+        "date_selector": "time",
+        "link_selector": "a"
+    }
+
+Sources without selectors (or whose selectors no longer match anything)
+fall back to a readability-style extractor that scores text blocks by
+paragraph length and link density and returns the page's main article.
+
+Parsing is CPU-bound, so ``extract_async`` runs it in a process pool and the
+crawl loop keeps fetching meanwhile. Workers are set with
+``SCRAPER_PARSE_WORKERS`` (0 parses in the scraper thread pool instead,
+which is also what happens inside daemonic Celery workers, as they cannot
+start child processes).
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import urljoin
+
+from cssselect import SelectorError
+from lxml import etree, html
+from lxml.cssselect import CSSSelector
+
+from .concurrency import get_executor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SELECTORS = {
+    'article_selector': 'article',
+    'title_selector': 'h1',
+    'content_selector': '.content',
+    'author_selector': '.author',
+    'date_selector': 'time',
+    'link_selector': 'a',
+}
+
+# Elements that never hold article text
+NOISE_TAGS = ('script', 'style', 'noscript', 'iframe', 'template')
+# Page furniture the readability fallback ignores when looking for the body
+BOILERPLATE_TAGS = ('nav', 'header', 'footer', 'aside', 'form')
+POSITIVE_HINTS = re.compile(r'article|body|content|entry|main|post|story|text', re.I)
+NEGATIVE_HINTS = re.compile(r'comment|footer|sidebar|nav|menu|share|social|related|promo|widget|advert|banner', re.I)
+MIN_PARAGRAPH_LENGTH = 25
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+class CompiledSelectors(NamedTuple):
+    article: CSSSelector
+    title: CSSSelector
+    content: CSSSelector
+    author: CSSSelector
+    date: CSSSelector
+    link: CSSSelector
+
+
+@lru_cache(maxsize=256)
+def _compile(selectors) -> CompiledSelectors:
+    config = dict(selectors)
+    return CompiledSelectors(*(
+        CSSSelector(config[name], translator='html') for name in DEFAULT_SELECTORS
+    ))
+
+
+def compile_selectors(config: Dict) -> Optional[CompiledSelectors]:
+    """
+    Compiled selectors for a source config, or None when it configures none.
+    Results are cached per distinct config.
+    """
+    if not any(config.get(name) for name in DEFAULT_SELECTORS):
+        return None
+    selectors = tuple((name, config.get(name) or default) for name, default in DEFAULT_SELECTORS.items())
+    return _compile(selectors)
+
+
+def parse_html(body) -> html.HtmlElement:
+    """Parse a page; bytes let lxml honour the document's declared encoding."""
+    document = html.document_fromstring(body)
+    etree.strip_elements(document, *NOISE_TAGS, with_tail=False)
+    etree.strip_elements(document, etree.Comment, with_tail=False)
+    return document
+
+
+def _text(element) -> str:
+    return ' '.join(element.text_content().split()) if element is not None else ''
+
+
+def _first(selector: CSSSelector, element):
+    matches = selector(element)
+    return matches[0] if matches else None
+
+
+def extract_with_selectors(document, selectors: CompiledSelectors, base_url: str = '') -> List[Dict]:
+    articles = []
+    for article in selectors.article(document):
+        title = _text(_first(selectors.title, article))
+        content = _text(_first(selectors.content, article))
+        link = _first(selectors.link, article)
+        if not (title and content and link is not None and link.get('href')):
+            logger.debug(f"Skipping incomplete article on {base_url}")
+            continue
+        date = _first(selectors.date, article)
+        articles.append({
+            'title': title,
+            'content': content,
+            'author': _text(_first(selectors.author, article)) or None,
+            'date': (date.get('datetime') or _text(date)) if date is not None else None,
+            'url': urljoin(base_url, link.get('href')),
+        })
+    return articles
+
+
+# Readability-style fallback
+
+META_TITLE = CSSSelector('meta[property="og:title"], meta[name="twitter:title"]')
+META_AUTHOR = CSSSelector('meta[name="author"], meta[property="article:author"]')
+META_DATE = CSSSelector('meta[property="article:published_time"], meta[itemprop="datePublished"]')
+META_URL = CSSSelector('link[rel="canonical"], meta[property="og:url"]')
+AUTHOR_LINK = CSSSelector('[rel="author"], .author, .byline')
+TIME = CSSSelector('time[datetime]')
+HEADING = CSSSelector('h1')
+PARAGRAPHS = CSSSelector('p, pre, blockquote')
+
+
+def _meta(selector: CSSSelector, document) -> Optional[str]:
+    for element in selector(document):
+        value = element.get('content') or element.get('href')
+        if value and value.strip():
+            return value.strip()
+    return None
+
+
+def _class_weight(element) -> int:
+    hints = f"{element.get('class', '')} {element.get('id', '')}"
+    weight = 0
+    if POSITIVE_HINTS.search(hints):
+        weight += 25
+    if NEGATIVE_HINTS.search(hints):
+        weight -= 25
+    return weight
+
+
+def _link_density(element) -> float:
+    text_length = len(_text(element))
+    if not text_length:
+        return 1.0
+    return sum(len(_text(link)) for link in element.iter('a')) / text_length
+
+
+def main_content(document) -> Optional[html.HtmlElement]:
+    """The block element that most likely holds the article body."""
+    scores = {}
+    for paragraph in PARAGRAPHS(document):
+        text = _text(paragraph)
+        if len(text) < MIN_PARAGRAPH_LENGTH:
+            continue
+        score = 1 + text.count(',') + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        for ancestor, share in ((parent, 1.0), (parent.getparent() if parent is not None else None, 0.5)):
+            if ancestor is None:
+                continue
+            if ancestor not in scores:
+                scores[ancestor] = _class_weight(ancestor)
+            scores[ancestor] += score * share
+    if not scores:
+        return None
+    return max(scores, key=lambda element: scores[element] * (1 - _link_density(element)))
+
+
+def extract_readable(document, base_url: str = '') -> List[Dict]:
+    """
+    Extract the page's main article without any configured selectors.
+    Strips page furniture from document in place.
+    """
+    title = (
+        _meta(META_TITLE, document) or _text(_first(HEADING, document))
+        or (document.findtext('.//title') or '').strip()
+    )
+    author = _meta(META_AUTHOR, document) or _text(_first(AUTHOR_LINK, document)) or None
+    date = _first(TIME, document)
+    date = _meta(META_DATE, document) or (date.get('datetime') if date is not None else None)
+    url = urljoin(base_url, _meta(META_URL, document) or '') or base_url
+
+    etree.strip_elements(document, *BOILERPLATE_TAGS, with_tail=False)
+    body = main_content(document)
+    if body is None or not title:
+        return []
+    paragraphs = [_text(p) for p in PARAGRAPHS(body)]
+    content = '\n\n'.join(p for p in paragraphs if len(p) >= MIN_PARAGRAPH_LENGTH) or _text(body)
+    return [{'title': title, 'content': content, 'author': author, 'date': date, 'url': url}]
+
+
+def extract(body, config: Optional[Dict] = None, base_url: str = '') -> List[Dict]:
+    """
+    Extract articles from a page with the source's selectors, falling back
+    to readability-style extraction. Pure function of its arguments, so it
+    can run in a worker process.
+    """
+    if not body:
+        return []
+    try:
+        document = parse_html(body)
+    except (etree.ParserError, ValueError) as e:
+        logger.warning(f"Could not parse {base_url}: {e}")
+        return []
+
+    try:
+        selectors = compile_selectors(config or {})
+    except SelectorError as e:
+        logger.warning(f"Invalid selector in scraping_config for {base_url}: {e}")
+        selectors = None
+
+    if selectors is not None:
+        articles = extract_with_selectors(document, selectors, base_url)
+        if articles:
+            return articles
+        logger.info(f"Selectors matched nothing on {base_url}; using readability fallback")
+    return extract_readable(document, base_url)
+
+
+def parse_workers() -> int:
+    return int(os.getenv('SCRAPER_PARSE_WORKERS', os.cpu_count() or 1))
+
+
+def get_parse_executor() -> Executor:
+    """Process pool for parsing, or the scraper thread pool where processes are unavailable."""
+    global _process_pool
+    if parse_workers() < 1 or multiprocessing.current_process().daemon:
+        return get_executor()
+    with _process_pool_lock:
+        if _process_pool is None:
+            # forkserver: never fork a process that is running an event loop and threads
+            _process_pool = ProcessPoolExecutor(
+                max_workers=parse_workers(),
+                mp_context=multiprocessing.get_context('forkserver'),
+            )
+        return _process_pool
+
+
+async def extract_async(body, config: Optional[Dict] = None, base_url: str = '') -> List[Dict]:
+    """``extract`` off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_parse_executor(), extract, body, config, base_url)
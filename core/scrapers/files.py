@@ -0,0 +1,25 @@
+"""
+Atomic file writes for scraper state shared between processes.
+
+Writers fill a temporary file of their own in the target's directory and
+rename it over the target, so readers see the old or the new content, never
+a partial one, and concurrent writers never write to the same temporary
+file.
+"""
+import os
+import tempfile
+
+
+def atomic_write(path: str, data: bytes):
+    """Replace path with data in one rename, creating its directory if needed."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, part = tempfile.mkstemp(dir=directory or '.', prefix=f'.{os.path.basename(path)}.', suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(part, path)
+    except BaseException:
+        os.unlink(part)
+        raise
@@ -0,0 +1,127 @@
+"""
+On-disk HTTP response cache for scrapers.
+
+Responses are stored per URL as a body file plus a small JSON metadata file.
+Freshness follows the response's ``Cache-Control: max-age`` (or
+``Expires``); once stale, an entry with an ``ETag`` or ``Last-Modified`` is
+revalidated with a conditional request and reused on ``304``. Responses
+marked ``no-store`` are never written.
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from .files import atomic_write
+
+# Headers worth keeping with a cached body
+STORED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control', 'Expires', 'Content-Type', 'Date')
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+def freshness_lifetime(headers: Dict[str, str], now: Optional[float] = None) -> float:
+    """Seconds a response may be reused without revalidation."""
+    directives = parse_cache_control(headers.get('Cache-Control'))
+    if 'no-cache' in directives or 'no-store' in directives:
+        return 0
+    if directives.get('max-age'):
+        try:
+            return max(0, int(directives['max-age']))
+        except ValueError:
+            return 0
+    if headers.get('Expires'):
+        try:
+            expires = parsedate_to_datetime(headers['Expires']).timestamp()
+        except (TypeError, ValueError):
+            return 0
+        return max(0, expires - (now if now is not None else time.time()))
+    return 0
+
+
+def is_storable(status: int, headers: Dict[str, str]) -> bool:
+    return status == 200 and 'no-store' not in parse_cache_control(headers.get('Cache-Control'))
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    stored_at: float = 0.0
+    lifetime: float = 0.0
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) < self.stored_at + self.lifetime
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.headers.get('ETag'):
+            headers['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+
+class DiskHTTPCache:
+    """Blocking file cache; the async client calls it from its executor."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url: str):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, digest[:2], digest)
+        return f'{base}.json', f'{base}.body'
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(url=url, body=body, headers=meta['headers'],
+                          stored_at=meta['stored_at'], lifetime=meta['lifetime'])
+
+    def set(self, url: str, body: bytes, headers: Dict[str, str]) -> CacheEntry:
+        entry = CacheEntry(
+            url=url, body=body,
+            headers={name: headers[name] for name in STORED_HEADERS if headers.get(name)},
+            stored_at=time.time(),
+            lifetime=freshness_lifetime(headers),
+        )
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        # Body first, metadata last: a reader never sees metadata without its body
+        atomic_write(body_path, body)
+        self._write_meta(entry)
+        return entry
+
+    def touch(self, entry: CacheEntry, headers: Dict[str, str]) -> CacheEntry:
+        """Refresh an entry after a 304, merging the new validators and lifetime."""
+        entry.headers.update({name: headers[name] for name in STORED_HEADERS if headers.get(name)})
+        entry.stored_at = time.time()
+        entry.lifetime = freshness_lifetime(entry.headers)
+        self._write_meta(entry)
+        return entry
+
+    def _write_meta(self, entry: CacheEntry):
+        meta_path, _ = self._paths(entry.url)
+        atomic_write(meta_path, json.dumps({
+            'url': entry.url, 'headers': entry.headers, 'stored_at': entry.stored_at, 'lifetime': entry.lifetime,
+        }).encode('utf-8'))
@@ -0,0 +1,208 @@
+"""
+Process-wide HTTP client for scrapers.
+
+One ``aiohttp.ClientSession`` per event loop is shared by every scraper, so
+connections (and their DNS lookups and TLS handshakes) are pooled and kept
+alive across sources and runs. On top of the pool the client adds:
+
+* timeouts and compressed transfer (gzip/deflate, brotli when installed)
+* a cap on concurrent connections per host
+* politeness: robots.txt is honoured (disallowed URLs are not fetched) and
+  requests to one host are spaced by its ``Crawl-delay`` or a default delay;
+  while robots.txt cannot be fetched (5xx or unreachable) the host is
+  treated as fully disallowed and robots.txt is retried later (RFC 9309)
+* an on-disk HTTP cache (core.scrapers.http_cache) honouring Cache-Control,
+  Expires, ETag and Last-Modified
+
+Settings come from the environment (``SCRAPER_HTTP_*``), like the other
+scraper limits.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from urllib import robotparser
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict
+
+from .concurrency import get_executor
+from .http_cache import DiskHTTPCache, is_storable
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli  # noqa: F401  aiohttp decodes 'br' only when brotli is installed
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+USER_AGENT = os.getenv('SCRAPER_USER_AGENT', 'NewsFlash360Bot/1.0 (+https://newsflash360.co.ke/bot)')
+ROBOTS_TTL = 24 * 3600
+ROBOTS_RETRY = 15 * 60  # seconds before retrying an unavailable robots.txt
+
+
+class DisallowedByRobots(Exception):
+    """robots.txt does not allow this URL for our user agent."""
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)  # case-insensitive for live responses
+    body: bytes = b''
+    from_cache: bool = False
+
+    def text(self, encoding: Optional[str] = None) -> str:
+        return self.body.decode(encoding or 'utf-8', errors='replace')
+
+
+class HostState:
+    """Per-host robots rules and request spacing."""
+
+    def __init__(self, delay: float):
+        self.lock = asyncio.Lock()
+        self.next_request_at = 0.0
+        self.delay = delay
+        self.robots: Optional[robotparser.RobotFileParser] = None
+        self.robots_expires_at = 0.0
+
+
+class ScrapingClient:
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        limit: int = int(os.getenv('SCRAPER_HTTP_MAX_CONNECTIONS', 100)),
+        limit_per_host: int = int(os.getenv('SCRAPER_HTTP_MAX_PER_HOST', 2)),
+        default_delay: float = float(os.getenv('SCRAPER_HTTP_DELAY', 1.0)),
+        timeout: float = float(os.getenv('SCRAPER_HTTP_TIMEOUT', 30)),
+    ):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=limit,
+                limit_per_host=limit_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            ),
+            timeout=aiohttp.ClientTimeout(total=timeout, connect=10, sock_read=timeout),
+            headers={'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING},
+            auto_decompress=True,
+        )
+        self.default_delay = default_delay
+        self.cache = DiskHTTPCache(cache_dir) if cache_dir else None
+        self.hosts: Dict[str, HostState] = {}
+
+    async def close(self):
+        await self.session.close()
+
+    def host_state(self, url: str) -> HostState:
+        host = urlsplit(url).netloc.lower()
+        if host not in self.hosts:
+            self.hosts[host] = HostState(self.default_delay)
+        return self.hosts[host]
+
+    async def in_thread(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), func, *args)
+
+    async def robots_for(self, url: str, state: HostState) -> robotparser.RobotFileParser:
+        if state.robots is not None and time.time() < state.robots_expires_at:
+            return state.robots
+
+        parts = urlsplit(url)
+        parser = robotparser.RobotFileParser(f'{parts.scheme}://{parts.netloc}/robots.txt')
+        try:
+            async with self.session.get(parser.url, allow_redirects=True) as response:
+                if response.status >= 500:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info, response.history, status=response.status, message=response.reason,
+                    )
+                elif response.status >= 400:
+                    parser.allow_all = True
+                else:
+                    parser.parse((await response.text(errors='replace')).splitlines())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Unavailable, not missing: disallow everything and try again soon
+            logger.info(f"Could not fetch {parser.url}: {e}")
+            parser.disallow_all = True
+            state.robots, state.robots_expires_at = parser, time.time() + ROBOTS_RETRY
+            return parser
+
+        delay = parser.crawl_delay(USER_AGENT)
+        if delay is not None:
+            state.delay = max(float(delay), self.default_delay)
+        state.robots, state.robots_expires_at = parser, time.time() + ROBOTS_TTL
+        return parser
+
+    async def wait_turn(self, state: HostState):
+        """Space requests to one host by its politeness delay."""
+        async with state.lock:
+            now = time.monotonic()
+            if now < state.next_request_at:
+                await asyncio.sleep(state.next_request_at - now)
+            state.next_request_at = time.monotonic() + state.delay
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """
+        GET url through the cache. Callers may pass their own conditional
+        headers (If-None-Match / If-Modified-Since); a 304 is then returned
+        as-is, while cache revalidations return the cached body.
+        """
+        headers = dict(headers or {})
+        caller_conditional = 'If-None-Match' in headers or 'If-Modified-Since' in headers
+
+        entry = await self.in_thread(self.cache.get, url) if self.cache else None
+        if entry is not None and entry.is_fresh():
+            if caller_conditional and headers.get('If-None-Match') == entry.headers.get('ETag'):
+                return FetchResult(url, 304, entry.headers, b'', from_cache=True)
+            return FetchResult(url, 200, entry.headers, entry.body, from_cache=True)
+        if entry is not None and not caller_conditional:
+            headers.update(entry.validators())
+
+        state = self.host_state(url)
+        robots = await self.robots_for(url, state)
+        if not robots.can_fetch(USER_AGENT, url):
+            raise DisallowedByRobots(url)
+        await self.wait_turn(state)
+
+        async with self.session.get(url, headers=headers) as response:
+            body = await response.read() if response.status != 304 else b''
+            status, response_headers = response.status, CIMultiDict(response.headers)
+
+        if status == 304 and entry is not None:
+            entry = await self.in_thread(self.cache.touch, entry, response_headers)
+            if caller_conditional:
+                return FetchResult(url, 304, entry.headers)
+            return FetchResult(url, 200, entry.headers, entry.body, from_cache=True)
+        if self.cache and is_storable(status, response_headers):
+            await self.in_thread(self.cache.set, url, body, response_headers)
+        return FetchResult(url, status, response_headers, body)
+
+
+_clients: Dict[asyncio.AbstractEventLoop, ScrapingClient] = {}
+
+
+def get_client() -> ScrapingClient:
+    """The shared client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    for stale in [other for other in _clients if other.is_closed()]:
+        del _clients[stale]
+    client = _clients.get(loop)
+    if client is None or client.session.closed:
+        cache_dir = os.getenv('SCRAPER_HTTP_CACHE_DIR') or os.path.join(
+            os.getenv('SCRAPER_RESULTS_DIR', 'scraping_results'), 'http_cache'
+        )
+        client = ScrapingClient(cache_dir=cache_dir)
+        _clients[loop] = client
+    return client
+
+
+async def close_client():
+    """Close this loop's client; call before the loop shuts down."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
@@ -1,9 +1,12 @@
-from typing import List, Dict
+from typing import Dict, Optional
 import asyncio
 from datetime import datetime
-import json
 import os
+import time
 
+from .concurrency import get_executor
+from .sinks import DEFAULT_STREAM, NDJSONSink
+from .state import default_state_store
 from .social_scrapper import (
     TwitterScraper,
     FacebookScraper,
@@ -11,70 +14,73 @@ from .social_scrapper import (
     RedditScraper
 )
 
+
 class ScrapingPipeline:
-    def __init__(self):
-        self.scrapers = {
+    def __init__(self, scrapers: Optional[Dict] = None, results_dir: Optional[str] = None, state_store=None):
+        self.scrapers = scrapers if scrapers is not None else {
             'twitter': TwitterScraper(),
             'facebook': FacebookScraper(),
             'telegram': TelegramScraper(),
             'reddit': RedditScraper()
         }
-        self.results_dir = 'scraping_results'
+        self.results_dir = results_dir or os.getenv('SCRAPER_RESULTS_DIR', 'scraping_results')
         
-        # Create results directory if it doesn't exist
-        if not os.path.exists(self.results_dir):
-            os.makedirs(self.results_dir)
+        # Every scraper appends to one rotating NDJSON stream as items arrive
+        self.sink = NDJSONSink.from_env(self.results_dir, DEFAULT_STREAM)
+        self.state_store = state_store or default_state_store(self.results_dir)
+        self.completed = set()
+
+    async def in_thread(self, func, *args):
+        # The state store may hit the database; keep it off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), func, *args)
 
-    async def run_scraper(self, name: str, scraper) -> List[Dict]:
+    async def run_scraper(self, name: str, scraper) -> int:
+        started = time.monotonic()
+        count = 0
         try:
             print(f"Starting {name} scraper...")
-            results = await scraper.scrape()
+            scraper.state = await self.in_thread(self.state_store.get, name)
+            async for item in scraper.stream():
+                item['scraper'] = name
+                self.sink.write(item)
+                count += 1
+            elapsed = time.monotonic() - started
+            self.completed.add(name)
             
-            if results:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{self.results_dir}/{name}_results_{timestamp}.json"
-                
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(results, f, indent=2, default=str)
-                    
-                print(f"✓ {name}: Scraped {len(results)} items")
-                return results
+            if count:
+                print(f"✓ {name}: Scraped {count} items in {elapsed:.2f}s")
             else:
-                print(f"✗ {name}: No results found")
-                return []
+                print(f"✗ {name}: No results found ({elapsed:.2f}s)")
                 
         except Exception as e:
-            print(f"✗ {name}: Error - {str(e)}")
-            return []
+            print(f"✗ {name}: Error after {count} items - {str(e)}")
+        return count
 
     async def run_pipeline(self):
         print("Starting scraping pipeline...")
         start_time = datetime.now()
         
-        # Run all scrapers concurrently
+        # Run all scrapers concurrently; blocking SDK calls go through each
+        # scraper's throttle, so the run takes as long as the slowest source
         tasks = [
             self.run_scraper(name, scraper)
             for name, scraper in self.scrapers.items()
         ]
         
-        results = await asyncio.gather(*tasks)
+        try:
+            counts = await asyncio.gather(*tasks)
+        finally:
+            # Publish the last partial segment to consumers
+            self.sink.close()
         
-        # Combine all results
-        all_results = []
-        for items in results:
-            all_results.extend(items)
-            
-        # Save combined results
-        if all_results:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{self.results_dir}/combined_results_{timestamp}.json"
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(all_results, f, indent=2, default=str)
+        # Advance cursors only for completed runs whose items are now published
+        for name in self.completed:
+            await self.in_thread(self.state_store.set, name, self.scrapers[name].state)
         
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
         
         print(f"\nPipeline completed in {duration:.2f} seconds")
-        print(f"Total items scraped: {len(all_results)}")
-        print(f"Results saved in: {self.results_dir}/")
\ No newline at end of file
+        print(f"Total items scraped: {sum(counts)}")
+        print(f"Results streamed to: {self.results_dir}/{DEFAULT_STREAM}-*")
@@ -1,29 +1,36 @@
-import schedule
-import time
-import asyncio
-import os
-from datetime import datetime
-from core.scrapers.pipeline import ScrapingPipeline
+"""
+Adaptive scrape intervals.
 
-async def run_pipeline():
-    pipeline = ScrapingPipeline()
-    await pipeline.run_pipeline()
-    print(f"Pipeline run completed at {datetime.now()}")
+Each source is scraped on its own schedule (see news.scraping and the
+``dispatch_due_scrapes`` / ``scrape_source`` Celery tasks). The interval
+follows the source's observed publish rate: a smoothed estimate of new items
+per hour, updated after every run. Busy sources are scraped often enough to
+pick up about ``target_items`` new items per run, quiet ones back off to the
+maximum interval, and every interval is jittered so sources added together
+do not stay in lockstep.
+"""
+import random
+from typing import Optional
 
-def run_async_pipeline():
-    asyncio.run(run_pipeline())
 
-def main():
-    # Schedule pipeline to run every 6 hours
-    schedule.every(6).hours.do(run_async_pipeline)
-    
-    # Also run immediately on start
-    run_async_pipeline()
-    
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check schedule every minute
+def observe_rate(previous: float, new_items: int, elapsed_hours: Optional[float], smoothing: float = 0.3) -> float:
+    """
+    Fold one run's observation into the smoothed publish rate (items/hour).
+    Without a previous run to measure from, the rate is unchanged.
+    """
+    if not elapsed_hours or elapsed_hours <= 0:
+        return previous
+    observed = new_items / elapsed_hours
+    return smoothing * observed + (1 - smoothing) * previous
 
-if __name__ == "__main__":
-    print("Starting scheduled pipeline...")
-    main()
\ No newline at end of file
+
+def adaptive_interval(rate: float, target_items: float, min_interval: float, max_interval: float) -> float:
+    """Seconds until the next run, clamped to [min_interval, max_interval]."""
+    if rate <= 0:
+        return max_interval
+    return min(max_interval, max(min_interval, target_items / rate * 3600))
+
+
+def jittered(interval: float, jitter: float, rng=random) -> float:
+    """Spread an interval by up to +/- jitter (a fraction of the interval)."""
+    return interval * (1 + rng.uniform(-jitter, jitter))
@@ -0,0 +1,287 @@
+"""
+Streaming NDJSON sink for scraped items.
+
+Scrapers append items one line at a time to a segment file while they run,
+instead of holding every item in memory and dumping JSON at the end. A
+segment is written as ``<name>-<timestamp>-<pid>-<seq>.ndjson[.gz|.zst].part``
+and renamed to drop the ``.part`` suffix once it is rotated (by size, item
+count or age) or the sink is closed, so readers only ever see complete,
+immutable segments.
+
+Downstream consumers (DB ingest, AI processing) follow the stream with
+``tail()`` or ``tail_segments()``, which remember the segments each consumer
+finished::
+
+    for item in tail('scraping_results', DEFAULT_STREAM, consumer='ingest'):
+        ...
+
+Several processes may write the same stream: a consumer's checkpoint is the
+set of segment names it has finished, not a position, so a segment that
+appears after later-named ones is still read.
+
+``prune_segments()`` deletes the segments every consumer has finished, and
+any older than a maximum age, so the stream directory does not grow without
+bound.
+"""
+import gzip
+import io
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional
+
+from .files import atomic_write
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for compression='zstd'
+    zstandard = None
+
+# Stream the scraping pipeline writes and ingest reads
+DEFAULT_STREAM = 'scraped'
+
+EXTENSIONS = {None: '.ndjson', 'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}
+PART_SUFFIX = '.part'
+
+# Segment numbers are unique per process, so two sinks on one stream never share a name
+_sequence = itertools.count(1)
+_sequence_lock = threading.Lock()
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_item(item: Dict) -> bytes:
+    return json.dumps(item, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def _open_write(path, compression):
+    if compression == 'gzip':
+        return gzip.open(path, 'wb', compresslevel=6)
+    if compression == 'zstd':
+        raw = open(path, 'wb')
+        return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+    return open(path, 'wb', buffering=1024 * 1024)
+
+
+def _open_read(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("Reading .zst segments requires the 'zstandard' package")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True))
+    return open(path, 'rb')
+
+
+class NDJSONSink:
+    """
+    Append-only NDJSON writer with rotation.
+
+    ``write()`` only encodes the item into a buffered (optionally compressed)
+    file object, so it is cheap enough to call from the event loop as items
+    arrive.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        name: str,
+        compression: Optional[str] = None,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_items: int = 100_000,
+        max_age: float = 300,
+    ):
+        if compression not in EXTENSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == 'zstd' and zstandard is None:
+            raise RuntimeError("compression='zstd' requires the 'zstandard' package")
+
+        self.directory = directory
+        self.name = name
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.max_age = max_age
+
+        self.sequence = 0
+        self.total_items = 0
+        self.segments: List[str] = []
+        self._file = None
+        self._path = None
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, directory: str, name: str) -> 'NDJSONSink':
+        """Build a sink configured by the SCRAPER_SINK_* environment variables."""
+        return cls(
+            directory, name,
+            compression=os.getenv('SCRAPER_SINK_COMPRESSION') or None,
+            max_bytes=int(os.getenv('SCRAPER_SINK_MAX_BYTES', 64 * 1024 * 1024)),
+            max_items=int(os.getenv('SCRAPER_SINK_MAX_ITEMS', 100_000)),
+            max_age=float(os.getenv('SCRAPER_SINK_MAX_AGE', 300)),
+        )
+
+    def _open_segment(self):
+        with _sequence_lock:
+            self.sequence = next(_sequence)
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+        filename = f"{self.name}-{stamp}-{os.getpid()}-{self.sequence:06d}{EXTENSIONS[self.compression]}"
+        self._path = os.path.join(self.directory, filename)
+        self._file = _open_write(self._path + PART_SUFFIX, self.compression)
+        self._segment_bytes = 0
+        self._segment_items = 0
+        self._segment_opened = time.monotonic()
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.close()
+        os.replace(self._path + PART_SUFFIX, self._path)
+        self.segments.append(self._path)
+        self._file = None
+
+    def write(self, item: Dict):
+        if self._file is None:
+            self._open_segment()
+        line = encode_item(item)
+        self._file.write(line)
+        self._segment_bytes += len(line)
+        self._segment_items += 1
+        self.total_items += 1
+
+        if (
+            self._segment_bytes >= self.max_bytes
+            or self._segment_items >= self.max_items
+            or time.monotonic() - self._segment_opened >= self.max_age
+        ):
+            self._close_segment()
+
+    def rotate(self):
+        """Publish the current segment now, e.g. at the end of a scraper run."""
+        self._close_segment()
+
+    def close(self):
+        self._close_segment()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def completed_segments(directory: str, name: str) -> List[str]:
+    """Completed segment paths for a stream, oldest first."""
+    try:
+        filenames = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(
+        os.path.join(directory, filename)
+        for filename in filenames
+        if filename.startswith(f'{name}-') and not filename.endswith(PART_SUFFIX)
+        and any(filename.endswith(ext) for ext in EXTENSIONS.values())
+    )
+
+
+def read_segment(path: str) -> Iterator[Dict]:
+    with _open_read(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _checkpoint_path(directory, name, consumer):
+    return os.path.join(directory, f'.{name}.{consumer}.checkpoint')
+
+
+def _read_checkpoint(path) -> set:
+    """Names (basenames) of the segments a consumer has finished."""
+    try:
+        with open(path) as f:
+            return set(json.load(f))
+    except FileNotFoundError:
+        return set()
+
+
+def _write_checkpoint(path, finished: set):
+    atomic_write(path, json.dumps(sorted(finished)).encode('utf-8'))
+
+
+def tail_segments(
+    directory: str,
+    name: str,
+    consumer: str,
+    follow: bool = False,
+    poll_interval: float = 2.0,
+) -> Iterator[Iterator[Dict]]:
+    """
+    Yield an item iterator per segment the consumer has not finished yet.
+
+    A segment is checkpointed when the consumer comes back for the next one,
+    i.e. after it has fully handled the previous segment, so delivery is
+    at-least-once. With ``follow=True`` new segments are picked up as the
+    writer publishes them. Names of segments no longer on disk are dropped
+    from the checkpoint, so it stays as small as the stream directory.
+    """
+    checkpoint = _checkpoint_path(directory, name, consumer)
+    finished = None
+
+    while True:
+        segments = completed_segments(directory, name)
+        names = {os.path.basename(path) for path in segments}
+        if finished is None:
+            finished = _read_checkpoint(checkpoint)
+        finished &= names
+        for path in segments:
+            if os.path.basename(path) in finished:
+                continue
+            yield read_segment(path)
+            finished.add(os.path.basename(path))
+            _write_checkpoint(checkpoint, finished)
+        if not follow:
+            return
+        time.sleep(poll_interval)
+
+
+def prune_segments(directory: str, name: str, consumers: List[str], max_age: Optional[float] = None) -> int:
+    """
+    Delete the completed segments every consumer has finished, and with
+    ``max_age`` (seconds) those published longer ago than that whether read
+    or not, so a consumer that stopped does not hold the stream forever.
+    Returns the number deleted.
+    """
+    finished = None
+    for consumer in consumers:
+        names = _read_checkpoint(_checkpoint_path(directory, name, consumer))
+        finished = names if finished is None else finished & names
+    cutoff = time.time() - max_age if max_age is not None else None
+
+    deleted = 0
+    for path in completed_segments(directory, name):
+        try:
+            if os.path.basename(path) in (finished or ()) or (cutoff is not None and os.path.getmtime(path) < cutoff):
+                os.remove(path)
+                deleted += 1
+        except FileNotFoundError:
+            pass  # pruned by another worker
+    return deleted
+
+
+def tail(directory: str, name: str, consumer: str, follow: bool = False, poll_interval: float = 2.0) -> Iterator[Dict]:
+    """
+    Yield items from every segment the consumer has not finished yet.
+
+    Consumers that buffer items (e.g. in batches) should use
+    ``tail_segments()`` instead, and only ask for the next segment once the
+    previous one is durably handled.
+    """
+    for items in tail_segments(directory, name, consumer, follow, poll_interval):
+        yield from items
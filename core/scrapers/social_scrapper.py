@@ -1,13 +1,13 @@
+import asyncio
+import time
 import tweepy
 from typing import Dict, List
 from .base import BaseScraper
 import os
 from dotenv import load_dotenv
-import time
 
 # FACEBOK IMPORTS 
 from facebook_sdk import GraphAPI
-import datetime
 # TELEGRAM IMPORTS 
 from telethon import TelegramClient
 from telethon.errors import SessionPasswordNeededError
@@ -17,7 +17,7 @@ from telethon.tl.types import InputMessagesFilterEmpty
 
 # Add this import at the top
 import praw
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 class TwitterScraper(BaseScraper):
@@ -26,27 +26,39 @@ class TwitterScraper(BaseScraper):
         load_dotenv()
         
         bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
+        # Rate limiting is handled by self.throttle; sleeping inside the
+        # client would tie up an executor thread for the whole window
         self.client = tweepy.Client(
             bearer_token=bearer_token,
-            wait_on_rate_limit=True  # Automatically handles rate limiting
+            wait_on_rate_limit=False
         )
         
 
     async def scrape(self) -> List[Dict]:
-        tweets = []
+        return [tweet async for tweet in self.iter_scrape()]
+
+    async def iter_scrape(self):
         try:
             # Reduce max_results and add pagination
             query = 'news kenya lang:en -is:retweet'
-            for response in tweepy.Paginator(
+            # Only tweets newer than the last run's newest one
+            since_id = self.state.get('since_id')
+            paginator = tweepy.Paginator(
                 self.client.search_recent_tweets,
                 query=query,
                 max_results=10,  # Reduced batch size
                 tweet_fields=['created_at', 'public_metrics', 'author_id'],
-                limit=2  # Limit total number of API calls
-            ):
+                limit=2,  # Limit total number of API calls
+                **({'since_id': since_id} if since_id else {})
+            )
+            newest_id = None
+            # Each page is a blocking request; fetch it in the executor
+            async for response in self.throttle.iterate_blocking(paginator):
+                if response.meta and response.meta.get('newest_id'):
+                    newest_id = max(int(response.meta['newest_id']), newest_id or 0)
                 if response.data:
                     for tweet in response.data:
-                        tweets.append({
+                        yield {
                             'content': tweet.text,
                             'author': tweet.author_id,
                             'date': tweet.created_at,
@@ -55,18 +67,21 @@ class TwitterScraper(BaseScraper):
                                 'likes': tweet.public_metrics['like_count'],
                                 'retweets': tweet.public_metrics['retweet_count']
                             }
-                        })
-                            # Add small delay between requests
-                    time.sleep(2)
+                        }
+            
+            # Advance the cursor only once every page was read
+            if newest_id:
+                self.state['since_id'] = str(newest_id)
                 
-        except tweepy.TooManyRequests:
-            print("Rate limit reached. Waiting for reset...")
-            time.sleep(60 * 15)  # Wait 15 minutes
+        except tweepy.TooManyRequests as e:
+            # Keep what we have and hold further requests until the window resets
+            reset = e.response.headers.get('x-rate-limit-reset') if e.response is not None else None
+            delay = max(0, int(reset) - time.time()) if reset else 60 * 15
+            print(f"Rate limit reached. Pausing Twitter requests for {delay:.0f}s")
+            self.throttle.bucket.pause(delay)
         except tweepy.TweepyException as e:
             print(f"Twitter API Error: {str(e)}")
             raise
-        
-        return tweets
     
     async def clean_data(self, data: Dict) -> Dict:
         return {
@@ -98,12 +113,16 @@ class FacebookScraper(BaseScraper):
         try:
             # Search for posts about Kenya news
             # You can modify the query and parameters based on your needs
-            response = self.graph.get_object(
+            since = self.state.get('since')
+            response = await self.throttle.run_blocking(
+                self.graph.get_object,
                 'search',
                 fields='id,message,created_time,reactions.summary(total_count),shares',
                 q='Kenya news',
                 type='post',
-                limit=10
+                limit=10,
+                # Only posts created after the newest one of the last run
+                **({'since': since} if since else {})
             )
 
             if 'data' in response:
@@ -111,7 +130,7 @@ class FacebookScraper(BaseScraper):
                     posts.append({
                         'content': post.get('message', ''),
                         'author': post.get('from', {}).get('id'),
-                        'date': datetime.datetime.strptime(
+                        'date': datetime.strptime(
                             post['created_time'], '%Y-%m-%dT%H:%M:%S+0000'
                         ),
                         'url': f"https://facebook.com/{post['id']}",
@@ -120,8 +139,10 @@ class FacebookScraper(BaseScraper):
                             'shares': post.get('shares', {}).get('count', 0)
                         }
                     })
-                    # Add delay between requests
-                    time.sleep(2)
+
+            if posts:
+                newest = max(post['date'] for post in posts)
+                self.state['since'] = int(newest.replace(tzinfo=timezone.utc).timestamp()) + 1
 
         except Exception as e:
             print(f"Facebook API Error: {str(e)}")
@@ -167,7 +188,9 @@ class TelegramScraper(BaseScraper):
         self.phone = phone
 
     async def scrape(self) -> List[Dict]:
-        messages = []
+        return [message async for message in self.iter_scrape()]
+
+    async def iter_scrape(self):
         try:
             # Start the client
             await self.client.start(phone=self.phone)
@@ -175,42 +198,54 @@ class TelegramScraper(BaseScraper):
             # Define channels/groups to scrape (add your target channels)
             channels = ['KenyaNewsChannel', 'KenyaUpdates']  # Example channels
             
-            for channel in channels:
-                try:
-                    # Get channel entity
-                    entity = await self.client.get_entity(channel)
-                    
-                    # Search for messages containing news
-                    async for message in self.client.iter_messages(
-                        entity,
-                        search="news",
-                        limit=10,
-                        filter=InputMessagesFilterEmpty
-                    ):
-                        if message.text:
-                            messages.append({
-                                'content': message.text,
-                                'author': str(message.sender_id),
-                                'date': message.date,
-                                'url': f"https://t.me/{channel}/{message.id}",
-                                'engagement': {
-                                    'views': getattr(message, 'views', 0),
-                                    'forwards': getattr(message, 'forwards', 0)
-                                }
-                            })
-                            # Add delay between requests
-                            await asyncio.sleep(2)
-                            
-                except Exception as e:
-                    print(f"Error processing channel {channel}: {str(e)}")
-                    continue
+            # Telethon is natively async, so channels are searched concurrently
+            for channel_messages in asyncio.as_completed([self.scrape_channel(channel) for channel in channels]):
+                for message in await channel_messages:
+                    yield message
                 
         except Exception as e:
             print(f"Telegram API Error: {str(e)}")
             raise
         finally:
             await self.client.disconnect()
+
+    async def scrape_channel(self, channel: str) -> List[Dict]:
+        messages = []
+        try:
+            # Get channel entity
+            await self.throttle.wait()
+            entity = await self.client.get_entity(channel)
+            
+            # Search for messages containing news, newer than the last run's
+            channels_state = self.state.setdefault('channels', {})
+            min_id = channels_state.get(channel, 0)
+            newest_id = min_id
+            await self.throttle.wait()
+            async for message in self.client.iter_messages(
+                entity,
+                search="news",
+                limit=10,
+                min_id=min_id,
+                filter=InputMessagesFilterEmpty
+            ):
+                newest_id = max(newest_id, message.id)
+                if message.text:
+                    messages.append({
+                        'content': message.text,
+                        'author': str(message.sender_id),
+                        'date': message.date,
+                        'url': f"https://t.me/{channel}/{message.id}",
+                        'engagement': {
+                            'views': getattr(message, 'views', 0),
+                            'forwards': getattr(message, 'forwards', 0)
+                        }
+                    })
             
+            channels_state[channel] = newest_id
+                    
+        except Exception as e:
+            print(f"Error processing channel {channel}: {str(e)}")
+        
         return messages
 
     async def clean_data(self, data: Dict) -> Dict:
@@ -254,41 +289,62 @@ class RedditScraper(BaseScraper):
         )
 
     async def scrape(self) -> List[Dict]:
-        posts = []
+        return [post async for post in self.iter_scrape()]
+
+    async def iter_scrape(self):
         try:
             # Define subreddits to scrape
             subreddits = ['Kenya', 'KenyaPolitics', 'AfricanNews']
             
-            for subreddit_name in subreddits:
-                try:
-                    subreddit = self.client.subreddit(subreddit_name)
-                    
-                    # Search for posts about Kenya news
-                    for submission in subreddit.search('kenya news', limit=10):
-                        posts.append({
-                            'content': submission.selftext or submission.title,
-                            'author': str(submission.author),
-                            'date': datetime.fromtimestamp(submission.created_utc),
-                            'url': f"https://reddit.com{submission.permalink}",
-                            'title': submission.title,
-                            'engagement': {
-                                'upvotes': submission.score,
-                                'comments': submission.num_comments,
-                                'upvote_ratio': submission.upvote_ratio
-                            }
-                        })
-                        # Add delay between requests
-                        time.sleep(2)
-                        
-                except Exception as e:
-                    print(f"Error processing subreddit {subreddit_name}: {str(e)}")
-                    continue
+            for subreddit_posts in asyncio.as_completed([self.scrape_subreddit(name) for name in subreddits]):
+                for post in await subreddit_posts:
+                    yield post
 
         except Exception as e:
             print(f"Reddit API Error: {str(e)}")
             raise
-            
-        return posts
+
+    def search_subreddit(self, subreddit_name: str, cursor: Dict) -> List:
+        """Blocking: run the search and read the submissions' attributes"""
+        subreddit = self.client.subreddit(subreddit_name)
+        # Newest first, and only submissions listed before the last run's newest
+        params = {'before': cursor['fullname']} if cursor.get('fullname') else {}
+        submissions = [
+            submission
+            for submission in subreddit.search('kenya news', sort='new', limit=10, params=params)
+            # The 'before' anchor can vanish if that post is deleted; the
+            # timestamp keeps us from re-reading older posts in that case
+            if submission.created_utc > cursor.get('created_utc', 0)
+        ]
+        return [
+            (submission.fullname, submission.created_utc, {
+                'content': submission.selftext or submission.title,
+                'author': str(submission.author),
+                'date': datetime.fromtimestamp(submission.created_utc, tz=timezone.utc),
+                'url': f"https://reddit.com{submission.permalink}",
+                'title': submission.title,
+                'engagement': {
+                    'upvotes': submission.score,
+                    'comments': submission.num_comments,
+                    'upvote_ratio': submission.upvote_ratio
+                }
+            })
+            for submission in submissions
+        ]
+
+    async def scrape_subreddit(self, subreddit_name: str) -> List[Dict]:
+        cursors = self.state.setdefault('subreddits', {})
+        try:
+            results = await self.throttle.run_blocking(
+                self.search_subreddit, subreddit_name, cursors.get(subreddit_name, {})
+            )
+        except Exception as e:
+            print(f"Error processing subreddit {subreddit_name}: {str(e)}")
+            return []
+        if results:
+            fullname, created_utc, _ = max(results, key=lambda result: result[1])
+            cursors[subreddit_name] = {'fullname': fullname, 'created_utc': created_utc}
+        return [post for _, _, post in results]
 
     async def clean_data(self, data: Dict) -> Dict:
         return {
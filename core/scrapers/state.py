@@ -0,0 +1,76 @@
+"""
+Persistent per-source scraping cursors.
+
+Each scraper keeps a small JSON-serializable ``state`` dict of high-water
+marks (tweet ``since_id``, Telegram ``min_id`` per channel, Reddit
+fullnames, a blog's ETag / Last-Modified / content hash) so a run only
+fetches what is new. Scrapers update ``state`` only after a run completes,
+and the pipeline persists it only once the run's items are published to the
+sink, so an interrupted run is simply repeated.
+
+State lives on ``news.Source.scraping_state`` (next to ``scraping_config``
+and ``last_scraped``) when Django is configured, and in a JSON file
+otherwise. Store methods are synchronous; call them from a thread when
+inside the event loop.
+"""
+import json
+import logging
+import os
+from typing import Dict
+
+from .files import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+class JSONFileStateStore:
+    """Cursors for every scraper in one JSON file, for standalone pipeline runs."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _read(self) -> Dict:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def get(self, name: str) -> Dict:
+        return self._read().get(name, {})
+
+    def set(self, name: str, state: Dict):
+        states = self._read()
+        states[name] = state
+        atomic_write(self.path, json.dumps(states, indent=2, default=str).encode('utf-8'))
+
+
+class SourceStateStore:
+    """
+    Cursors stored on news.Source.scraping_state, looked up by source name.
+    Sources are only created by ingest or an admin; until one exists its
+    cursor is not kept, and the next run fetches from the start again.
+    """
+
+    def get(self, name: str) -> Dict:
+        from news.models import Source
+
+        state = Source.objects.filter(name=name).values_list('scraping_state', flat=True).first()
+        return state or {}
+
+    def set(self, name: str, state: Dict):
+        from django.utils import timezone
+        from news.models import Source
+
+        updated = Source.objects.filter(name=name).update(scraping_state=state, last_scraped=timezone.now())
+        if not updated:
+            logger.warning(f"No source named {name!r}; its scraping cursor is not saved")
+
+
+def default_state_store(directory: str):
+    """Source-backed store inside Django, JSON file next to the results otherwise."""
+    from django.apps import apps
+
+    if apps.ready:
+        return SourceStateStore()
+    return JSONFileStateStore(os.path.join(directory, 'scraper_state.json'))
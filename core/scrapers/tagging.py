@@ -0,0 +1,100 @@
+"""
+County and topic tags for scraped items.
+
+Scrapers only emit what their source gives them (text, author, date, URL,
+engagement), so ``BaseScraper.stream`` tags every cleaned item with the
+Kenyan county its text names most often and the topics whose keywords it
+mentions::
+
+    tag_item({'content': 'Mafuriko Kisumu: barabara zimefungwa'})
+    # {..., 'county': 'Kisumu', 'topics': ['transport', 'weather']}
+
+The sentiment rollups (news.sentiment) group by these tags, and ingest
+stores the county on the article. Tags a scraper already set are kept.
+"""
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+COUNTIES = [
+    'Baringo', 'Bomet', 'Bungoma', 'Busia', 'Elgeyo-Marakwet', 'Embu', 'Garissa', 'Homa Bay', 'Isiolo',
+    'Kajiado', 'Kakamega', 'Kericho', 'Kiambu', 'Kilifi', 'Kirinyaga', 'Kisii', 'Kisumu', 'Kitui', 'Kwale',
+    'Laikipia', 'Lamu', 'Machakos', 'Makueni', 'Mandera', 'Marsabit', 'Meru', 'Migori', 'Mombasa',
+    "Murang'a", 'Nairobi', 'Nakuru', 'Nandi', 'Narok', 'Nyamira', 'Nyandarua', 'Nyeri', 'Samburu', 'Siaya',
+    'Taita-Taveta', 'Tana River', 'Tharaka-Nithi', 'Trans Nzoia', 'Turkana', 'Uasin Gishu', 'Vihiga',
+    'Wajir', 'West Pokot',
+]
+
+# English and Swahili keywords per topic
+TOPIC_KEYWORDS = {
+    'politics': [
+        'election', 'elections', 'iebc', 'parliament', 'senate', 'governor', 'mca', 'president', 'campaign',
+        'uchaguzi', 'bunge', 'siasa', 'rais',
+    ],
+    'economy': [
+        'economy', 'budget', 'tax', 'taxes', 'inflation', 'shilling', 'prices', 'fuel', 'jobs', 'uchumi', 'bei',
+        'ushuru', 'kodi',
+    ],
+    'health': [
+        'health', 'hospital', 'hospitals', 'clinic', 'doctors', 'nurses', 'cholera', 'malaria', 'vaccine',
+        'afya', 'hospitali', 'daktari', 'huduma za afya',
+    ],
+    'education': [
+        'school', 'schools', 'university', 'students', 'teachers', 'exams', 'kcse', 'cbc', 'shule', 'elimu',
+        'walimu', 'wanafunzi',
+    ],
+    'security': [
+        'police', 'crime', 'robbery', 'attack', 'terror', 'al-shabaab', 'bandits', 'polisi', 'usalama', 'wizi',
+    ],
+    'weather': ['rain', 'rains', 'floods', 'flooding', 'drought', 'weather', 'mvua', 'mafuriko', 'ukame'],
+    'transport': [
+        'matatu', 'matatus', 'road', 'roads', 'traffic', 'railway', 'sgr', 'airport', 'barabara', 'usafiri',
+    ],
+    'sports': ['football', 'athletics', 'marathon', 'harambee stars', 'rugby', 'michezo', 'kandanda'],
+}
+
+
+def _name_pattern(name: str) -> str:
+    # "Murang'a", "Muranga" and "Elgeyo Marakwet" all name their county
+    return r"[\s'-]?".join(re.escape(part) for part in re.split(r"[\s'-]", name))
+
+
+def _alternation(names) -> re.Pattern:
+    names = sorted(names, key=len, reverse=True)
+    return re.compile(r'\b(' + '|'.join(_name_pattern(name) for name in names) + r')\b', re.IGNORECASE)
+
+
+COUNTY_PATTERN = _alternation(COUNTIES)
+COUNTY_KEYS = {re.sub(r"[\s'-]", '', county).lower(): county for county in COUNTIES}
+TOPIC_PATTERNS = {topic: _alternation(keywords) for topic, keywords in TOPIC_KEYWORDS.items()}
+
+
+def item_text(item: Dict) -> str:
+    return str(item.get('content') or item.get('title') or '')
+
+
+def find_county(text: str) -> Optional[str]:
+    """The county named most often in text, the first named on a tie; None if there is none."""
+    counts = Counter(
+        COUNTY_KEYS[re.sub(r"[\s'-]", '', match.group(1)).lower()] for match in COUNTY_PATTERN.finditer(text)
+    )
+    # Counter keeps first-seen order, and max() returns the first maximum
+    return max(counts, key=counts.get) if counts else None
+
+
+def find_topics(text: str) -> List[str]:
+    return sorted(topic for topic, pattern in TOPIC_PATTERNS.items() if pattern.search(text))
+
+
+def tag_item(item: Dict) -> Dict:
+    """Set ``county`` and ``topics`` on item from its text, unless it has them. Returns the item."""
+    text = item_text(item)
+    if not item.get('county'):
+        county = find_county(text)
+        if county:
+            item['county'] = county
+    if not (item.get('categories') or item.get('topics') or item.get('topic')):
+        topics = find_topics(text)
+        if topics:
+            item['topics'] = topics
+    return item
@@ -0,0 +1,81 @@
+"""
+Postgres full-text search shared by the news and forum APIs.
+
+Each searchable model keeps a ``search_vector`` column (GIN indexed) that is
+rebuilt on write. ``FullTextSearchFilter`` matches the ``search`` query param
+against it, ranks the results and attaches a highlighted snippet.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F
+from rest_framework import filters
+
+
+def search_config(language):
+    """Return the Postgres text search configuration used for a content language."""
+    return settings.SEARCH_CONFIGS.get(language, 'simple')
+
+
+def build_search_query(value):
+    """
+    Combine a stemmed English query with an unstemmed one, so Swahili and
+    Sheng terms (indexed with their own configuration) match as typed.
+    """
+    configs = dict.fromkeys(search_config(lang) for lang in ('en', 'sw', 'sheng'))
+    query = None
+    for config in configs:
+        part = SearchQuery(value, config=config, search_type='websearch')
+        query = part if query is None else query | part
+    return query
+
+
+def is_full_text_available():
+    return connection.vendor == 'postgresql'
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Search against a precomputed ``search_vector`` column instead of
+    ``ILIKE '%term%'`` scans.
+
+    Views configure it with:
+
+    * ``search_vector_field`` - the SearchVectorField to match (default ``search_vector``)
+    * ``search_headline_field`` - text field to build the highlighted snippet from
+
+    Results are ordered by rank unless the client asks for an explicit
+    ``ordering``, so this backend must come after OrderingFilter. On databases
+    without full-text support it falls back to DRF's SearchFilter over
+    ``search_fields``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get(self.search_param, '').strip()
+        if not value:
+            return queryset
+        if not is_full_text_available():
+            return super().filter_queryset(request, queryset, view)
+
+        vector_field = getattr(view, 'search_vector_field', 'search_vector')
+        query = build_search_query(value)
+
+        queryset = queryset.filter(**{vector_field: query}).annotate(
+            search_rank=SearchRank(F(vector_field), query)
+        )
+
+        headline_field = getattr(view, 'search_headline_field', None)
+        if headline_field:
+            queryset = queryset.annotate(
+                search_headline=SearchHeadline(
+                    headline_field, query,
+                    config=search_config('en'),
+                    start_sel='<mark>', stop_sel='</mark>',
+                    max_words=35, min_words=15, max_fragments=2,
+                )
+            )
+
+        if 'ordering' not in request.query_params:
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+            queryset = queryset.order_by('-search_rank', *ordering)
+        return queryset
@@ -0,0 +1,28 @@
+import logging
+
+from celery import shared_task
+from celery.signals import worker_process_init
+
+from django.conf import settings
+
+from . import counters
+from .ai import summarizer
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_counters():
+    """Fold buffered view/share counters into the database."""
+    touched = counters.flush()
+    summary = {key: len(pks) for key, pks in touched.items()}
+    if summary:
+        logger.info(f"Flushed engagement counters: {summary}")
+    return summary
+
+
+@worker_process_init.connect
+def preload_models(**kwargs):
+    """Load the AI models once per worker process, before the first task."""
+    if settings.SUMMARIZER_PRELOAD:
+        summarizer.preload()
@@ -0,0 +1,120 @@
+"""
+Materialized-path comment threads.
+
+Every comment stores the id of its thread (the top-level comment it hangs
+under) and its path: the fixed-width ids of its ancestors and itself, so a
+thread ordered by path is in depth-first order, replies under their parent
+and siblings oldest first. A whole thread, at any depth, is then one
+indexed range read on (thread, path) instead of a query per level::
+
+    page = paginate(Comment.objects.filter(parent=None))
+    attach_replies(page, Comment.objects.filter(active=True))
+    # each comment now has .thread_replies, recursively
+
+Serializers do this through ThreadListSerializer, which loads the replies
+of a whole page at once.
+
+Replies excluded by the queryset (unapproved, deactivated) drop out of the
+tree together with everything under them.
+"""
+from typing import Iterable, List
+
+from django.db import models
+
+from .viewer_state import ViewerStateListSerializer
+
+# Zero-padded decimal ids compare like the numbers in any collation
+PATH_STEP = 19  # digits of the largest BigAutoField id
+
+
+def path_segment(pk) -> str:
+    return f'{pk:0{PATH_STEP}d}'
+
+
+def depth_of(path: str) -> int:
+    """0 for a top-level comment."""
+    return len(path) // PATH_STEP - 1
+
+
+class ThreadMixin:
+    """
+    Model mixin for comments with ``parent``, ``thread`` and ``path``
+    fields. The thread and path are filled in on first save; a comment is
+    not moved to another parent afterwards.
+    """
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if not self.path:
+            parent = None
+            if self.parent_id:
+                parent = type(self).objects.values('thread_id', 'path').get(pk=self.parent_id)
+            self.thread_id = parent['thread_id'] if parent else self.pk
+            self.path = (parent['path'] if parent else '') + path_segment(self.pk)
+            type(self).objects.filter(pk=self.pk).update(thread=self.thread_id, path=self.path)
+
+    @property
+    def depth(self) -> int:
+        return depth_of(self.path)
+
+
+def attach_replies(comments: Iterable[models.Model], queryset: models.QuerySet) -> List[models.Model]:
+    """
+    Load the threads of comments in one query and set ``thread_replies``
+    on them and every reply, in path order. Returns the comments.
+    """
+    comments = list(comments)
+    by_pk = {}
+    for comment in comments:
+        comment.thread_replies = []
+        by_pk[comment.pk] = comment
+    if not comments:
+        return comments
+
+    replies = queryset.filter(
+        thread_id__in={comment.thread_id for comment in comments}, parent__isnull=False,
+    ).order_by('thread_id', 'path')
+    for reply in replies:
+        if reply.pk in by_pk:
+            # Already in the list (a flat listing includes replies too)
+            reply = by_pk[reply.pk]
+        else:
+            reply.thread_replies = []
+            by_pk[reply.pk] = reply
+        # Parents sort before their replies, so a missing parent was filtered out
+        parent = by_pk.get(reply.parent_id)
+        if parent is not None:
+            parent.thread_replies.append(reply)
+    return comments
+
+
+def walk(comments: Iterable[models.Model]):
+    """Comments and all their attached replies, depth first."""
+    for comment in comments:
+        yield comment
+        yield from walk(getattr(comment, 'thread_replies', ()))
+
+
+def replies_of(comment: models.Model, queryset: models.QuerySet) -> List[models.Model]:
+    """A comment's attached replies, loading its thread if that has not happened yet."""
+    if not hasattr(comment, 'thread_replies'):
+        attach_replies([comment], queryset)
+    return comment.thread_replies
+
+
+class ThreadListSerializer(ViewerStateListSerializer):
+    """
+    List serializer for comments that loads the replies of every comment on
+    the page in one query before rendering. The child serializer provides
+    get_reply_queryset() and renders replies_of(obj, ...) recursively.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        attach_replies(
+            [item for item in items if not hasattr(item, 'thread_replies')], self.child.get_reply_queryset()
+        )
+        return super().to_representation(items)
+
+    def viewer_objects(self, items):
+        return list(walk(items))
@@ -0,0 +1,109 @@
+"""
+Per-viewer flags (upvoted, saved, ...) resolved for a whole page at once.
+
+Serializers that show what the requesting user did to each object declare
+the relations they read and a loader for each; the loader takes the user
+and a set of object ids and returns the ids the user has that relation
+with::
+
+    class PostListSerializer(ViewerStateMixin, serializers.ModelSerializer):
+        viewer_relations = {'upvoted_posts': upvoted_post_ids}
+
+        class Meta:
+            list_serializer_class = ViewerStateListSerializer
+
+        def get_is_upvoted(self, obj):
+            return self.viewer_flag('upvoted_posts', obj)
+
+When a page is serialized, the list serializer registers every id on it
+before the rows are rendered, so the first flag lookup loads the whole page
+in one query per relation. The state lives on the request (and in the
+serializer context as ``viewer_state``), so nested and follow-up
+serializers in the same request reuse what was loaded; relation names are
+shared request-wide, so they name the model too. Anonymous viewers cost
+no queries.
+"""
+from collections import defaultdict
+from typing import Callable, Dict, Iterable
+
+from django.db import models
+from rest_framework import serializers
+
+
+class ViewerState:
+    """Which objects the viewer has each relation with, loaded in batches."""
+
+    def __init__(self, user):
+        self.user = user
+        self._known: Dict[str, Dict[object, bool]] = defaultdict(dict)
+        self._pending: Dict[str, set] = defaultdict(set)
+
+    @property
+    def is_authenticated(self):
+        return bool(self.user and self.user.is_authenticated)
+
+    def prime(self, relation: str, pks: Iterable):
+        """Queue ids to load with the next lookup of this relation."""
+        known = self._known[relation]
+        self._pending[relation].update(pk for pk in pks if pk not in known)
+
+    def mark(self, relation: str, pks: Iterable, value: bool = True):
+        """Record flags the caller already knows, e.g. from a version query."""
+        for pk in pks:
+            self._known[relation][pk] = value
+            self._pending[relation].discard(pk)
+
+    def has(self, relation: str, pk, loader: Callable) -> bool:
+        if not self.is_authenticated:
+            return False
+        known = self._known[relation]
+        if pk not in known:
+            pending = self._pending.pop(relation, set()) | {pk}
+            found = set(loader(self.user, pending))
+            for pending_pk in pending:
+                known[pending_pk] = pending_pk in found
+        return known[pk]
+
+
+def for_request(request) -> ViewerState:
+    """The request's viewer state, created on first use."""
+    state = getattr(request, 'viewer_state', None)
+    if state is None:
+        state = ViewerState(getattr(request, 'user', None))
+        if request is not None:
+            request.viewer_state = state
+    return state
+
+
+def get_viewer_state(context) -> ViewerState:
+    state = context.get('viewer_state')
+    if state is None:
+        state = context['viewer_state'] = for_request(context.get('request'))
+    return state
+
+
+class ViewerStateMixin:
+    """Serializer mixin for flags read through the request's ViewerState."""
+
+    # relation name -> loader(user, ids) returning the ids the user has it with
+    viewer_relations: Dict[str, Callable] = {}
+
+    def viewer_flag(self, relation: str, obj) -> bool:
+        return get_viewer_state(self.context).has(relation, obj.pk, self.viewer_relations[relation])
+
+
+class ViewerStateListSerializer(serializers.ListSerializer):
+    """List serializer that queues every object of the page before rendering it."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        state = get_viewer_state(self.context)
+        if state.is_authenticated:
+            pks = [item.pk for item in self.viewer_objects(items)]
+            for relation in getattr(self.child, 'viewer_relations', ()):
+                state.prime(relation, pks)
+        return super().to_representation(items)
+
+    def viewer_objects(self, items):
+        """Objects whose flags the page will show (nested ones too, for subclasses)."""
+        return items
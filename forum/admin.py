@@ -1,10 +1,10 @@
 from django.contrib import admin
-from .models import Category, Post, Comment, Tag, Report
+from .models import Category, Post, Comment, Tag, Report, recount_reports
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ('name', 'slug', 'created_at')
+    list_display = ('name', 'slug', 'published_post_count', 'created_at')
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ('name', 'description')
     date_hierarchy = 'created_at'
@@ -20,14 +20,14 @@ class CommentInline(admin.TabularInline):
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'category', 'status', 'published_at', 
-                   'language', 'fact_checked', 'view_count', 'comment_count')
+                   'language', 'fact_checked', 'view_count', 'comment_count', 'report_count')
     list_filter = ('status', 'created_at', 'published_at', 'category', 'language', 'fact_checked')
     search_fields = ('title', 'content', 'summary', 'location')
     prepopulated_fields = {'slug': ('title',)}
     raw_id_fields = ('author',)
     date_hierarchy = 'published_at'
     ordering = ('-published_at', '-created_at')
-    readonly_fields = ('created_at', 'updated_at', 'published_at', 'views')
+    readonly_fields = ('created_at', 'updated_at', 'published_at', 'views', 'upvote_count', 'report_count')
     filter_horizontal = ('upvotes',)
     inlines = [CommentInline]
     
@@ -44,7 +44,7 @@ class PostAdmin(admin.ModelAdmin):
             'fields': ('fact_checked', 'fact_check_notes')
         }),
         ('Community Engagement', {
-            'fields': ('upvotes',)
+            'fields': ('upvote_count', 'upvotes', 'report_count')
         })
     )
     
@@ -59,7 +59,7 @@ class PostAdmin(admin.ModelAdmin):
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
-    list_display = ('author', 'post', 'short_content', 'created_at', 'active', 'is_reply')
+    list_display = ('author', 'post', 'short_content', 'created_at', 'active', 'is_reply', 'report_count')
     list_filter = ('active', 'created_at', 'updated_at')
     search_fields = ('author__username', 'content', 'post__title')
     raw_id_fields = ('author', 'post', 'parent')
@@ -99,10 +99,10 @@ class TagAdmin(admin.ModelAdmin):
 
 @admin.register(Report)
 class ReportAdmin(admin.ModelAdmin):
-    list_display = ('id', 'reporter', 'report_target', 'reason', 'created_at', 'resolved')
+    list_display = ('id', 'reporter', 'report_target', 'reason', 'created_at', 'resolved', 'triage_score')
     list_filter = ('reason', 'resolved', 'created_at')
     search_fields = ('reporter__username', 'details')
-    readonly_fields = ('reporter', 'post', 'comment', 'created_at')
+    readonly_fields = ('reporter', 'post', 'comment', 'created_at', 'triaged_at', 'triage_score', 'triage_notes')
     date_hierarchy = 'created_at'
     actions = ['mark_resolved', 'mark_unresolved']
     
@@ -114,12 +114,19 @@ class ReportAdmin(admin.ModelAdmin):
         return "Unknown"
     report_target.short_description = 'Reported Content'
     
+    def recount_targets(self, queryset):
+        # Queryset updates skip forum.signals, so recount the reported content here
+        recount_reports(Post, set(queryset.exclude(post=None).values_list('post_id', flat=True)))
+        recount_reports(Comment, set(queryset.exclude(comment=None).values_list('comment_id', flat=True)))
+    
     def mark_resolved(self, request, queryset):
         updated = queryset.update(resolved=True)
+        self.recount_targets(queryset)
         self.message_user(request, f'{updated} reports have been marked as resolved.')
     mark_resolved.short_description = 'Mark selected reports as resolved'
     
     def mark_unresolved(self, request, queryset):
         updated = queryset.update(resolved=False)
+        self.recount_targets(queryset)
         self.message_user(request, f'{updated} reports have been marked as unresolved.')
     mark_unresolved.short_description = 'Mark selected reports as unresolved'
\ No newline at end of file
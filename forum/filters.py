@@ -10,7 +10,7 @@ class PostFilter(django_filters.FilterSet):
     tags = django_filters.CharFilter(field_name='tags__name', lookup_expr='icontains')
     created_after = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='gte')
     created_before = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='lte')
-    upvotes_min = django_filters.NumberFilter(field_name='upvotes', lookup_expr='count__gte')
+    upvotes_min = django_filters.NumberFilter(field_name='upvote_count', lookup_expr='gte')
     
     class Meta:
         model = Post
@@ -23,6 +23,8 @@ class PostFilter(django_filters.FilterSet):
 
 class CommentFilter(django_filters.FilterSet):
     """Filter set for comments"""
+    # ?parent=null lists top-level comments, i.e. one per thread
+    parent = django_filters.ModelChoiceFilter(queryset=Comment.objects.all(), null_label='Top level', null_value='null')
     content = django_filters.CharFilter(lookup_expr='icontains')
     created_after = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='gte')
     created_before = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='lte')
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0002_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-created_at', '-id'], name='forum_post_created_id_idx'),
+        ),
+    ]
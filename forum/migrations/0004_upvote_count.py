@@ -0,0 +1,41 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:49
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_upvote_counts(apps, schema_editor):
+    """Count the votes already in the through tables into the new columns"""
+    for name in ('Post', 'Comment'):
+        model = apps.get_model('forum', name)
+        owner = name.lower()
+        votes = model.upvotes.through.objects.filter(**{owner: OuterRef('pk')}).order_by().values(owner)
+        model.objects.update(upvote_count=Coalesce(
+            Subquery(votes.annotate(n=Count('pk')).values('n')), Value(0)
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='upvote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='upvote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-upvote_count', '-id'], name='forum_post_upvotes_id_idx'),
+        ),
+        migrations.RunPython(backfill_upvote_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_threads(apps, schema_editor):
+    """Fill in thread and path for existing comments (parents are older than their replies)"""
+    Comment = apps.get_model('forum', 'Comment')
+    placed = {}
+    batch = []
+    for comment in Comment.objects.order_by('pk').only('pk', 'parent_id').iterator(chunk_size=2000):
+        thread_id, parent_path = placed.get(comment.parent_id, (comment.pk, ''))
+        comment.thread_id = thread_id
+        comment.path = parent_path + f'{comment.pk:019d}'
+        placed[comment.pk] = (thread_id, comment.path)
+        batch.append(comment)
+        if len(batch) >= 2000:
+            Comment.objects.bulk_update(batch, ['thread', 'path'])
+            batch = []
+    if batch:
+        Comment.objects.bulk_update(batch, ['thread', 'path'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0004_upvote_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='thread',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='forum.comment'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['thread', 'path'], name='forum_comment_thread_idx'),
+        ),
+        migrations.RunPython(backfill_threads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_published_post_counts(apps, schema_editor):
+    """Count each category's published posts into the new column"""
+    Category = apps.get_model('forum', 'Category')
+    Post = apps.get_model('forum', 'Post')
+    published = Post.objects.filter(category=OuterRef('pk'), status='published').order_by().values('category')
+    Category.objects.update(published_post_count=Coalesce(
+        Subquery(published.annotate(n=Count('pk')).values('n')), Value(0)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0005_comment_thread_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_published_post_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:59
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_report_counts(apps, schema_editor):
+    """Mark existing reports as counted (they were acted on when filed) and count the open ones into the new columns"""
+    Report = apps.get_model('forum', 'Report')
+    Report.objects.update(triaged_at=F('created_at'))
+    for name in ('Post', 'Comment'):
+        model = apps.get_model('forum', name)
+        owner = name.lower()
+        reports = Report.objects.filter(**{owner: OuterRef('pk')}, resolved=False).order_by().values(owner)
+        model.objects.update(report_count=Coalesce(
+            Subquery(reports.annotate(n=Count('pk')).values('n')), Value(0)
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0006_category_published_post_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='report_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='report_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='triage_notes',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='triage_score',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='triaged_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(condition=models.Q(('triaged_at__isnull', True)), fields=['id'], name='forum_report_queue_idx'),
+        ),
+        migrations.RunPython(backfill_report_counts, migrations.RunPython.noop),
+    ]
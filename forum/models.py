@@ -1,17 +1,30 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, OuterRef, Q, Subquery, Value, Case, When
+from django.db.models.functions import Coalesce
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.utils.text import slugify
 from django.urls import reverse
 
+from core.search import is_full_text_available, search_config
+from core.threads import ThreadMixin
+
 User = get_user_model()
 
+# Post.language codes mapped to the language keys used by SEARCH_CONFIGS
+SEARCH_LANGUAGES = {'en': 'en', 'sw': 'sw', 'sh': 'sheng'}
+
 class Category(models.Model):
     """Category model for forum posts"""
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained by Post.save and forum.signals; reconciled by forum.tasks.recount_category_posts
+    published_post_count = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         verbose_name_plural = "Categories"
@@ -29,7 +42,110 @@ class Category(models.Model):
         return reverse('forum:category_detail', kwargs={'slug': self.slug})
 
 
-class Post(models.Model):
+def counted_category(post):
+    """The category a post counts towards (published posts only), or None."""
+    return post.category_id if post.status == 'published' else None
+
+
+def adjust_published_count(category_id, delta):
+    if category_id is not None:
+        Category.objects.filter(pk=category_id).update(published_post_count=F('published_post_count') + delta)
+
+
+def recount_published_posts(category_ids=None):
+    """Recompute stored published-post counts (of the given categories) from the posts."""
+    published = Post.objects.filter(category=OuterRef('pk'), status='published').order_by().values('category')
+    categories = Category.objects.all() if category_ids is None else Category.objects.filter(pk__in=category_ids)
+    return categories.update(published_post_count=Coalesce(
+        Subquery(published.annotate(n=models.Count('pk')).values('n')), Value(0)
+    ))
+
+
+class UpvoteMixin:
+    """
+    Upvotes stored in the model's ``upvotes`` M2M with a denormalized
+    ``upvote_count``. The count is kept in step by toggle_upvote() and, for
+    other writes to the M2M (admin, scripts), by forum.signals.
+    """
+    
+    def toggle_upvote(self, user):
+        """
+        Add the user's upvote or take it back, touching only this user's row
+        of the through table. Returns whether the user now upvotes it.
+        """
+        through = type(self).upvotes.through
+        owner = {f'{self._meta.model_name}_id': self.pk, 'user_id': user.pk}
+        with transaction.atomic():
+            # Through querysets delete without m2m_changed, so the signal does not count twice
+            if through.objects.filter(**owner).delete()[0]:
+                delta = -1
+            else:
+                try:
+                    with transaction.atomic():
+                        through.objects.create(**owner)
+                except IntegrityError:
+                    # A concurrent request by the same user added it first
+                    return True
+                delta = 1
+            type(self).objects.filter(pk=self.pk).update(upvote_count=F('upvote_count') + delta)
+        self.upvote_count = max(self.upvote_count + delta, 0)
+        return delta > 0
+
+
+def recount_upvotes(model, pks=None):
+    """Recompute stored upvote counts (of the given rows) from the through table."""
+    through = model.upvotes.through
+    owner = model._meta.model_name
+    votes = through.objects.filter(**{owner: OuterRef('pk')}).order_by().values(owner)
+    queryset = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+    return queryset.update(upvote_count=Coalesce(
+        Subquery(votes.annotate(n=models.Count('pk')).values('n')), Value(0)
+    ))
+
+
+def recount_reports(model, pks=None):
+    """Recompute stored open-report counts (of the given rows) from the counted, unresolved reports."""
+    owner = model._meta.model_name
+    reports = Report.objects.filter(
+        **{owner: OuterRef('pk')}, resolved=False, triaged_at__isnull=False
+    ).order_by().values(owner)
+    queryset = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+    return queryset.update(report_count=Coalesce(
+        Subquery(reports.annotate(n=models.Count('pk')).values('n')), Value(0)
+    ))
+
+
+class PostQuerySet(models.QuerySet):
+    """QuerySet helpers for forum posts"""
+    
+    def update_search_vector(self):
+        """
+        Rebuild the full-text search vector for these posts in one UPDATE,
+        using the text search configuration of each post's language and
+        folding tag names in so searches don't need to join tags.
+        """
+        if not is_full_text_available():
+            return 0
+        config = Case(
+            *[When(language=code, then=Value(search_config(lang)))
+              for code, lang in SEARCH_LANGUAGES.items()],
+            default=Value('simple'),
+        )
+        tag_names = Subquery(
+            Tag.objects.filter(posts=OuterRef('pk'))
+            .order_by().values('posts')
+            .annotate(names=StringAgg('name', delimiter=' '))
+            .values('names')
+        )
+        return self.update(search_vector=(
+            SearchVector('title', weight='A', config=config)
+            + SearchVector('summary', weight='B', config=config)
+            + SearchVector('content', weight='C', config=config)
+            + SearchVector('location', Coalesce(tag_names, Value('')), weight='D', config='simple')
+        ))
+
+
+class Post(UpvoteMixin, models.Model):
     """Post model for user-generated news content"""
     STATUS_CHOICES = (
         ('draft', 'Draft'),
@@ -61,16 +177,29 @@ class Post(models.Model):
     
     # Fields for community engagement
     upvotes = models.ManyToManyField(User, related_name='upvoted_posts', blank=True)
+    upvote_count = models.PositiveIntegerField(default=0, editable=False)
     views = models.PositiveIntegerField(default=0)
+    # Unresolved reports, counted by the moderation worker (see forum.moderation)
+    report_count = models.PositiveIntegerField(default=0, editable=False)
     
     # For media attachments
     image = models.ImageField(upload_to='forum/posts/%Y/%m/%d/', blank=True, null=True)
     
+    # Full-text search, maintained by forum.signals
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    objects = PostQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-published_at', '-created_at']
         indexes = [
             models.Index(fields=['-published_at']),
             models.Index(fields=['status']),
+            GinIndex(fields=['search_vector'], name='forum_post_search_vector_gin'),
+            # Keyset pagination seeks on (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='forum_post_created_id_idx'),
+            # ?ordering=-upvote_count, with the id as keyset tie-breaker
+            models.Index(fields=['-upvote_count', '-id'], name='forum_post_upvotes_id_idx'),
         ]
     
     def __str__(self):
@@ -82,8 +211,25 @@ class Post(models.Model):
         
         if self.status == 'published' and not self.published_at:
             self.published_at = timezone.now()
-            
-        super().save(*args, **kwargs)
+        
+        with transaction.atomic():
+            row = None
+            if not self._state.adding:
+                # The stored row, not this instance, may be stale; lock it so
+                # concurrent saves move the count one after the other
+                row = Post.objects.select_for_update().filter(pk=self.pk).values('status', 'category_id').first()
+            super().save(*args, **kwargs)
+            status, category_id = self.status, self.category_id
+            written = kwargs.get('update_fields')
+            if row is not None and written is not None:
+                # Fields this save did not write keep their stored values
+                status = status if 'status' in written else row['status']
+                category_id = category_id if 'category' in written else row['category_id']
+            previous = row['category_id'] if row and row['status'] == 'published' else None
+            current = category_id if status == 'published' else None
+            if previous != current:
+                adjust_published_count(previous, -1)
+                adjust_published_count(current, 1)
     
     def get_absolute_url(self):
         return reverse('forum:post_detail', kwargs={
@@ -92,17 +238,18 @@ class Post(models.Model):
             'day': self.created_at.day,
             'slug': self.slug
         })
-    
-    @property
-    def upvote_count(self):
-        return self.upvotes.count()
 
 
-class Comment(models.Model):
+class Comment(UpvoteMixin, ThreadMixin, models.Model):
     """Comment model for discussions on posts"""
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='forum_comments')
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
+    # Top-level comment and materialized path, set on first save (see core.threads)
+    thread = models.ForeignKey(
+        'self', on_delete=models.CASCADE, null=True, blank=True, related_name='+', editable=False, db_index=False
+    )
+    path = models.TextField(blank=True, editable=False)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -110,16 +257,18 @@ class Comment(models.Model):
     
     # For community engagement
     upvotes = models.ManyToManyField(User, related_name='upvoted_comments', blank=True)
+    upvote_count = models.PositiveIntegerField(default=0, editable=False)
+    # Unresolved reports, counted by the moderation worker (see forum.moderation)
+    report_count = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['thread', 'path'], name='forum_comment_thread_idx'),
+        ]
     
     def __str__(self):
         return f'Comment by {self.author.username} on {self.post}'
-    
-    @property
-    def upvote_count(self):
-        return self.upvotes.count()
 
 
 class Tag(models.Model):
@@ -155,6 +304,16 @@ class Report(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     resolved = models.BooleanField(default=False)
     resolution_notes = models.TextField(blank=True)
+    # Set by the moderation worker once the report is counted (see forum.moderation)
+    triaged_at = models.DateTimeField(null=True, blank=True, editable=False)
+    triage_score = models.FloatField(null=True, blank=True, editable=False)
+    triage_notes = models.TextField(blank=True, editable=False)
+    
+    class Meta:
+        indexes = [
+            # The moderation queue: reports not counted yet
+            models.Index(fields=['id'], condition=Q(triaged_at__isnull=True), name='forum_report_queue_idx'),
+        ]
     
     def __str__(self):
         if self.post:
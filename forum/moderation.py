@@ -0,0 +1,130 @@
+"""
+Moderation queue for forum reports.
+
+Filing a report is one INSERT: forum.signals queues it for the
+``moderate_reports`` task (forum.tasks) on commit, and a periodic sweep
+picks up reports the queue lost. A report is pending until the worker sets
+its ``triaged_at``, so the pending reports are the queue itself and a
+report is counted once however often it is delivered.
+
+The worker, per batch:
+
+1. claims pending reports (concurrent workers skip locked rows) and adds
+   them to the ``report_count`` of their posts and comments, one UPDATE
+   per distinct increment;
+2. flags published posts and deactivates comments whose count reached
+   FORUM_POST_REPORT_THRESHOLD / FORUM_COMMENT_REPORT_THRESHOLD;
+3. triages the batch with the AI models once the claim has committed, so
+   no row stays locked during inference: misinformation reports on posts
+   are matched against fact-checked claims (news.fact_checks), with the
+   best similarity as ``triage_score`` and the matched verdicts as
+   ``triage_notes`` for moderators.
+
+Resolving or deleting reports recounts their targets (recount_reports).
+"""
+import logging
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from news.fact_checks import get_index, match_text
+from .models import Comment, Post, Report
+
+logger = logging.getLogger(__name__)
+
+TRIAGE_REASONS = {'misinformation'}
+TRIAGE_MATCHES = 3  # fact-checks noted per report
+
+
+def add_report_counts(model, target_ids):
+    """Add one to the report count of each target id, per occurrence."""
+    by_increment = defaultdict(list)
+    for pk, n in Counter(target_ids).items():
+        by_increment[n].append(pk)
+    for n, pks in by_increment.items():
+        model.objects.filter(pk__in=pks).update(report_count=F('report_count') + n)
+
+
+def apply_thresholds(post_ids, comment_ids):
+    """Flag and deactivate the given targets that have too many open reports. Returns how many."""
+    acted = 0
+    posts = Post.objects.filter(
+        pk__in=post_ids, status='published', report_count__gte=settings.FORUM_POST_REPORT_THRESHOLD
+    )
+    for post in posts:
+        post.status = 'flagged'
+        post.save(update_fields=['status'])
+        logger.warning(f"Post {post.pk} auto-flagged due to {post.report_count} reports")
+        acted += 1
+
+    comments = Comment.objects.filter(
+        pk__in=comment_ids, active=True, report_count__gte=settings.FORUM_COMMENT_REPORT_THRESHOLD
+    )
+    for comment in comments:
+        comment.active = False
+        comment.save(update_fields=['active'])
+        logger.warning(f"Comment {comment.pk} auto-deactivated due to {comment.report_count} reports")
+        acted += 1
+    return acted
+
+
+def claim_reports(report_ids=None, limit=None):
+    """
+    Count a batch of pending reports (of the given ids) into their targets,
+    act on the thresholds and mark the reports triaged. Returns the batch.
+    """
+    with transaction.atomic():
+        pending = Report.objects.select_for_update(skip_locked=True).filter(triaged_at__isnull=True)
+        if report_ids is not None:
+            pending = pending.filter(pk__in=report_ids)
+        reports = list(pending.order_by('pk')[:limit or settings.FORUM_MODERATION_BATCH_SIZE])
+        if not reports:
+            return []
+
+        Report.objects.filter(pk__in=[report.pk for report in reports]).update(triaged_at=timezone.now())
+        open_reports = [report for report in reports if not report.resolved]
+        post_ids = [report.post_id for report in open_reports if report.post_id]
+        comment_ids = [report.comment_id for report in open_reports if report.comment_id]
+        add_report_counts(Post, post_ids)
+        add_report_counts(Comment, comment_ids)
+        apply_thresholds(set(post_ids), set(comment_ids))
+    return reports
+
+
+def triage(reports):
+    """Score misinformation reports on posts against fact-checked claims. Returns the number scored."""
+    reports = [report for report in reports if report.reason in TRIAGE_REASONS and report.post_id]
+    if not reports or get_index() is None:
+        return 0
+
+    posts = Post.objects.only('title', 'content').in_bulk({report.post_id for report in reports})
+    scored = 0
+    for pk, post in posts.items():
+        matches = match_text(f'{post.title}. {post.content}', k=TRIAGE_MATCHES)[:TRIAGE_MATCHES]
+        scored += Report.objects.filter(pk__in=[report.pk for report in reports if report.post_id == pk]).update(
+            triage_score=matches[0][2] if matches else 0.0,
+            triage_notes='\n'.join(
+                f'{fact_check.get_verdict_display()} ({score:.2f}): {fact_check.claim}'
+                for _, fact_check, score in matches
+            ),
+        )
+    return scored
+
+
+def moderate(report_ids=None):
+    """Work through the pending reports (of the given ids) batch by batch. Returns the number moderated."""
+    moderated = 0
+    while True:
+        reports = claim_reports(report_ids)
+        if not reports:
+            break
+        moderated += len(reports)
+        try:
+            triage(reports)
+        except Exception as e:
+            # Triage only informs moderators; the counts and actions are in
+            logger.warning(f"Could not triage {len(reports)} reports: {e}")
+    return moderated
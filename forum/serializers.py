@@ -2,9 +2,22 @@ from rest_framework import serializers
 from .models import Category, Post, Comment, Tag, Report
 from django.contrib.auth import get_user_model
 
+from core.threads import ThreadListSerializer, replies_of
+from core.viewer_state import ViewerStateListSerializer, ViewerStateMixin
+
 User = get_user_model()
 
 
+def upvoted_post_ids(user, post_ids):
+    return Post.upvotes.through.objects.filter(user=user, post_id__in=post_ids).values_list('post_id', flat=True)
+
+
+def upvoted_comment_ids(user, comment_ids):
+    return Comment.upvotes.through.objects.filter(
+        user=user, comment_id__in=comment_ids
+    ).values_list('comment_id', flat=True)
+
+
 class UserBriefSerializer(serializers.ModelSerializer):
     """Brief user information for nested serialization"""
     class Meta:
@@ -22,26 +35,26 @@ class TagSerializer(serializers.ModelSerializer):
 
 class CategorySerializer(serializers.ModelSerializer):
     """Serializer for post categories"""
-    post_count = serializers.SerializerMethodField()
+    post_count = serializers.IntegerField(source='published_post_count', read_only=True)
     
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug', 'description', 'created_at', 'post_count']
         read_only_fields = ['slug', 'created_at', 'post_count']
-    
-    def get_post_count(self, obj):
-        return obj.posts.filter(status='published').count()
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(ViewerStateMixin, serializers.ModelSerializer):
     """Serializer for post comments"""
     author = UserBriefSerializer(read_only=True)
     upvote_count = serializers.IntegerField(read_only=True)
     is_upvoted = serializers.SerializerMethodField()
     replies = serializers.SerializerMethodField()
     
+    viewer_relations = {'upvoted_comments': upvoted_comment_ids}
+    
     class Meta:
         model = Comment
+        list_serializer_class = ThreadListSerializer
         fields = [
             'id', 'post', 'author', 'parent', 'content', 
             'created_at', 'updated_at', 'active', 
@@ -50,15 +63,15 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at', 'active', 'upvote_count']
     
     def get_is_upvoted(self, obj):
-        user = self.context.get('request').user
-        if user.is_authenticated:
-            return user in obj.upvotes.all()
-        return False
+        return self.viewer_flag('upvoted_comments', obj)
+    
+    def get_reply_queryset(self):
+        return Comment.objects.filter(active=True).select_related('author')
     
     def get_replies(self, obj):
-        if obj.replies.exists():
-            return CommentBriefSerializer(obj.replies.filter(active=True), many=True).data
-        return []
+        # Loaded with the rest of the page's threads, at any depth
+        replies = replies_of(obj, self.get_reply_queryset())
+        return CommentSerializer(replies, many=True, context=self.context).data
     
     def create(self, validated_data):
         user = self.context.get('request').user
@@ -69,16 +82,7 @@ class CommentSerializer(serializers.ModelSerializer):
         return comment
 
 
-class CommentBriefSerializer(serializers.ModelSerializer):
-    """Brief comment serializer for nested replies"""
-    author = UserBriefSerializer(read_only=True)
-    
-    class Meta:
-        model = Comment
-        fields = ['id', 'author', 'content', 'created_at', 'upvote_count']
-
-
-class PostListSerializer(serializers.ModelSerializer):
+class PostListSerializer(ViewerStateMixin, serializers.ModelSerializer):
     """Serializer for listing posts"""
     author = UserBriefSerializer(read_only=True)
     category_name = serializers.ReadOnlyField(source='category.name')
@@ -86,15 +90,19 @@ class PostListSerializer(serializers.ModelSerializer):
     upvote_count = serializers.IntegerField(read_only=True)
     is_upvoted = serializers.SerializerMethodField()
     tags = TagSerializer(many=True, read_only=True)
+    search_highlight = serializers.SerializerMethodField()
+    
+    viewer_relations = {'upvoted_posts': upvoted_post_ids}
     
     class Meta:
         model = Post
+        list_serializer_class = ViewerStateListSerializer
         fields = [
             'id', 'title', 'slug', 'author', 'category', 'category_name',
             'summary', 'created_at', 'published_at', 'status',
             'location', 'fact_checked', 'language',
             'upvote_count', 'views', 'image', 'comment_count',
-            'is_upvoted', 'tags'
+            'is_upvoted', 'tags', 'search_highlight'
         ]
         read_only_fields = [
             'slug', 'created_at', 'published_at', 'views', 
@@ -105,10 +113,11 @@ class PostListSerializer(serializers.ModelSerializer):
         return obj.comments.filter(active=True).count()
     
     def get_is_upvoted(self, obj):
-        user = self.context.get('request').user
-        if user.is_authenticated:
-            return user in obj.upvotes.all()
-        return False
+        return self.viewer_flag('upvoted_posts', obj)
+    
+    def get_search_highlight(self, obj):
+        # Only present when the queryset went through FullTextSearchFilter
+        return getattr(obj, 'search_headline', None)
 
 
 class PostDetailSerializer(PostListSerializer):
@@ -119,8 +128,8 @@ class PostDetailSerializer(PostListSerializer):
         fields = PostListSerializer.Meta.fields + ['content', 'fact_check_notes', 'comments']
     
     def get_comments(self, obj):
-        # Only get top-level comments (no parent)
-        comments = obj.comments.filter(active=True, parent=None)
+        # Top-level comments; their whole threads load in one more query
+        comments = obj.comments.filter(active=True, parent=None).select_related('author')
         return CommentSerializer(comments, many=True, context=self.context).data
 
 
@@ -1,7 +1,13 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_delete, m2m_changed
 from django.dispatch import receiver
-from django.utils.text import Truncator
-from .models import Post, Comment, Report
+from django.db import transaction
+from core.cache import invalidate
+from core.conditional import touch_owners
+from .models import (
+    Category, Post, Comment, Report, Tag, adjust_published_count, counted_category, recount_reports,
+    recount_upvotes,
+)
+from .tasks import moderate_reports, summarize_posts
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,39 +16,136 @@ logger = logging.getLogger(__name__)
 @receiver(post_save, sender=Post)
 def create_post_summary(sender, instance, created, **kwargs):
     """
-    Auto-generate a summary for the post if it doesn't have one
+    Queue a summary for the post if it doesn't have one. The model runs in
+    a worker (forum.tasks.summarize_posts); posts the queue misses are
+    picked up by its periodic sweep.
     """
     if not instance.summary and instance.content:
-        # Create a simple summary by truncating the content
-        # In a production system, you might want to use an AI-based summarization here
-        instance.summary = Truncator(instance.content).words(30)
-        # Use update to avoid triggering the signal again
-        Post.objects.filter(pk=instance.pk).update(summary=instance.summary)
-        logger.info(f"Generated summary for post {instance.pk}")
+        def enqueue():
+            try:
+                summarize_posts.delay([instance.pk])
+            except Exception as e:
+                logger.warning(f"Could not queue summary for post {instance.pk}: {e}")
+
+        transaction.on_commit(enqueue)
+
+
+@receiver(pre_delete, sender=Post)
+def read_counted_category(sender, instance, **kwargs):
+    """Note what the stored row counts towards; the instance may be stale."""
+    row = Post.objects.filter(pk=instance.pk).values('status', 'category_id').first()
+    instance._counted_category = row['category_id'] if row and row['status'] == 'published' else None
+
+
+@receiver(post_delete, sender=Post)
+def update_category_count_on_delete(sender, instance, **kwargs):
+    """
+    Take a deleted published post out of its category's count (Post.save
+    moves the count on status and category changes).
+    """
+    adjust_published_count(getattr(instance, '_counted_category', counted_category(instance)), -1)
+
+
+@receiver(post_save, sender=Post)
+def update_post_search_vector(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the full-text search vector in step with the post text.
+    """
+    if update_fields is not None and not {'title', 'summary', 'content', 'location', 'language'} & set(update_fields):
+        return
+    Post.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver(m2m_changed, sender=Tag.posts.through)
+def update_tagged_posts_search_vector(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Re-index posts whose tags changed
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # post.tags.add(...): instance is the post
+        Post.objects.filter(pk=instance.pk).update_search_vector()
+    elif pk_set:
+        # tag.posts.add(...): pk_set holds post ids
+        Post.objects.filter(pk__in=pk_set).update_search_vector()
+
+
+@receiver(m2m_changed, sender=Tag.posts.through)
+def touch_tagged_posts(sender, **kwargs):
+    """
+    Tags render in the post, so changing them moves its updated_at (and
+    with it the detail ETag)
+    """
+    touch_owners(Post, sender, **kwargs)
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_versions(sender, **kwargs):
+    invalidate('forum-categories')
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_tag_versions(sender, **kwargs):
+    invalidate('forum-tags')
+
+
+@receiver(m2m_changed, sender=Post.upvotes.through)
+@receiver(m2m_changed, sender=Comment.upvotes.through)
+def update_upvote_count(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    Keep stored upvote counts in step when the M2M is written directly
+    (admin, scripts). The API toggles through UpvoteMixin.toggle_upvote,
+    which updates the count itself and sends no signal.
+    """
+    if action == 'pre_clear' and reverse:
+        # user.upvoted_posts.clear(): remember which rows lose a vote
+        instance._upvote_clear_pks = set(model.objects.filter(upvotes=instance).values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        # post.upvotes.add(...): instance is the upvoted post or comment
+        recount_upvotes(type(instance), [instance.pk])
+    elif action == 'post_clear':
+        recount_upvotes(model, getattr(instance, '_upvote_clear_pks', ()))
+    elif pk_set:
+        # user.upvoted_posts.add(...): pk_set holds post or comment ids
+        recount_upvotes(model, pk_set)
 
 
 @receiver(post_save, sender=Report)
 def handle_report_creation(sender, instance, created, **kwargs):
     """
-    Process new report submissions
+    Queue new reports for the moderation worker (forum.tasks.moderate_reports),
+    which counts them and flags content over the thresholds; reports the
+    queue misses are picked up by its periodic sweep. Changes to existing
+    reports (resolving them) recount their target.
     """
     if created:
-        # Log the report
-        target = f"post '{instance.post.title}'" if instance.post else f"comment by {instance.comment.author}"
-        logger.info(f"New {instance.reason} report by {instance.reporter} on {target}")
-        
-        # You could implement auto-moderation here
-        # For example, flag content after a certain number of reports
-        if instance.post:
-            report_count = Report.objects.filter(post=instance.post, resolved=False).count()
-            if report_count >= 5:  # Threshold for auto-flagging
-                instance.post.status = 'flagged'
-                instance.post.save(update_fields=['status'])
-                logger.warning(f"Post {instance.post.pk} auto-flagged due to {report_count} reports")
-        
-        elif instance.comment:
-            report_count = Report.objects.filter(comment=instance.comment, resolved=False).count()
-            if report_count >= 3:  # Lower threshold for comments
-                instance.comment.active = False
-                instance.comment.save(update_fields=['active'])
-                logger.warning(f"Comment {instance.comment.pk} auto-deactivated due to {report_count} reports")
\ No newline at end of file
+        target = f"post {instance.post_id}" if instance.post_id else f"comment {instance.comment_id}"
+        logger.info(f"New {instance.reason} report by user {instance.reporter_id} on {target}")
+
+        def enqueue():
+            try:
+                moderate_reports.delay([instance.pk])
+            except Exception as e:
+                logger.warning(f"Could not queue report {instance.pk} for moderation: {e}")
+
+        transaction.on_commit(enqueue)
+    else:
+        recount_report_target(instance)
+
+
+@receiver(post_delete, sender=Report)
+def update_report_count_on_delete(sender, instance, **kwargs):
+    """Take a deleted report out of its target's count."""
+    recount_report_target(instance)
+
+
+def recount_report_target(report):
+    # Only counted reports are included, so this is right for pending ones too
+    if report.post_id:
+        recount_reports(Post, [report.post_id])
+    elif report.comment_id:
+        recount_reports(Comment, [report.comment_id])
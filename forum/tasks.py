@@ -0,0 +1,56 @@
+import logging
+
+from celery import shared_task
+
+from django.conf import settings
+
+from core.ai import summarizer
+from . import moderation
+from .models import Post, recount_published_posts
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def summarize_posts(post_ids=None):
+    """
+    Summarize posts that have no summary yet: the given ones (enqueued on
+    save) or, from beat, any that were missed.
+    """
+    posts = Post.objects.filter(summary='').exclude(content='')
+    if post_ids is not None:
+        posts = posts.filter(pk__in=post_ids)
+    posts = list(posts.order_by('pk').only('pk', 'content', 'summary')[:settings.SUMMARIZE_POSTS_LIMIT])
+    if not posts:
+        return 0
+
+    for post, summary in zip(posts, summarizer.summarize([post.content for post in posts])):
+        post.summary = summary
+    # bulk_update skips post_save; refresh the search vectors it would have
+    Post.objects.bulk_update(posts, ['summary'])
+    Post.objects.filter(pk__in=[post.pk for post in posts]).update_search_vector()
+    logger.info(f"Summarized {len(posts)} posts")
+    return len(posts)
+
+
+@shared_task
+def recount_category_posts():
+    """
+    Reconcile the stored published-post counts of every category, e.g. after
+    bulk status updates that bypassed Post.save.
+    """
+    updated = recount_published_posts()
+    logger.info(f"Recounted published posts of {updated} categories")
+    return updated
+
+
+@shared_task
+def moderate_reports(report_ids=None):
+    """
+    Count reports into their targets and act on the thresholds: the given
+    ones (queued on creation) or, from beat, any the queue missed.
+    """
+    moderated = moderation.moderate(report_ids)
+    if moderated:
+        logger.info(f"Moderated {moderated} reports")
+    return moderated
@@ -1,9 +1,13 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from unittest.mock import patch
 from rest_framework.test import APITestCase
 from rest_framework import status
-from .models import Category, Post, Comment, Tag
+from .models import Category, Post, Comment, Report, Tag
+from .tasks import moderate_reports, recount_category_posts
 
 User = get_user_model()
 
@@ -68,6 +72,7 @@ class ForumModelTests(TestCase):
         self.assertIn(self.tag, self.post.tags.all())
 
 
+@override_settings(COUNTERS_LOCAL_FLUSH_INTERVAL=0)
 class ForumAPITests(APITestCase):
     """Tests for forum API endpoints"""
     
@@ -111,7 +116,7 @@ class ForumAPITests(APITestCase):
         url = reverse('forum:post-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(len(response.data['results']), 1)
     
     def test_post_detail(self):
         """Test retrieving post detail"""
@@ -163,7 +168,7 @@ class ForumAPITests(APITestCase):
         url = reverse('forum:comment-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(len(response.data['results']), 1)
     
     def test_create_comment(self):
         """Test creating a comment"""
@@ -183,4 +188,355 @@ class ForumAPITests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['name'], 'TestTag')
\ No newline at end of file
+        self.assertEqual(response.data[0]['name'], 'TestTag')
+
+@override_settings(COUNTERS_LOCAL_FLUSH_INTERVAL=0)
+class UpvoteCounterTests(APITestCase):
+    """Upvote counts are stored on the row and toggled without loading the voters"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(email='voter@example.com', password='testpass123')
+        self.other = User.objects.create_user(email='other@example.com', password='testpass123')
+        self.category = Category.objects.create(name='Politics')
+        self.post = Post.objects.create(
+            title='Ward meeting', content='Budget priorities for the ward',
+            author=self.other, category=self.category, status='published', summary='Budget priorities',
+        )
+        self.popular = Post.objects.create(
+            title='Water rationing', content='New schedule for the estate',
+            author=self.other, category=self.category, status='published', summary='New schedule',
+        )
+        self.comment = Comment.objects.create(post=self.post, author=self.other, content='Agreed')
+    
+    def test_non_numeric_post_id_is_not_found(self):
+        response = self.client.get(reverse('forum:post-detail', args=['abc']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_tag_and_category_changes_change_the_post_etag(self):
+        url = reverse('forum:post-detail', args=[self.post.id])
+        tag = Tag.objects.create(name='Budget')
+        changes = [
+            lambda: self.post.tags.add(tag),
+            lambda: Tag.objects.filter(pk=tag.pk).first().save(),
+            lambda: Category.objects.get(pk=self.category.pk).save(),
+        ]
+        etag = self.client.get(url)['ETag']
+        for change in changes:
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response['ETag']
+        self.assertEqual(response.data['tags'][0]['name'], 'Budget')
+    
+    def test_toggling_a_post_upvote_updates_the_stored_count(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse('forum:post-upvote', args=[self.post.id])
+        
+        response = self.client.post(url)
+        self.assertEqual(response.data, {'status': 'upvoted', 'upvote_count': 1})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.upvote_count, 1)
+        self.assertTrue(self.post.upvotes.filter(pk=self.user.pk).exists())
+        
+        response = self.client.post(url)
+        self.assertEqual(response.data, {'status': 'upvote removed', 'upvote_count': 0})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.upvote_count, 0)
+        self.assertFalse(self.post.upvotes.exists())
+    
+    def test_toggling_a_comment_upvote_updates_the_stored_count(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse('forum:comment-upvote', args=[self.comment.id]))
+        self.assertEqual(response.data['upvote_count'], 1)
+        
+        response = self.client.get(reverse('forum:comment-detail', args=[self.comment.id]))
+        self.assertEqual(response.data['upvote_count'], 1)
+    
+    def test_direct_m2m_writes_keep_counts_in_step(self):
+        self.popular.upvotes.add(self.user, self.other)
+        self.user.upvoted_posts.add(self.post)
+        self.user.upvoted_comments.add(self.comment)
+        self.assertEqual(Post.objects.get(pk=self.popular.pk).upvote_count, 2)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).upvote_count, 1)
+        self.assertEqual(Comment.objects.get(pk=self.comment.pk).upvote_count, 1)
+        
+        self.user.upvoted_posts.clear()
+        self.popular.upvotes.remove(self.other)
+        self.assertEqual(Post.objects.get(pk=self.popular.pk).upvote_count, 0)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).upvote_count, 0)
+    
+    def test_posts_sort_and_filter_by_stored_count(self):
+        self.popular.upvotes.add(self.user, self.other)
+        self.post.upvotes.add(self.user)
+        url = reverse('forum:post-list')
+        
+        response = self.client.get(url, {'ordering': '-upvote_count'})
+        self.assertEqual(
+            [(post['id'], post['upvote_count']) for post in response.data['results']],
+            [(self.popular.id, 2), (self.post.id, 1)],
+        )
+        response = self.client.get(url, {'upvotes_min': 2})
+        self.assertEqual([post['id'] for post in response.data['results']], [self.popular.id])
+
+
+@override_settings(COUNTERS_LOCAL_FLUSH_INTERVAL=0)
+class ViewerStateTests(APITestCase):
+    """The viewer's upvotes are loaded for a whole page in one query"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(email='voter@example.com', password='testpass123')
+        self.other = User.objects.create_user(email='other@example.com', password='testpass123')
+        self.category = Category.objects.create(name='Transport')
+        self.posts = [
+            Post.objects.create(
+                title=f'Matatu route {i}', content='Fare changes', summary='Fare changes',
+                author=self.other, category=self.category, status='published',
+            )
+            for i in range(6)
+        ]
+        for post in self.posts[::2]:
+            post.toggle_upvote(self.user)
+        self.comments = [
+            Comment.objects.create(post=self.posts[0], author=self.other, content=f'Reply {i}') for i in range(4)
+        ]
+        self.comments[1].toggle_upvote(self.user)
+    
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response
+    
+    def test_post_list_flags_cost_one_query(self):
+        url = reverse('forum:post-list')
+        anonymous, response = self.count_queries(url)
+        self.assertFalse(any(post['is_upvoted'] for post in response.data['results']))
+        
+        self.client.force_authenticate(user=self.user)
+        authenticated, response = self.count_queries(url)
+        self.assertEqual(authenticated, anonymous + 1)
+        upvoted = {post['id'] for post in response.data['results'] if post['is_upvoted']}
+        self.assertEqual(upvoted, {post.id for post in self.posts[::2]})
+    
+    def test_comment_flags_in_post_detail_cost_one_query(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('forum:post-detail', args=[self.posts[0].id]))
+        self.assertTrue(response.data['is_upvoted'])
+        self.assertEqual(
+            [comment['is_upvoted'] for comment in response.data['comments']], [False, True, False, False]
+        )
+        
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('forum:comment-list'), {'post': self.posts[0].id})
+        self.assertEqual([comment['is_upvoted'] for comment in response.data['results']], [False, True, False, False])
+        upvote_queries = [q for q in ctx.captured_queries if 'forum_comment_upvotes' in q['sql']]
+        self.assertEqual(len(upvote_queries), 1)
+
+
+@override_settings(COUNTERS_LOCAL_FLUSH_INTERVAL=0)
+class CommentThreadTests(APITestCase):
+    """Comment threads of any depth load in one query per page"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(email='reader@example.com', password='testpass123')
+        self.category = Category.objects.create(name='County news')
+        self.post = Post.objects.create(
+            title='Road works', content='Closures this week', summary='Closures',
+            author=self.user, category=self.category, status='published',
+        )
+    
+    def reply(self, parent, content):
+        return Comment.objects.create(post=self.post, author=self.user, parent=parent, content=content)
+    
+    def thread(self, depth):
+        root = node = self.reply(None, 'root')
+        for level in range(1, depth + 1):
+            node = self.reply(node, f'level {level}')
+        return root
+    
+    def test_paths_follow_the_tree(self):
+        root = self.thread(2)
+        first, second = Comment.objects.filter(thread=root).exclude(pk=root.pk).order_by('path')
+        sibling = self.reply(root, 'sibling')
+        
+        self.assertEqual((root.depth, first.depth, second.depth), (0, 1, 2))
+        self.assertTrue(second.path.startswith(first.path) and first.path.startswith(root.path))
+        self.assertEqual(
+            list(Comment.objects.filter(thread=root).order_by('path').values_list('content', flat=True)),
+            ['root', 'level 1', 'level 2', 'sibling'],
+        )
+        self.assertEqual(sibling.thread_id, root.pk)
+    
+    def test_post_detail_renders_deep_threads_in_constant_queries(self):
+        self.thread(1)
+        with CaptureQueriesContext(connection) as shallow:
+            self.client.get(reverse('forum:post-detail', args=[self.post.id]))
+        deep_root = self.thread(6)
+        hidden = Comment.objects.get(thread=deep_root, content='level 4')
+        hidden.active = False
+        hidden.save()
+        with CaptureQueriesContext(connection) as deep:
+            response = self.client.get(reverse('forum:post-detail', args=[self.post.id]))
+        
+        self.assertEqual(len(deep.captured_queries), len(shallow.captured_queries))
+        node, depth = response.data['comments'][1], 0
+        while node['replies']:
+            [node] = node['replies']
+            depth += 1
+        # The deactivated reply hides its subtree
+        self.assertEqual((depth, node['content']), (3, 'level 3'))
+    
+    def test_comment_list_pages_by_thread(self):
+        roots = [self.thread(3) for _ in range(3)]
+        response = self.client.get(
+            reverse('forum:comment-list'), {'post': self.post.id, 'parent': 'null', 'page_size': 2}
+        )
+        self.assertEqual([c['id'] for c in response.data['results']], [roots[0].id, roots[1].id])
+        self.assertEqual(response.data['results'][0]['replies'][0]['replies'][0]['content'], 'level 2')
+
+
+class CategoryPostCountTests(APITestCase):
+    """Categories store their published post count, moved on every status change"""
+    
+    def setUp(self):
+        self.author = User.objects.create_user(email='author@example.com', password='testpass123')
+        self.news = Category.objects.create(name='Local news')
+        self.sports = Category.objects.create(name='Sports')
+    
+    def post(self, status='published', category=None):
+        return Post.objects.create(
+            title='Harambee Stars win', content='Match report', summary='Match report',
+            author=self.author, category=category or self.news, status=status,
+        )
+    
+    def counts(self):
+        return dict(Category.objects.values_list('name', 'published_post_count'))
+    
+    def test_counts_follow_publish_move_flag_and_delete(self):
+        published, draft = self.post(), self.post(status='draft')
+        self.assertEqual(self.counts(), {'Local news': 1, 'Sports': 0})
+        
+        self.client.force_authenticate(user=self.author)
+        response = self.client.post(reverse('forum:post-publish', args=[draft.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.counts(), {'Local news': 2, 'Sports': 0})
+        
+        moved = Post.objects.only('pk', 'title').get(pk=published.pk)
+        moved.category = self.sports
+        moved.save()
+        self.assertEqual(self.counts(), {'Local news': 1, 'Sports': 1})
+        
+        for n in range(5):
+            reporter = User.objects.create_user(email=f'reporter{n}@example.com', password='testpass123')
+            Report.objects.create(post=draft, reporter=reporter, reason='spam', details='Spam')
+        moderate_reports()
+        self.assertEqual(Post.objects.get(pk=draft.pk).status, 'flagged')
+        self.assertEqual(self.counts(), {'Local news': 0, 'Sports': 1})
+        
+        Post.objects.get(pk=published.pk).delete()
+        self.assertEqual(self.counts(), {'Local news': 0, 'Sports': 0})
+    
+    def test_periodic_recount_repairs_bulk_updates(self):
+        self.post()
+        self.post(status='draft', category=self.sports)
+        Post.objects.update(status='published')
+        self.assertEqual(recount_category_posts(), 2)
+        self.assertEqual(self.counts(), {'Local news': 1, 'Sports': 1})
+    
+    def test_category_list_reads_stored_counts(self):
+        self.post()
+        # The page count and the page, nothing per category
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('forum:category-list'))
+        self.assertEqual(
+            {category['name']: category['post_count'] for category in response.data['results']},
+            {'Local news': 1, 'Sports': 0},
+        )
+
+
+class ReportModerationTests(APITestCase):
+    """Reports are queued on filing; the worker counts them and acts on the thresholds"""
+    
+    def setUp(self):
+        self.author = User.objects.create_user(email='author@example.com', password='testpass123')
+        self.category = Category.objects.create(name='Local news')
+        self.post = Post.objects.create(
+            title='Maize prices', content='Flour will cost nothing next week.', author=self.author,
+            category=self.category, status='published',
+        )
+        self.comment = Comment.objects.create(post=self.post, author=self.author, content='Buy now')
+        self.reporters = [
+            User.objects.create_user(email=f'reporter{n}@example.com', password='testpass123') for n in range(3)
+        ]
+    
+    def report(self, reporter, **target):
+        return Report.objects.create(reporter=reporter, reason='spam', details='Spam', **target)
+    
+    def test_filing_a_report_only_queues_it(self):
+        self.client.force_authenticate(user=self.reporters[0])
+        with patch('forum.signals.moderate_reports.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('forum:report-list'), {
+                    'post': self.post.id, 'reason': 'spam', 'details': 'Spam',
+                })
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        delay.assert_called_once_with([response.data['id']])
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.report_count, self.post.status), (0, 'published'))
+    
+    def test_worker_counts_each_report_once_and_flags_at_threshold(self):
+        first = self.report(self.reporters[0], post=self.post)
+        self.assertEqual(moderate_reports([first.id]), 1)
+        self.assertEqual(moderate_reports([first.id]), 0)
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.report_count, self.post.status), (1, 'published'))
+        
+        for reporter in self.reporters[1:]:
+            self.report(reporter, post=self.post)
+        self.assertEqual(moderate_reports(), 2)
+        self.post.refresh_from_db()
+        self.category.refresh_from_db()
+        self.assertEqual((self.post.report_count, self.post.status), (3, 'flagged'))
+        self.assertEqual(self.category.published_post_count, 0)
+        self.assertFalse(Report.objects.filter(triaged_at=None).exists())
+    
+    def test_comments_are_deactivated_at_threshold(self):
+        for reporter in self.reporters:
+            self.report(reporter, comment=self.comment)
+        moderate_reports()
+        self.comment.refresh_from_db()
+        self.assertEqual((self.comment.report_count, self.comment.active), (3, False))
+    
+    def test_resolving_reports_recounts_the_target(self):
+        reports = [self.report(reporter, post=self.post) for reporter in self.reporters[:2]]
+        moderate_reports()
+        admin = User.objects.create_superuser(email='admin@example.com', password='adminpass123')
+        self.client.force_login(admin)
+        response = self.client.post(reverse('admin:forum_report_changelist'), {
+            'action': 'mark_resolved', '_selected_action': [reports[0].pk],
+        })
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.report_count, 1)
+        
+        reports[1].delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.report_count, 0)
+    
+    def test_misinformation_reports_are_triaged_against_fact_checks(self):
+        report = Report.objects.create(
+            post=self.post, reporter=self.reporters[0], reason='misinformation', details='Not true'
+        )
+        fact_check = type('FactCheck', (), {
+            'claim': 'Flour will be free next week', 'get_verdict_display': lambda self: 'False',
+        })()
+        with patch('forum.moderation.get_index', return_value=object()), \
+                patch('forum.moderation.match_text', return_value=[('Flour...', fact_check, 0.91)]) as match:
+            moderate_reports()
+        
+        match.assert_called_once()
+        report.refresh_from_db()
+        self.assertAlmostEqual(report.triage_score, 0.91, places=5)
+        self.assertEqual(report.triage_notes, 'False (0.91): Flour will be free next week')
@@ -1,12 +1,17 @@
 from rest_framework import viewsets, filters, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
-from django.db.models import Count
+from django.db.models import Count, Max, Sum, Exists, OuterRef, Subquery
+from django.http import Http404
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from .filters import PostFilter, CommentFilter
 
+from core import counters, viewer_state
+from core.conditional import ConditionalGetMixin, relation_versions
+from core.pagination import KeysetPagination
+from core.search import FullTextSearchFilter
+
 from .models import Category, Post, Comment, Tag, Report
 from .serializers import (
     CategorySerializer, PostListSerializer, PostDetailSerializer, 
@@ -16,8 +21,8 @@ from .serializers import (
 from .permissions import IsAuthorOrReadOnly, IsNotFlagged
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    """Standard pagination for forum views"""
+class StandardResultsSetPagination(KeysetPagination):
+    """Keyset pagination for forum views; ?page=N opts into page numbers"""
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -36,19 +41,22 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for forum posts"""
     queryset = Post.objects.all()
     serializer_class = PostListSerializer
     pagination_class = StandardResultsSetPagination
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly, IsNotFlagged]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_class = PostFilter
     search_fields = ['title', 'content', 'summary', 'location', 'tags__name']
+    search_headline_field = 'content'
     ordering_fields = ['created_at', 'published_at', 'upvote_count', 'views']
+    # Keyset pagination needs a total, non-null ordering
+    ordering = ['-created_at', '-id']
     
     def get_queryset(self):
-        queryset = Post.objects.annotate(upvote_count=Count('upvotes'))
+        queryset = Post.objects.all()
         
         # Filter by tag if provided
         tag_slug = self.request.query_params.get('tag')
@@ -76,25 +84,56 @@ class PostViewSet(viewsets.ModelViewSet):
             return PostDetailSerializer
         return PostListSerializer
     
+    def get_version(self):
+        """Version columns for the requested post and its comment thread, in one query (plus renames)"""
+        comments = Comment.objects.filter(post=OuterRef('pk'), active=True).order_by().values('post')
+        
+        queryset = self.get_queryset().filter(pk=self.get_lookup_value(Post)).annotate(
+            comment_updated_at=Subquery(comments.annotate(value=Max('updated_at')).values('value')),
+            comment_total=Subquery(comments.annotate(value=Count('pk')).values('value')),
+            comment_upvote_total=Subquery(comments.annotate(value=Sum('upvote_count')).values('value')),
+        )
+        fields = [
+            'pk', 'updated_at', 'status', 'upvote_count',
+            'comment_updated_at', 'comment_total', 'comment_upvote_total',
+        ]
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                is_upvoted=Exists(Post.upvotes.through.objects.filter(post=OuterRef('pk'), user=user))
+            )
+            fields.append('is_upvoted')
+        
+        version = queryset.values(*fields).first()
+        if version is None:
+            raise Http404
+        # Renamed categories or tags
+        version['relations'] = relation_versions(('forum-categories', 'forum-tags'))
+        return version
+    
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        # Increment view count
-        instance.views += 1
-        instance.save(update_fields=['views'])
-        return super().retrieve(request, *args, **kwargs)
+        version = self.get_version()
+        # Buffer the view; the flush task folds it into the row later
+        counters.increment(Post, 'views', version['pk'])
+        
+        def render():
+            instance = self.get_object()
+            instance.views += 1
+            if 'is_upvoted' in version:
+                viewer_state.for_request(request).mark('upvoted_posts', [instance.pk], version['is_upvoted'])
+            serializer = self.get_serializer(instance)
+            return Response(serializer.data)
+        
+        return self.conditional_response(request, version, render)
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def upvote(self, request, pk=None):
         """Toggle upvote on a post"""
         post = self.get_object()
-        user = request.user
-        
-        if user in post.upvotes.all():
-            post.upvotes.remove(user)
-            return Response({'status': 'upvote removed'})
-        else:
-            post.upvotes.add(user)
-            return Response({'status': 'upvoted'})
+        
+        if post.toggle_upvote(request.user):
+            return Response({'status': 'upvoted', 'upvote_count': post.upvote_count})
+        return Response({'status': 'upvote removed', 'upvote_count': post.upvote_count})
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def publish(self, request, pk=None):
@@ -127,7 +166,7 @@ class CommentViewSet(viewsets.ModelViewSet):
     search_fields = ['content']
     
     def get_queryset(self):
-        queryset = Comment.objects.filter(active=True).annotate(upvote_count=Count('upvotes'))
+        queryset = Comment.objects.filter(active=True).select_related('author')
         
         # Filter by post if provided
         post_id = self.request.query_params.get('post')
@@ -148,14 +187,10 @@ class CommentViewSet(viewsets.ModelViewSet):
     def upvote(self, request, pk=None):
         """Toggle upvote on a comment"""
         comment = self.get_object()
-        user = request.user
-        
-        if user in comment.upvotes.all():
-            comment.upvotes.remove(user)
-            return Response({'status': 'upvote removed'})
-        else:
-            comment.upvotes.add(user)
-            return Response({'status': 'upvoted'})
+        
+        if comment.toggle_upvote(request.user):
+            return Response({'status': 'upvoted', 'upvote_count': comment.upvote_count})
+        return Response({'status': 'upvote removed', 'upvote_count': comment.upvote_count})
 
 
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
@@ -184,17 +219,6 @@ class ReportViewSet(viewsets.ModelViewSet):
         return Report.objects.filter(reporter=self.request.user)
 
     def perform_create(self, serializer):
-        serializer.save(reporter=self.request.user)
-        
-        # Auto-flag content if it reaches threshold of reports (e.g., 3)
-        report = serializer.instance
-        if report.post:
-            report_count = Report.objects.filter(post=report.post, resolved=False).count()
-            if report_count >= 3 and report.post.status == 'published':
-                report.post.status = 'flagged'
-                report.post.save(update_fields=['status'])
-        elif report.comment:
-            report_count = Report.objects.filter(comment=report.comment, resolved=False).count()
-            if report_count >= 3:
-                report.comment.active = False
-                report.comment.save(update_fields=['active'])
\ No newline at end of file
+        # ReportSerializer.create sets the reporter; counting and
+        # auto-flagging happen in the moderation worker (forum.moderation)
+        serializer.save()
\ No newline at end of file
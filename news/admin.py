@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Source, News, Tag, FactCheck, SavedNews, NewsRating, Comment
+from .models import Category, Source, News, NewsDuplicate, Tag, FactCheck, SavedNews, NewsRating, Comment, SentimentRollup
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -9,8 +9,9 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Source)
 class SourceAdmin(admin.ModelAdmin):
-    list_display = ('name', 'source_type', 'is_verified', 'reliability_score', 'created_at')
-    list_filter = ('source_type', 'is_verified')
+    list_display = ('name', 'source_type', 'is_verified', 'reliability_score', 'scrape_enabled', 'next_scrape_at', 'created_at')
+    list_filter = ('source_type', 'is_verified', 'scrape_enabled')
+    readonly_fields = ('publish_rate', 'last_scraped')
     search_fields = ('name', 'description')
 
 @admin.register(News)
@@ -22,6 +23,12 @@ class NewsAdmin(admin.ModelAdmin):
     date_hierarchy = 'published_date'
     filter_horizontal = ('categories',)
 
+@admin.register(NewsDuplicate)
+class NewsDuplicateAdmin(admin.ModelAdmin):
+    list_display = ('original_url', 'canonical', 'source', 'similarity', 'detected_at')
+    list_filter = ('source',)
+    raw_id_fields = ('canonical',)
+
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug')
@@ -50,4 +57,11 @@ class NewsRatingAdmin(admin.ModelAdmin):
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('user', 'news', 'created_at', 'is_approved')
     list_filter = ('is_approved', 'created_at', 'is_edited')
-    search_fields = ('user__email', 'content', 'news__title')
\ No newline at end of file
+    search_fields = ('user__email', 'content', 'news__title')
+
+@admin.register(SentimentRollup)
+class SentimentRollupAdmin(admin.ModelAdmin):
+    list_display = ('bucket', 'county', 'topic', 'item_count', 'mean_score', 'weighted_score')
+    list_filter = ('county',)
+    search_fields = ('topic',)
+    date_hierarchy = 'bucket'
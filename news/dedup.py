@@ -0,0 +1,145 @@
+"""
+Django glue for the near-duplicate index (core.scrapers.dedup).
+
+The index is keyed by ``original_url`` and holds the articles scraped in
+the last DEDUP_WINDOW_DAYS. It is loaded once per process, reloaded when
+another process saved a newer copy, and saved after each ingest run.
+
+Ingest runs in several workers at once (one per scraped source), so an
+ingest holds ``index_lock()`` from reloading the index to saving it back.
+The lock lives in the default cache and is shared by every worker; the
+index file must be on storage they share too. A worker that gives up
+waiting goes ahead unlocked, and its save merges in whatever another worker
+saved in the meantime.
+"""
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.scrapers.dedup import MinHashLSH
+from .models import News
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'dedup-index-lock'
+LOCK_POLL_INTERVAL = 0.1  # seconds
+
+_loaded = {'path': None, 'mtime': None, 'index': None}
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+@contextmanager
+def index_lock():
+    """
+    Hold the index lock shared by every worker, waiting up to
+    DEDUP_LOCK_TIMEOUT for it.
+    """
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + settings.DEDUP_LOCK_TIMEOUT
+    while not cache.add(LOCK_KEY, token, timeout=settings.DEDUP_LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            logger.warning("Timed out waiting for the duplicate index lock; its save will merge")
+            token = None
+            break
+        time.sleep(LOCK_POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        # Only release our own lock; an expired one may belong to another worker by now
+        if token and cache.get(LOCK_KEY) == token:
+            cache.delete(LOCK_KEY)
+
+
+def get_index():
+    """Return this process's index, (re)loading it from disk when needed."""
+    path = settings.DEDUP_INDEX_PATH
+    mtime = _mtime(path)
+    if _loaded['index'] is None or _loaded['path'] != path or (mtime and mtime != _loaded['mtime']):
+        index = MinHashLSH.load(path, threshold=settings.DEDUP_THRESHOLD)
+        index.threshold = settings.DEDUP_THRESHOLD
+        _loaded.update(path=path, mtime=mtime, index=index)
+    return _loaded['index']
+
+
+def save_index():
+    """
+    Prune the index to the window and persist it, first merging in entries
+    another process saved since this one loaded the file.
+    """
+    index = _loaded['index']
+    if index is None:
+        return
+    if _mtime(_loaded['path']) != _loaded['mtime']:
+        try:
+            saved = MinHashLSH.load(_loaded['path'])
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not merge the saved duplicate index: {e}")
+        else:
+            for key, signature in saved.signatures.items():
+                if key not in index:
+                    index.add(key, signature, saved.timestamps[key])
+    index.prune(settings.DEDUP_WINDOW_DAYS * 86400)
+    try:
+        index.save(_loaded['path'])
+        _loaded['mtime'] = _mtime(_loaded['path'])
+    except OSError as e:
+        logger.warning(f"Could not save the duplicate index: {e}")
+
+
+def split_duplicates(candidates):
+    """
+    Check ``{url: (text, published_date)}`` against the index.
+
+    New stories are added to the index. Returns ``{url: (canonical_url,
+    similarity, canonical_id)}`` for duplicates; canonical_id is None when the
+    canonical article is part of the same batch and has no id yet.
+    """
+    index = get_index()
+    matches = {}
+    for url, (text, published_date) in candidates.items():
+        if url in index:
+            continue  # a re-scrape of a story we already hold
+        match = index.find_or_add(url, text, published_date.timestamp())
+        if match:
+            matches[url] = match
+
+    # Canonical articles from earlier batches must still exist
+    external = {canonical for canonical, _ in matches.values() if canonical not in candidates}
+    existing = dict(News.objects.filter(original_url__in=external).values_list('original_url', 'pk'))
+    duplicates = {}
+    for url, (canonical, similarity) in matches.items():
+        if canonical in candidates or canonical in existing:
+            duplicates[url] = (canonical, similarity, existing.get(canonical))
+        else:
+            index.remove(canonical)
+            text, published_date = candidates[url]
+            index.find_or_add(url, text, published_date.timestamp())
+    return duplicates
+
+
+def rebuild_index():
+    """Index every scraped article published within the window."""
+    since = timezone.now() - timezone.timedelta(days=settings.DEDUP_WINDOW_DAYS)
+    index = MinHashLSH(threshold=settings.DEDUP_THRESHOLD)
+    rows = News.objects.filter(
+        original_url__isnull=False, published_date__gte=since
+    ).values_list('original_url', 'content', 'published_date').iterator()
+    index.extend((url, content, published.timestamp()) for url, content, published in rows)
+    with index_lock():
+        path = settings.DEDUP_INDEX_PATH
+        # A rebuild replaces the saved index rather than merging with it
+        _loaded.update(path=path, mtime=_mtime(path), index=index)
+        save_index()
+    return len(index)
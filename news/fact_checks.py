@@ -0,0 +1,92 @@
+"""
+Django glue for the claim index (core.ai.fact_checker).
+
+Every FactCheck claim is embedded into a memory-mapped index under
+FACT_INDEX_DIR. Saved or deleted fact-checks are queued for indexing on
+commit and appended by a worker; ``rebuild_fact_index`` compacts the index
+and is run automatically when the embedding model changes.
+
+``match_text`` matches free text (a chatbot question, a scraped article)
+sentence by sentence against the known verdicts.
+"""
+import logging
+from typing import List, Tuple
+
+from django.conf import settings
+
+from core.ai.fact_checker import ClaimIndex, get_embedder, split_claims
+from .models import FactCheck
+
+logger = logging.getLogger(__name__)
+
+_loaded = {'index': None}
+
+
+def get_index():
+    """This process's open index, or None if it has not been built for the current model."""
+    index = _loaded['index']
+    if index is None or index.is_stale():
+        try:
+            index = ClaimIndex(settings.FACT_INDEX_DIR)
+        except (OSError, ValueError):
+            index = None
+        _loaded['index'] = index
+    if index is not None and index.model_id != settings.FACT_EMBEDDING_MODEL:
+        return None
+    return index
+
+
+def rebuild_index(batch_size=1000):
+    """Embed every claim into a fresh index. Returns the number of claims."""
+    embedder = get_embedder(settings.FACT_EMBEDDING_MODEL)
+    # Claims appended while we embed the snapshot are carried into the new index
+    previous = get_index()
+    since = previous.position() if previous is not None else None
+    ids, vectors = [], []
+    claims = FactCheck.objects.order_by('pk').values_list('pk', 'claim')
+    for start in range(0, claims.count(), batch_size):
+        batch = list(claims[start:start + batch_size])
+        ids.extend(pk for pk, _ in batch)
+        vectors.extend(embedder.encode([claim for _, claim in batch]))
+    dim = len(vectors[0]) if vectors else len(embedder.encode(['dimension probe'])[0])
+    _loaded['index'] = ClaimIndex.build(
+        settings.FACT_INDEX_DIR, settings.FACT_EMBEDDING_MODEL, ids, vectors,
+        dtype=settings.FACT_INDEX_DTYPE, dim=dim, since=since,
+    )
+    logger.info(f"Indexed {len(ids)} fact-check claims")
+    return len(ids)
+
+
+def index_fact_checks(pks):
+    """Add, replace or remove the given fact-checks in the index."""
+    index = get_index()
+    if index is None:
+        return rebuild_index()
+    claims = dict(FactCheck.objects.filter(pk__in=pks).values_list('pk', 'claim'))
+    if claims:
+        index.append(list(claims), get_embedder(settings.FACT_EMBEDDING_MODEL).encode(list(claims.values())))
+    removed = [pk for pk in pks if pk not in claims]
+    if removed:
+        index.append(removed)
+    return len(claims)
+
+
+def match_text(text, k=3, threshold=None) -> List[Tuple[str, FactCheck, float]]:
+    """
+    (sentence, fact-check, similarity) for each sentence of text that
+    restates a checked claim, best match first.
+    """
+    threshold = settings.FACT_MATCH_THRESHOLD if threshold is None else threshold
+    index = get_index()
+    sentences = split_claims(text) or ([' '.join(text.split())] if text and text.strip() else [])
+    if index is None or not sentences:
+        return []
+    results = index.search(get_embedder(settings.FACT_EMBEDDING_MODEL).encode(sentences), k=k, min_score=threshold)
+    fact_checks = FactCheck.objects.in_bulk({pk for matches in results for pk, _ in matches})
+
+    matched = [
+        (sentence, fact_checks[pk], score)
+        for sentence, matches in zip(sentences, results)
+        for pk, score in matches if pk in fact_checks
+    ]
+    return sorted(matched, key=lambda match: match[2], reverse=True)
@@ -0,0 +1,250 @@
+"""
+Bulk ingest of scraped items into News.
+
+Cleaned scraper items (see core.scrapers.base.BaseScraper.stream) are
+upserted in batches keyed on ``original_url``: one INSERT ... ON CONFLICT
+for the articles, one query to read back their ids, and bulk inserts into
+the category and tag through tables. Slugs are derived from the title plus
+a hash of the URL, so they are unique without a lookup per row.
+
+Items whose content nearly duplicates a recent article (the same story
+reposted on another platform) are not stored again; they are recorded as
+NewsDuplicate rows pointing at the canonical article (see news.dedup).
+
+bulk_create bypasses save() and its signals, so the search vectors and the
+response cache are refreshed here, once per batch.
+"""
+import hashlib
+import logging
+from contextlib import nullcontext
+from dataclasses import dataclass
+from itertools import islice
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from core.cache import invalidate
+from .dedup import index_lock, save_index, split_duplicates
+from .models import Category, News, NewsDuplicate, Source, Tag
+
+logger = logging.getLogger(__name__)
+
+SOCIAL_SOURCE_TYPES = {'twitter', 'facebook', 'telegram', 'reddit', 'whatsapp'}
+
+# Columns a re-scrape may overwrite; editorial fields (status, categories
+# assigned by editors, translations, ...) are left alone
+UPSERT_FIELDS = ['title', 'content', 'summary', 'author', 'published_date', 'updated_at']
+
+SLUG_HASH_LENGTH = 8
+SLUG_MAX_LENGTH = News._meta.get_field('slug').max_length
+
+
+@dataclass
+class IngestStats:
+    received: int = 0
+    skipped: int = 0
+    upserted: int = 0
+    duplicates: int = 0
+
+    def __iadd__(self, other):
+        self.received += other.received
+        self.skipped += other.skipped
+        self.upserted += other.upserted
+        self.duplicates += other.duplicates
+        return self
+
+
+def make_slug(title, url):
+    """Readable slug from the title, made unique by a short hash of the URL."""
+    digest = hashlib.sha1(url.encode()).hexdigest()[:SLUG_HASH_LENGTH]
+    base = slugify(title)[:SLUG_MAX_LENGTH - SLUG_HASH_LENGTH - 1].strip('-')
+    return f'{base}-{digest}' if base else digest
+
+
+def item_url(item):
+    return item.get('source_url') or item.get('url') or ''
+
+
+def parse_published(value):
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if value is None:
+        return timezone.now()
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def source_key(item):
+    return item.get('source') or item.get('source_type') or 'other'
+
+
+def resolve_sources(items):
+    """
+    Map each item's source name to a Source id, creating missing ones in
+    bulk. Names are unique, so workers creating the same source at once end
+    up sharing one row.
+    """
+    names = {source_key(item) for item in items}
+    found = dict(Source.objects.filter(name__in=names).values_list('name', 'pk'))
+
+    missing = []
+    for name in names - set(found):
+        sample = next(item for item in items if source_key(item) == name)
+        parts = urlsplit(item_url(sample))
+        missing.append(Source(
+            name=name,
+            url=f'{parts.scheme}://{parts.netloc}' if parts.netloc else f'https://{name}.com',
+            source_type='social_media' if name in SOCIAL_SOURCE_TYPES else 'other',
+        ))
+    if missing:
+        Source.objects.bulk_create(missing, ignore_conflicts=True)
+        found.update(Source.objects.filter(name__in=[s.name for s in missing]).values_list('name', 'pk'))
+        invalidate('sources')
+    return found
+
+
+def resolve_terms(model, names):
+    """
+    Map names to ids of Category/Tag rows (matched by slug), creating missing
+    ones in bulk. Returns (ids by name, whether any row was created).
+    """
+    slugs = {name: slugify(name)[:50] for name in names if slugify(name)}
+    if not slugs:
+        return {}, False
+    ids = dict(model.objects.filter(slug__in=slugs.values()).values_list('slug', 'pk'))
+    missing = {slug: model(name=name, slug=slug) for name, slug in slugs.items() if slug not in ids}
+    if missing:
+        model.objects.bulk_create(missing.values(), ignore_conflicts=True)
+        ids = dict(model.objects.filter(slug__in=slugs.values()).values_list('slug', 'pk'))
+    return {name: ids[slug] for name, slug in slugs.items() if slug in ids}, bool(missing)
+
+
+def ingest_batch(items):
+    """Upsert one batch of cleaned scraper items. Returns IngestStats."""
+    stats = IngestStats(received=len(items))
+
+    # Items without a URL cannot be upserted; the last copy of a URL wins
+    by_url = {}
+    for item in items:
+        url = item_url(item)[:News._meta.get_field('original_url').max_length]
+        if url and (item.get('title') or item.get('content')):
+            by_url[url] = item
+    stats.skipped = len(items) - len(by_url)
+    if not by_url:
+        return stats
+
+    with transaction.atomic():
+        sources = resolve_sources(list(by_url.values()))
+        verified = set(Source.objects.filter(pk__in=sources.values(), is_verified=True).values_list('pk', flat=True))
+
+        duplicates = {}
+        if settings.DEDUP_ENABLED:
+            duplicates = split_duplicates({
+                url: (item.get('content') or item.get('title'), parse_published(item.get('published_date')))
+                for url, item in by_url.items()
+            })
+            duplicate_items = {url: by_url.pop(url) for url in duplicates}
+
+        articles = []
+        for url, item in by_url.items():
+            source_id = sources[source_key(item)]
+            title = (item.get('title') or item['content'])[:News._meta.get_field('title').max_length]
+            articles.append(News(
+                title=title,
+                slug=make_slug(title, url),
+                content=item.get('content') or '',
+                summary=item.get('summary') or '',
+                author=str(item.get('author') or '')[:News._meta.get_field('author').max_length],
+                published_date=parse_published(item.get('published_date')),
+                source_id=source_id,
+                original_url=url,
+                county=item.get('county') or '',
+                town=item.get('town') or '',
+                # New articles from verified sources go straight to the feed
+                status='published' if source_id in verified else settings.INGEST_DEFAULT_STATUS,
+            ))
+
+        News.objects.bulk_create(
+            articles,
+            update_conflicts=True,
+            unique_fields=['original_url'],
+            update_fields=UPSERT_FIELDS,
+        )
+        # Conflicting rows come back without a pk, so read all ids in one go
+        ids = dict(News.objects.filter(original_url__in=by_url).values_list('original_url', 'pk'))
+
+        categories, new_categories = resolve_terms(
+            Category, {name for item in by_url.values() for name in item.get('categories') or ()}
+        )
+        tags, new_tags = resolve_terms(
+            Tag, {name for item in by_url.values() for name in item.get('tags') or ()}
+        )
+
+        CategoryLink = News.categories.through
+        TagLink = Tag.news.through
+        CategoryLink.objects.bulk_create([
+            CategoryLink(news_id=ids[url], category_id=categories[name])
+            for url, item in by_url.items()
+            for name in item.get('categories') or ()
+            if name in categories
+        ], ignore_conflicts=True)
+        TagLink.objects.bulk_create([
+            TagLink(news_id=ids[url], tag_id=tags[name])
+            for url, item in by_url.items()
+            for name in item.get('tags') or ()
+            if name in tags
+        ], ignore_conflicts=True)
+
+        News.objects.filter(pk__in=ids.values()).update_search_vector()
+
+        if duplicates:
+            NewsDuplicate.objects.bulk_create([
+                NewsDuplicate(
+                    canonical_id=canonical_id or ids[canonical],
+                    source_id=sources[source_key(duplicate_items[url])],
+                    original_url=url,
+                    title=(duplicate_items[url].get('title') or '')[:255],
+                    similarity=similarity,
+                )
+                for url, (canonical, similarity, canonical_id) in duplicates.items()
+            ], ignore_conflicts=True)
+
+        namespaces = ['news']
+        if new_categories:
+            namespaces.append('categories')
+        if new_tags:
+            namespaces.append('tags')
+        invalidate(*namespaces)
+
+    stats.upserted = len(ids)
+    stats.duplicates = len(duplicates)
+    return stats
+
+
+def ingest(items, batch_size=None):
+    """
+    Upsert an iterable of cleaned scraper items in batches. Returns IngestStats.
+
+    With dedup enabled the run holds the duplicate index lock throughout, so
+    concurrent ingests check against each other's stories.
+    """
+    batch_size = batch_size or settings.INGEST_BATCH_SIZE
+    iterator = iter(items)
+    stats = IngestStats()
+    with index_lock() if settings.DEDUP_ENABLED else nullcontext():
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                break
+            stats += ingest_batch(batch)
+        if settings.DEDUP_ENABLED and stats.received:
+            save_index()
+    logger.info(
+        f"Ingested {stats.upserted} articles ({stats.duplicates} duplicates, {stats.skipped} skipped)"
+    )
+    return stats
@@ -0,0 +1,59 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from news.ingest import ingest
+
+WORDS = (
+    'nairobi county governor budget floods matatu fare election rally '
+    'mombasa port tea farmers maandamano bunge shilingi'
+).split()
+
+
+def synthetic_items(count, run):
+    now = timezone.now()
+    for i in range(count):
+        words = random.choices(WORDS, k=8)
+        yield {
+            'title': ' '.join(words[:6]).title(),
+            'content': ' '.join(random.choices(WORDS, k=300)),
+            'author': f'reporter{i % 50}',
+            'published_date': now - timezone.timedelta(minutes=i),
+            'source_url': f'https://bench.example.com/{run}/article-{i}',
+            'source_type': f'benchmark-{i % 5}',
+            'categories': random.sample(['Politics', 'Business', 'Weather', 'Sports'], k=2),
+            'tags': random.sample(WORDS, k=3),
+        }
+
+
+class Command(BaseCommand):
+    help = 'Measure bulk ingest throughput (articles/sec), inserting and then re-upserting the same items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=10_000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--keep', action='store_true', help='Commit the benchmark rows instead of rolling back')
+
+    def handle(self, *args, **options):
+        count, batch_size = options['items'], options['batch_size']
+        run = int(time.time())
+        items = list(synthetic_items(count, run))
+
+        self.stdout.write(f"{'pass':<10} {'items':>7} {'seconds':>8} {'articles/s':>11} {'queries':>8}")
+        with transaction.atomic():
+            for label in ('insert', 'upsert'):
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    stats = ingest(items, batch_size=batch_size)
+                    elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{label:<10} {stats.upserted:>7} {elapsed:>8.2f} "
+                    f"{stats.upserted / elapsed:>11.0f} {len(ctx.captured_queries):>8}"
+                )
+            if not options['keep']:
+                transaction.set_rollback(True)
+
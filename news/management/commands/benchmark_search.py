@@ -0,0 +1,50 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.search import FullTextSearchFilter, is_full_text_available
+from forum.views import PostViewSet
+from news.views import NewsViewSet
+
+DEFAULT_QUERIES = ['election', 'nairobi floods', 'mafuriko', 'matatu fare', 'maandamano']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the icontains SearchFilter against Postgres full-text search'
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='*', default=DEFAULT_QUERIES)
+        parser.add_argument('--model', choices=['news', 'posts'], default='news')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if not is_full_text_available():
+            raise CommandError('Full-text search requires PostgreSQL')
+
+        view = NewsViewSet() if options['model'] == 'news' else PostViewSet()
+        queryset = view.queryset.all()
+        page_size = options['page_size']
+
+        self.stdout.write(f"{'query':<20} {'backend':<10} {'hits':>7} {'median ms':>10} {'p95 ms':>8}")
+        for query in options['queries']:
+            request = Request(APIRequestFactory().get('/', {'search': query}))
+            for name, backend in (('icontains', filters.SearchFilter()), ('fulltext', FullTextSearchFilter())):
+                def run():
+                    results = backend.filter_queryset(request, queryset, view)
+                    return results.count(), list(results[:page_size])
+
+                timings = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    hits, _ = run()
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(
+                    f"{query:<20} {name:<10} {hits:>7} {statistics.median(timings):>10.1f} {p95:>8.1f}"
+                )
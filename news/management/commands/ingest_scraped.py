@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.scrapers.sinks import DEFAULT_STREAM, read_segment, tail_segments
+from news.ingest import IngestStats, ingest
+
+
+class Command(BaseCommand):
+    help = 'Upsert scraped articles from NDJSON segments into News'
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='*', help='Segment files to ingest instead of tailing the stream')
+        parser.add_argument('--directory', default=settings.SCRAPER_RESULTS_DIR)
+        parser.add_argument('--stream', default=DEFAULT_STREAM)
+        parser.add_argument('--consumer', default='ingest')
+        parser.add_argument('--follow', action='store_true', help='Keep waiting for new segments')
+        parser.add_argument('--batch-size', type=int, default=settings.INGEST_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['files']:
+            segments = (read_segment(path) for path in options['files'])
+        else:
+            segments = tail_segments(
+                options['directory'], options['stream'], options['consumer'], follow=options['follow']
+            )
+
+        total = IngestStats()
+        for items in segments:
+            stats = ingest(items, batch_size=options['batch_size'])
+            total += stats
+            self.stdout.write(f"Upserted {stats.upserted} articles ({stats.skipped} skipped)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Ingested {total.upserted} of {total.received} items ({total.skipped} skipped)"
+        ))
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news.dedup import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the near-duplicate index from articles scraped within DEDUP_WINDOW_DAYS'
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} articles into {settings.DEDUP_INDEX_PATH}"
+        ))
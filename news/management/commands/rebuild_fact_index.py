@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news.fact_checks import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Re-embed every fact-check claim into a compacted claim index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} claims into {settings.FACT_INDEX_DIR}"
+        ))
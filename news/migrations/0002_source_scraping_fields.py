@@ -0,0 +1,28 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='source',
+            name='last_scraped',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='source',
+            name='scraping_config',
+            field=models.JSONField(default=dict, help_text='Configuration for scraping (CSS selectors, API keys, etc.)'),
+        ),
+        migrations.AlterField(
+            model_name='source',
+            name='reliability_score',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=3),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_source_scraping_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('news', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='news.news')),
+                ('score', models.FloatField()),
+                ('county', models.CharField(blank=True, max_length=100)),
+                ('published_date', models.DateTimeField()),
+                ('view_count', models.PositiveIntegerField(default=0)),
+                ('share_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['-score'], name='news_trending_score_idx'), models.Index(fields=['county', '-score'], name='news_trending_county_idx')],
+            },
+        ),
+    ]
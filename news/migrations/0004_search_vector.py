@@ -0,0 +1,24 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:16
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_trendingscore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='news_search_vector_gin'),
+        ),
+    ]
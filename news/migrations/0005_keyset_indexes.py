@@ -0,0 +1,17 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['-published_date', '-id'], name='news_published_id_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:18
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='news',
+            name='news_published_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-published_date', '-id'], include=('source', 'county', 'town', 'is_fact_checked'), name='news_published_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(django.db.models.functions.text.Upper('county'), models.OrderBy(models.F('published_date'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('status', 'published')), name='news_county_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(django.db.models.functions.text.Upper('town'), models.OrderBy(models.F('published_date'), descending=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('status', 'published')), name='news_town_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(condition=models.Q(('status', 'published'), ('is_fact_checked', True)), fields=['-published_date', '-id'], name='news_fact_checked_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['source', '-published_date', '-id'], name='news_source_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:26
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def clear_blank_and_duplicate_urls(apps, schema_editor):
+    """original_url becomes unique: blank -> NULL, and only the oldest copy of a URL keeps it"""
+    News = apps.get_model('news', 'News')
+    News.objects.filter(original_url='').update(original_url=None)
+    duplicates = (
+        News.objects.exclude(original_url=None).values('original_url')
+        .annotate(copies=Count('pk'), first=Min('pk')).filter(copies__gt=1)
+    )
+    for row in duplicates:
+        News.objects.filter(original_url=row['original_url']).exclude(pk=row['first']).update(original_url=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='news',
+            name='original_url',
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+        migrations.RunPython(clear_blank_and_duplicate_urls, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='news',
+            name='original_url',
+            field=models.URLField(blank=True, max_length=500, null=True, unique=True),
+        ),
+    ]
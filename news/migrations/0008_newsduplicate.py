@@ -0,0 +1,26 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_original_url_upsert_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsDuplicate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_url', models.URLField(max_length=500, unique=True)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('similarity', models.FloatField()),
+                ('detected_at', models.DateTimeField(auto_now_add=True)),
+                ('canonical', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicates', to='news.news')),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicates', to='news.source')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_newsduplicate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='source',
+            name='scraping_state',
+            field=models.JSONField(blank=True, default=dict, help_text='High-water marks from earlier runs (since_id, ETag, ...), maintained by the scrapers'),
+        ),
+    ]
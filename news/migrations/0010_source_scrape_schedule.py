@@ -0,0 +1,43 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:37
+
+from django.db import migrations, models
+
+
+def enable_configured_sources(apps, schema_editor):
+    """Schedule the platforms the old pipeline ran and every site with a scraping_config"""
+    Source = apps.get_model('news', 'Source')
+    enabled = [
+        source.pk for source in Source.objects.only('name', 'scraping_config')
+        if source.name in ('twitter', 'facebook', 'telegram', 'reddit') or source.scraping_config
+    ]
+    Source.objects.filter(pk__in=enabled).update(scrape_enabled=True)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_source_scraping_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='source',
+            name='next_scrape_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='source',
+            name='publish_rate',
+            field=models.FloatField(default=0, help_text='Smoothed new items per hour'),
+        ),
+        migrations.AddField(
+            model_name='source',
+            name='scrape_enabled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='source',
+            name='scrape_interval',
+            field=models.PositiveIntegerField(default=21600, help_text='Seconds between scrapes, adjusted after each run'),
+        ),
+        migrations.RunPython(enable_configured_sources, migrations.RunPython.noop),
+    ]
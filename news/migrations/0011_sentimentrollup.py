@@ -0,0 +1,36 @@
+# Generated by Django 4.2.10 on 2026-10-17 00:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0010_source_scrape_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentimentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('county', models.CharField(blank=True, max_length=100)),
+                ('topic', models.CharField(blank=True, max_length=100)),
+                ('item_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('weighted_score_sum', models.FloatField(default=0)),
+                ('weight_sum', models.FloatField(default=0)),
+                ('positive_count', models.PositiveIntegerField(default=0)),
+                ('negative_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-bucket'],
+                'indexes': [models.Index(fields=['county', 'topic', '-bucket'], name='news_sentiment_county_idx'), models.Index(fields=['topic', '-bucket'], name='news_sentiment_topic_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sentimentrollup',
+            constraint=models.UniqueConstraint(fields=('bucket', 'county', 'topic'), name='news_sentiment_rollup_key'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.10 on 2026-10-17 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0012_comment_thread_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trendingscore',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='trendingscore',
+            name='rating_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='trendingscore',
+            name='save_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
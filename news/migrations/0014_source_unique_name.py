@@ -0,0 +1,35 @@
+# Generated by Django 4.2.10 on 2026-10-17 02:05
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_sources(apps, schema_editor):
+    """Source.name becomes unique: the oldest source of a name takes over its copies' articles"""
+    Source = apps.get_model('news', 'Source')
+    News = apps.get_model('news', 'News')
+    NewsDuplicate = apps.get_model('news', 'NewsDuplicate')
+    duplicates = (
+        Source.objects.values('name').annotate(copies=Count('pk'), first=Min('pk')).filter(copies__gt=1)
+    )
+    for row in duplicates:
+        copies = Source.objects.filter(name=row['name']).exclude(pk=row['first'])
+        News.objects.filter(source__in=copies).update(source=row['first'])
+        NewsDuplicate.objects.filter(source__in=copies).update(source=row['first'])
+        copies.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0013_trending_engagement_totals'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_sources, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='source',
+            name='name',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+    ]
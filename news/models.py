@@ -1,5 +1,12 @@
 from django.db import models
+from django.db.models import Avg, Count, F, FloatField, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Upper
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+
+from core.search import is_full_text_available, search_config
+from core.threads import ThreadMixin
 
 
 class Category(models.Model):
@@ -20,7 +27,7 @@ class Category(models.Model):
 class Source(models.Model):
     """Model for news sources."""
     
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, unique=True)  # scraped items name their source
     url = models.URLField()
     logo = models.ImageField(upload_to='source_logos/', blank=True, null=True)
     description = models.TextField(blank=True)
@@ -43,11 +50,77 @@ class Source(models.Model):
         default=dict,
         help_text="Configuration for scraping (CSS selectors, API keys, etc.)"
     )
+    scraping_state = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="High-water marks from earlier runs (since_id, ETag, ...), maintained by the scrapers"
+    )
     last_scraped = models.DateTimeField(null=True, blank=True)
+
+    # Per-source scrape schedule, adapted to the publish rate (see news/scraping.py)
+    scrape_enabled = models.BooleanField(default=False)
+    scrape_interval = models.PositiveIntegerField(
+        default=6 * 3600,
+        help_text="Seconds between scrapes, adjusted after each run"
+    )
+    publish_rate = models.FloatField(default=0, help_text="Smoothed new items per hour")
+    next_scrape_at = models.DateTimeField(null=True, blank=True, db_index=True)
     
     def __str__(self):
         return f"{self.name} ({self.source_type})"
 
+# Large columns list views never render; deferring them keeps feed rows small
+LIST_DEFERRED_FIELDS = ['content', 'content_swahili', 'content_sheng', 'search_vector']
+
+PUBLISHED = Q(status='published')
+
+
+class NewsQuerySet(models.QuerySet):
+    """QuerySet helpers for news articles."""
+
+    def for_listing(self):
+        """
+        Attach everything NewsListSerializer needs so a page of news
+        serializes in a fixed number of queries, whatever its size.
+        Article bodies are deferred; use .defer(None) when rendering details.
+        """
+        comments = Comment.objects.filter(
+            news=OuterRef('pk'), parent=None, is_approved=True
+        ).order_by().values('news').annotate(total=Count('pk')).values('total')
+        ratings = NewsRating.objects.filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(avg=Avg('rating')).values('avg')
+
+        return self.select_related('source').prefetch_related(
+            'categories', 'tags'
+        ).defer(*LIST_DEFERRED_FIELDS).annotate(
+            comments_count=Coalesce(Subquery(comments, output_field=IntegerField()), Value(0)),
+            average_rating=Coalesce(Subquery(ratings, output_field=FloatField()), Value(0.0)),
+        )
+    
+    def update_search_vector(self):
+        """
+        Rebuild the full-text search vector for these articles in one UPDATE.
+        
+        English fields are stemmed with the English configuration; Swahili and
+        Sheng fields use their own (SEARCH_CONFIGS), 'simple' by default.
+        """
+        if not is_full_text_available():
+            return 0
+        english, swahili, sheng = search_config('en'), search_config('sw'), search_config('sheng')
+        return self.update(search_vector=(
+            SearchVector('title', weight='A', config=english)
+            + SearchVector('title', weight='A', config=swahili)
+            + SearchVector('summary', weight='B', config=english)
+            + SearchVector('summary_swahili', weight='B', config=swahili)
+            + SearchVector('summary_sheng', weight='B', config=sheng)
+            + SearchVector('content', weight='C', config=english)
+            + SearchVector('content_swahili', weight='C', config=swahili)
+            + SearchVector('content_sheng', weight='C', config=sheng)
+            + SearchVector('author', weight='D', config='simple')
+        ))
+
+
 class News(models.Model):
     """Model for news articles."""
     
@@ -66,7 +139,9 @@ class News(models.Model):
     summary_sheng = models.TextField(blank=True, null=True)
     
     source = models.ForeignKey(Source, on_delete=models.CASCADE, related_name="news")
-    original_url = models.URLField(blank=True)
+    # Upsert key for scraped articles (see news/ingest.py); NULL for articles
+    # written in-house, which never conflict
+    original_url = models.URLField(max_length=500, blank=True, null=True, unique=True)
     
     categories = models.ManyToManyField(Category, related_name="news")
     
@@ -102,14 +177,68 @@ class News(models.Model):
     is_ai_processed = models.BooleanField(default=False)
     ai_processing_date = models.DateTimeField(null=True, blank=True)
     
+    # Full-text search, maintained by news.signals
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    objects = NewsQuerySet.as_manager()
+    
     class Meta:
         verbose_name_plural = "news"
         ordering = ['-published_date']
+        # Every public query filters on status='published' and pages by
+        # (published_date, id), so the feed indexes are partial on published
+        # rows and end in that key. See NewsQueryPlanTests.
+        indexes = [
+            GinIndex(fields=['search_vector'], name='news_search_vector_gin'),
+            # Main feed and keyset seeks; INCLUDE lets filtered feeds and
+            # estimated counts check the filterset columns from the index alone
+            models.Index(
+                fields=['-published_date', '-id'],
+                include=['source', 'county', 'town', 'is_fact_checked'],
+                condition=PUBLISHED,
+                name='news_published_feed_idx',
+            ),
+            # local: county__iexact / town__iexact compile to UPPER(col) = UPPER(%s)
+            models.Index(
+                Upper('county'), F('published_date').desc(), F('id').desc(),
+                condition=PUBLISHED,
+                name='news_county_feed_idx',
+            ),
+            models.Index(
+                Upper('town'), F('published_date').desc(), F('id').desc(),
+                condition=PUBLISHED,
+                name='news_town_feed_idx',
+            ),
+            models.Index(
+                fields=['-published_date', '-id'],
+                condition=PUBLISHED & Q(is_fact_checked=True),
+                name='news_fact_checked_feed_idx',
+            ),
+            models.Index(
+                fields=['source', '-published_date', '-id'],
+                condition=PUBLISHED,
+                name='news_source_feed_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.title
 
 
+class NewsDuplicate(models.Model):
+    """A scraped copy of a story that is already stored as another article."""
+    
+    canonical = models.ForeignKey(News, on_delete=models.CASCADE, related_name="duplicates")
+    source = models.ForeignKey(Source, on_delete=models.CASCADE, related_name="duplicates")
+    original_url = models.URLField(max_length=500, unique=True)
+    title = models.CharField(max_length=255, blank=True)
+    similarity = models.FloatField()  # estimated Jaccard similarity to the canonical article
+    detected_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.original_url} -> {self.canonical.title}"
+
+
 class Tag(models.Model):
     """Model for news tags."""
     
@@ -182,17 +311,107 @@ class NewsRating(models.Model):
         return f"{self.user.email} - {self.news.title} - {self.rating}"
 
 
-class Comment(models.Model):
+class Comment(ThreadMixin, models.Model):
     """Model for comments on news articles."""
     
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     news = models.ForeignKey(News, on_delete=models.CASCADE, related_name="comments")
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name="replies")
+    # Top-level comment and materialized path, set on first save (see core.threads)
+    thread = models.ForeignKey(
+        'self', on_delete=models.CASCADE, null=True, blank=True, related_name="+", editable=False, db_index=False
+    )
+    path = models.TextField(blank=True, editable=False)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_edited = models.BooleanField(default=False)
     is_approved = models.BooleanField(default=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['thread', 'path'], name='news_comment_thread_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.email} - {self.news.title[:30]}"
+
+class TrendingScore(models.Model):
+    """
+    Precomputed trending score for a published article.
+    
+    The score is the log of the article's weighted engagement plus a recency
+    term, so ordering by it equals ordering by exponentially decayed
+    engagement at any moment. Rows therefore only need recomputing when an
+    article's engagement changes (see news.trending).
+    """
+    
+    news = models.OneToOneField(News, on_delete=models.CASCADE, primary_key=True, related_name="trending")
+    score = models.FloatField()
+    
+    # Denormalized from News so per-county top-N is a single index range scan
+    county = models.CharField(max_length=100, blank=True)
+    published_date = models.DateTimeField()
+    
+    # Engagement the score was computed from; the refresh rescores articles whose totals differ
+    view_count = models.PositiveIntegerField(default=0)
+    share_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    save_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-score']
+        indexes = [
+            models.Index(fields=['-score'], name='news_trending_score_idx'),
+            models.Index(fields=['county', '-score'], name='news_trending_county_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.news.title} - {self.score:.2f}"
+
+
+class SentimentRollup(models.Model):
+    """
+    Sentiment of scraped social items for one hour, county and topic.
+    
+    Items are scored in batches (see news.sentiment) and only these sums are
+    stored: each batch adds to the rows it touches, and means are the sums
+    divided by the counts. topic '' is every item in the county, county ''
+    items without a location.
+    """
+    
+    bucket = models.DateTimeField()  # start of the hour
+    county = models.CharField(max_length=100, blank=True)
+    topic = models.CharField(max_length=100, blank=True)
+    
+    item_count = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    # Sums weighted by each item's engagement (core.ai.sentiment.engagement_weights)
+    weighted_score_sum = models.FloatField(default=0)
+    weight_sum = models.FloatField(default=0)
+    positive_count = models.PositiveIntegerField(default=0)
+    negative_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-bucket']
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'county', 'topic'], name='news_sentiment_rollup_key'),
+        ]
+        indexes = [
+            # Hourly series for a county or topic
+            models.Index(fields=['county', 'topic', '-bucket'], name='news_sentiment_county_idx'),
+            models.Index(fields=['topic', '-bucket'], name='news_sentiment_topic_idx'),
+        ]
+    
+    @property
+    def mean_score(self):
+        return self.score_sum / self.item_count if self.item_count else 0.0
+    
+    @property
+    def weighted_score(self):
+        return self.weighted_score_sum / self.weight_sum if self.weight_sum else 0.0
+    
     def __str__(self):
-        return f"{self.user.email} - {self.news.title[:30]}"
\ No newline at end of file
+        return f"{self.bucket:%Y-%m-%d %H:00} {self.county or 'all'}/{self.topic or 'all'}: {self.mean_score:+.2f}"
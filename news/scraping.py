@@ -0,0 +1,157 @@
+"""
+Per-source scraping for the Celery workers.
+
+Every Source with ``scrape_enabled`` is scraped on its own schedule:
+``dispatch_due_scrapes`` (run by beat) enqueues a ``scrape_source`` task per
+due source, and any worker consuming the queue runs it, so adding workers
+adds scraping capacity. A cache lock keeps a source from being scraped twice
+at once, even if it is enqueued again while a slow run is still going.
+
+A run scrapes with the source's saved cursor, ingests the items straight
+into News, and only then stores the advanced cursor and the next run time,
+derived from the observed publish rate (see core.scrapers.scheduler).
+Runs of different sources ingest concurrently; they share the duplicate
+index through news.dedup, which serializes their updates to it, so a story
+picked up from two sources at once is still stored once.
+"""
+import asyncio
+import logging
+import sys
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.scrapers.scheduler import adaptive_interval, jittered, observe_rate
+from .ingest import IngestStats, ingest, parse_published
+from .models import Source
+
+logger = logging.getLogger(__name__)
+
+# Sources scraped through a platform API rather than their URL, by name
+SOCIAL_SCRAPERS = {
+    'twitter': 'TwitterScraper',
+    'facebook': 'FacebookScraper',
+    'telegram': 'TelegramScraper',
+    'reddit': 'RedditScraper',
+}
+
+
+def lock_key(source_id):
+    return f'scrape-lock:{source_id}'
+
+
+def acquire_lock(source_id):
+    """Return a token if this worker may scrape the source, else None."""
+    token = uuid.uuid4().hex
+    if cache.add(lock_key(source_id), token, timeout=settings.SCRAPE_LOCK_TIMEOUT):
+        return token
+    return None
+
+
+def release_lock(source_id, token):
+    # Only release our own lock; an expired one may belong to another run by now
+    if cache.get(lock_key(source_id)) == token:
+        cache.delete(lock_key(source_id))
+
+
+def scraper_for(source):
+    """Build the scraper for a source (social platform API or its website)."""
+    if source.name in SOCIAL_SCRAPERS:
+        from core.scrapers import social_scrapper
+
+        scraper = getattr(social_scrapper, SOCIAL_SCRAPERS[source.name])()
+    else:
+        from core.scrapers.blog_scrapper import BlogScraper
+
+        scraper = BlogScraper(source)
+    scraper.state = dict(source.scraping_state or {})
+    return scraper
+
+
+async def collect(scraper):
+    try:
+        return await scraper.process()
+    finally:
+        # The pooled HTTP client (if a scraper used one) belongs to this task's event loop
+        http_client = sys.modules.get('core.scrapers.http_client')
+        if http_client is not None:
+            await http_client.close_client()
+
+
+def count_new(items, since):
+    """Items published after the previous run (undated items count as new)."""
+    if since is None:
+        return len(items)
+    count = 0
+    for item in items:
+        published = parse_published(item.get('published_date'))
+        if published is None or published > since:
+            count += 1
+    return count
+
+
+def next_schedule(source, new_items, now):
+    """(publish rate, interval seconds, next run time) after a successful run."""
+    elapsed = (now - source.last_scraped).total_seconds() / 3600 if source.last_scraped else None
+    rate = observe_rate(source.publish_rate, new_items, elapsed, settings.SCRAPE_RATE_SMOOTHING)
+    if elapsed is None:
+        interval = source.scrape_interval
+    else:
+        interval = adaptive_interval(
+            rate, settings.SCRAPE_TARGET_ITEMS, settings.SCRAPE_MIN_INTERVAL, settings.SCRAPE_MAX_INTERVAL
+        )
+    next_at = now + timedelta(seconds=jittered(interval, settings.SCRAPE_JITTER))
+    return rate, int(interval), next_at
+
+
+def scrape(source):
+    """Scrape one source, ingest its items and schedule its next run. Returns IngestStats."""
+    started = timezone.now()
+    try:
+        scraper = scraper_for(source)
+        items = asyncio.run(collect(scraper))
+    except Exception as e:
+        # Try again after the current interval; the cursor is left as it was
+        logger.warning(f"Scraping {source.name} failed: {e}")
+        Source.objects.filter(pk=source.pk).update(
+            next_scrape_at=started + timedelta(seconds=jittered(source.scrape_interval, settings.SCRAPE_JITTER))
+        )
+        return IngestStats()
+
+    stats = ingest(items) if items else IngestStats()
+    rate, interval, next_at = next_schedule(source, count_new(items, source.last_scraped), started)
+    Source.objects.filter(pk=source.pk).update(
+        scraping_state=scraper.state,
+        last_scraped=started,
+        publish_rate=rate,
+        scrape_interval=interval,
+        next_scrape_at=next_at,
+    )
+    logger.info(
+        f"Scraped {source.name}: {len(items)} items, {stats.upserted} stored; "
+        f"{rate:.2f}/h, next run in {interval // 60} min"
+    )
+    return stats
+
+
+def due_sources(now=None):
+    now = now or timezone.now()
+    return Source.objects.filter(scrape_enabled=True).exclude(next_scrape_at__gt=now)
+
+
+def claim_due_sources(now=None):
+    """
+    Ids of the sources due for a scrape, pushed out by the lock timeout so
+    the next dispatch does not enqueue them again before their run has
+    rescheduled them.
+    """
+    now = now or timezone.now()
+    ids = list(due_sources(now).values_list('pk', flat=True))
+    if ids:
+        Source.objects.filter(pk__in=ids).update(
+            next_scrape_at=now + timedelta(seconds=settings.SCRAPE_LOCK_TIMEOUT)
+        )
+    return ids
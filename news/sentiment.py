@@ -0,0 +1,118 @@
+"""
+Hourly sentiment rollups from the scraped item stream (see core.ai.sentiment).
+
+Each completed segment of the scraper output stream is read once by the
+``sentiment`` consumer: its items are scored in batches and rolled up by
+hour, county and topic in memory (the tags BaseScraper.stream sets, see
+core.scrapers.tagging), and the sums are added to SentimentRollup
+rows with INSERT ... ON CONFLICT DO UPDATE, so late items for an old hour
+add to its row instead of overwriting it.
+
+A segment's rollups are committed in one transaction right before the
+segment is checkpointed (see core.scrapers.sinks.tail_segments), so it is
+counted twice only if a worker dies between the two.
+"""
+import logging
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from core.ai import sentiment
+from core.scrapers.sinks import DEFAULT_STREAM, tail_segments
+from .models import SentimentRollup
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'sentiment-stream-lock'
+CONSUMER = 'sentiment'
+SUM_FIELDS = [
+    'item_count', 'score_sum', 'weighted_score_sum', 'weight_sum', 'positive_count', 'negative_count',
+]
+KEY_FIELDS = ['bucket', 'county', 'topic']
+# Bind parameters per statement where the backend reports no limit (PostgreSQL's wire protocol)
+MAX_QUERY_PARAMS = 65535
+
+
+def write_batch_size(fields):
+    """SENTIMENT_WRITE_BATCH_SIZE, lowered to fit the backend's bind parameter limit."""
+    max_params = connection.features.max_query_params or MAX_QUERY_PARAMS
+    return max(1, min(settings.SENTIMENT_WRITE_BATCH_SIZE, max_params // len(fields)))
+
+
+def save_rollups(rollups):
+    """Add rollups (core.ai.sentiment.Rollup) to the stored rows, creating missing ones."""
+    county_length = SentimentRollup._meta.get_field('county').max_length
+    topic_length = SentimentRollup._meta.get_field('topic').max_length
+    # Keys that only differ past the column length become one row
+    rollups = sentiment.merge([
+        rollup._replace(county=rollup.county[:county_length], topic=rollup.topic[:topic_length])
+        for rollup in rollups
+    ])
+    fields = [SentimentRollup._meta.get_field(name) for name in KEY_FIELDS + SUM_FIELDS]
+    batch_size = write_batch_size(fields)
+    for start in range(0, len(rollups), batch_size):
+        insert_rollups(rollups[start:start + batch_size], fields)
+
+
+def insert_rollups(rollups, fields):
+    table = connection.ops.quote_name(SentimentRollup._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['(%s)' % ', '.join(['%s'] * len(fields))] * len(rollups))
+    updates = ', '.join(
+        f'{column} = {table}.{column} + EXCLUDED.{column}'
+        for column in (connection.ops.quote_name(SentimentRollup._meta.get_field(name).column) for name in SUM_FIELDS)
+    )
+    keys = ', '.join(connection.ops.quote_name(name) for name in KEY_FIELDS)
+
+    params = []
+    for rollup in rollups:
+        params.extend(field.get_db_prep_save(getattr(rollup, field.name), connection) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({columns}) VALUES {placeholders} '
+            f'ON CONFLICT ({keys}) DO UPDATE SET {updates}',
+            params,
+        )
+
+
+def score_items(items, batch_size=None):
+    """Rollups (not yet saved) for a batch of scraped items; items without text are skipped."""
+    items = [item for item in items if sentiment.item_text(item)]
+    if not items:
+        return []
+    scores = sentiment.score(
+        [sentiment.item_text(item) for item in items], batch_size=batch_size or sentiment.BATCH_SIZE
+    )
+    return sentiment.rollup(items, scores)
+
+
+def record_items(items, batch_size=None):
+    """Score scraped items and add them to the stored rollups. Returns the number of rollup rows touched."""
+    rollups = []
+    items = iter(items)
+    while True:
+        batch = list(islice(items, settings.SENTIMENT_ITEMS_PER_BATCH))
+        if not batch:
+            break
+        rollups = sentiment.merge(rollups + score_items(batch, batch_size))
+    with transaction.atomic():
+        save_rollups(rollups)
+    return len(rollups)
+
+
+def process_stream(directory=None, batch_size=None):
+    """Roll up every scraped segment not read yet; one run at a time across workers."""
+    if not cache.add(LOCK_KEY, 1, timeout=settings.SENTIMENT_LOCK_TIMEOUT):
+        return 0
+
+    rows = 0
+    try:
+        segments = tail_segments(directory or settings.SCRAPER_RESULTS_DIR, DEFAULT_STREAM, consumer=CONSUMER)
+        for items in segments:
+            rows += record_items(items, batch_size)
+    finally:
+        cache.delete(LOCK_KEY)
+    logger.info(f"Updated {rows} sentiment rollups")
+    return rows
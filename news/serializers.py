@@ -1,13 +1,20 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+
+from core.threads import ThreadListSerializer, replies_of
+from core.viewer_state import ViewerStateListSerializer, ViewerStateMixin
 from .models import (
     Category, Source, News, Tag, FactCheck, 
-    SavedNews, NewsRating, Comment
+    SavedNews, NewsRating, Comment, SentimentRollup
 )
 
 User = get_user_model()
 
 
+def saved_news_ids(user, news_ids):
+    return SavedNews.objects.filter(user=user, news_id__in=news_ids).values_list('news_id', flat=True)
+
+
 class CategorySerializer(serializers.ModelSerializer):
     """Serializer for news categories."""
     
@@ -87,23 +94,32 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'created_at', 'updated_at', 'is_edited']
     
     def get_replies_count(self, obj):
-        return obj.replies.count()
+        # Approved direct replies only, the ones listed under the comment;
+        # taken from the loaded thread when there is one
+        if hasattr(obj, 'thread_replies'):
+            return len(obj.thread_replies)
+        return obj.replies.filter(is_approved=True).count()
 
 
 class CommentDetailSerializer(CommentSerializer):
-    """Detailed serializer for comments with replies."""
+    """Detailed serializer for comments with their reply threads."""
     
     replies = serializers.SerializerMethodField()
     
     class Meta(CommentSerializer.Meta):
         fields = CommentSerializer.Meta.fields + ['replies']
+        list_serializer_class = ThreadListSerializer
+    
+    def get_reply_queryset(self):
+        return Comment.objects.filter(is_approved=True).select_related('user')
     
     def get_replies(self, obj):
-        replies = obj.replies.filter(is_approved=True).order_by('created_at')
-        return CommentSerializer(replies, many=True).data
+        # Loaded with the rest of the page's threads, at any depth
+        replies = replies_of(obj, self.get_reply_queryset())
+        return CommentDetailSerializer(replies, many=True, context=self.context).data
 
 
-class NewsListSerializer(serializers.ModelSerializer):
+class NewsListSerializer(ViewerStateMixin, serializers.ModelSerializer):
     """Serializer for listing news articles."""
     
     source_name = serializers.CharField(source='source.name', read_only=True)
@@ -112,33 +128,43 @@ class NewsListSerializer(serializers.ModelSerializer):
     comments_count = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
     is_saved = serializers.SerializerMethodField()
+    search_highlight = serializers.SerializerMethodField()
+    
+    viewer_relations = {'saved_news': saved_news_ids}
     
     class Meta:
         model = News
+        list_serializer_class = ViewerStateListSerializer
         fields = [
             'id', 'title', 'slug', 'summary', 'summary_swahili', 'summary_sheng',
             'source', 'source_name', 'featured_image', 'image_caption',
             'author', 'published_date', 'categories', 'tags',
             'is_fact_checked', 'view_count', 'share_count',
             'country', 'county', 'town', 'comments_count',
-            'average_rating', 'is_saved'
+            'average_rating', 'is_saved', 'search_highlight'
         ]
-        read_only_fields = ['id', 'comments_count', 'average_rating', 'is_saved']
+        read_only_fields = ['id', 'comments_count', 'average_rating', 'is_saved', 'search_highlight']
     
     def get_comments_count(self, obj):
+        # Annotated by News.objects.for_listing(); fall back for plain instances
+        if hasattr(obj, 'comments_count'):
+            return obj.comments_count
         return obj.comments.filter(parent=None, is_approved=True).count()
     
     def get_average_rating(self, obj):
+        if hasattr(obj, 'average_rating'):
+            return obj.average_rating
         ratings = obj.ratings.all()
         if not ratings:
             return 0
         return sum(r.rating for r in ratings) / len(ratings)
     
     def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return SavedNews.objects.filter(user=request.user, news=obj).exists()
-        return False
+        return self.viewer_flag('saved_news', obj)
+    
+    def get_search_highlight(self, obj):
+        # Only present when the queryset went through FullTextSearchFilter
+        return getattr(obj, 'search_headline', None)
 
 
 class NewsDetailSerializer(NewsListSerializer):
@@ -200,4 +226,18 @@ class SavedNewsSerializer(serializers.ModelSerializer):
     class Meta:
         model = SavedNews
         fields = ['id', 'news', 'saved_date']
-        read_only_fields = ['id', 'saved_date']
\ No newline at end of file
+        read_only_fields = ['id', 'saved_date']
+
+class SentimentRollupSerializer(serializers.ModelSerializer):
+    """Serializer for hourly sentiment rollups."""
+    
+    mean_score = serializers.FloatField(read_only=True)
+    weighted_score = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = SentimentRollup
+        fields = [
+            'bucket', 'county', 'topic', 'item_count', 'mean_score',
+            'weighted_score', 'positive_count', 'negative_count'
+        ]
+        read_only_fields = fields
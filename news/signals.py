@@ -0,0 +1,79 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from core.cache import invalidate
+from core.conditional import touch_owners
+from .models import Category, FactCheck, Source, News, Tag
+from .tasks import index_fact_checks
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = {
+    'title', 'summary', 'summary_swahili', 'summary_sheng',
+    'content', 'content_swahili', 'content_sheng', 'author',
+}
+
+
+@receiver(post_save, sender=News)
+def update_news_search_vector(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the full-text search vector in step with the article text
+    """
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    News.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver([post_save, post_delete], sender=News)
+@receiver(m2m_changed, sender=News.categories.through)
+@receiver(m2m_changed, sender=Tag.news.through)
+def invalidate_news_responses(sender, **kwargs):
+    """
+    Mark cached anonymous news responses stale
+    """
+    invalidate('news')
+
+
+@receiver(m2m_changed, sender=News.categories.through)
+@receiver(m2m_changed, sender=Tag.news.through)
+def touch_news_relations(sender, **kwargs):
+    """
+    Categories and tags render in the article, so changing them moves its
+    updated_at (and with it the detail ETag)
+    """
+    touch_owners(News, sender, **kwargs)
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_responses(sender, **kwargs):
+    invalidate('categories')
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_tag_responses(sender, **kwargs):
+    invalidate('tags')
+
+
+@receiver([post_save, post_delete], sender=Source)
+def invalidate_source_responses(sender, **kwargs):
+    invalidate('sources')
+
+
+@receiver([post_save, post_delete], sender=FactCheck)
+def queue_fact_check_indexing(sender, instance, **kwargs):
+    """
+    Queue the claim for (re)embedding into the claim index once committed;
+    a deleted fact-check is dropped from it.
+    """
+    pk = instance.pk
+
+    def enqueue():
+        try:
+            index_fact_checks.delay([pk])
+        except Exception as e:
+            logger.warning(f"Could not queue fact-check {pk} for indexing: {e}")
+
+    transaction.on_commit(enqueue)
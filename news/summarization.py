@@ -0,0 +1,65 @@
+"""
+Fill in AI summaries for scraped articles (see core.ai.summarizer).
+
+Articles not yet processed are taken in pk order, a batch at a time.
+Articles that already carry a summary (from the feed or an editor) keep it
+and are only marked processed. Results are written back with one
+bulk_update per batch, which bypasses save(), so search vectors and the
+response cache are refreshed here.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.ai import summarizer
+from core.cache import invalidate
+from .models import News
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'summarize-news-lock'
+
+
+def summarize_batch(articles):
+    """Summarize a list of News in place and save them. Returns how many got a new summary."""
+    pending = [article for article in articles if not article.summary and article.content]
+    for article, summary in zip(pending, summarizer.summarize([a.content for a in pending])):
+        article.summary = summary
+
+    now = timezone.now()
+    for article in articles:
+        article.is_ai_processed = True
+        article.ai_processing_date = now
+    News.objects.bulk_update(articles, ['summary', 'is_ai_processed', 'ai_processing_date'])
+    if pending:
+        News.objects.filter(pk__in=[a.pk for a in pending]).update_search_vector()
+        invalidate('news')
+    return len(pending)
+
+
+def summarize_pending(limit=None, batch_size=None):
+    """Process up to limit unprocessed articles; one run at a time across workers."""
+    limit = limit or settings.SUMMARIZE_NEWS_LIMIT
+    batch_size = batch_size or settings.SUMMARIZE_NEWS_BATCH_SIZE
+    if not cache.add(LOCK_KEY, 1, timeout=settings.SUMMARIZE_LOCK_TIMEOUT):
+        return 0
+
+    summarized = 0
+    try:
+        last_pk = 0
+        while limit > 0:
+            articles = list(
+                News.objects.filter(is_ai_processed=False, pk__gt=last_pk)
+                .order_by('pk').only('pk', 'content', 'summary')[:min(batch_size, limit)]
+            )
+            if not articles:
+                break
+            summarized += summarize_batch(articles)
+            last_pk = articles[-1].pk
+            limit -= len(articles)
+    finally:
+        cache.delete(LOCK_KEY)
+    logger.info(f"Summarized {summarized} articles")
+    return summarized
@@ -0,0 +1,90 @@
+import logging
+
+from celery import shared_task
+
+from django.conf import settings
+
+from core.cache import invalidate
+from core.scrapers.sinks import DEFAULT_STREAM, prune_segments, tail_segments
+from . import fact_checks, scraping, sentiment, summarization
+from .ingest import ingest
+from .models import Source
+from .trending import refresh_trending_scores as refresh_scores
+
+logger = logging.getLogger(__name__)
+
+INGEST_CONSUMER = 'ingest'
+# Every consumer of the scraped stream; a segment is kept until all have read it
+STREAM_CONSUMERS = [INGEST_CONSUMER, sentiment.CONSUMER]
+
+
+@shared_task
+def refresh_trending_scores(full=False):
+    """Recompute trending scores for articles with new engagement."""
+    updated = refresh_scores(full=full)
+    if updated:
+        invalidate('trending')
+    logger.info(f"Refreshed {updated} trending scores")
+    return updated
+
+
+@shared_task
+def ingest_scraped_news():
+    """Upsert articles from scraper output segments this consumer has not read yet."""
+    upserted = 0
+    for items in tail_segments(settings.SCRAPER_RESULTS_DIR, DEFAULT_STREAM, consumer=INGEST_CONSUMER):
+        upserted += ingest(items).upserted
+    return upserted
+
+
+@shared_task
+def prune_scraped_segments():
+    """Delete scraper output segments every consumer has read, or that outlived SCRAPER_SEGMENT_MAX_AGE."""
+    deleted = prune_segments(
+        settings.SCRAPER_RESULTS_DIR, DEFAULT_STREAM, STREAM_CONSUMERS, max_age=settings.SCRAPER_SEGMENT_MAX_AGE
+    )
+    logger.info(f"Pruned {deleted} scraped segments")
+    return deleted
+
+
+@shared_task(time_limit=settings.SUMMARIZE_LOCK_TIMEOUT)
+def summarize_news():
+    """Generate summaries for articles the AI pipeline has not processed yet."""
+    return summarization.summarize_pending()
+
+
+@shared_task(time_limit=settings.SENTIMENT_LOCK_TIMEOUT)
+def score_sentiment():
+    """Add newly scraped items to the hourly sentiment rollups."""
+    return sentiment.process_stream()
+
+
+@shared_task
+def index_fact_checks(fact_check_ids):
+    """Embed new or edited fact-check claims into the claim index, dropping deleted ones."""
+    return fact_checks.index_fact_checks(fact_check_ids)
+
+
+@shared_task
+def dispatch_due_scrapes():
+    """Enqueue a scrape for every enabled source whose next run is due."""
+    source_ids = scraping.claim_due_sources()
+    for source_id in source_ids:
+        scrape_source.delay(source_id)
+    return len(source_ids)
+
+
+@shared_task(time_limit=settings.SCRAPE_LOCK_TIMEOUT)
+def scrape_source(source_id):
+    """Scrape one source unless another worker is already on it."""
+    token = scraping.acquire_lock(source_id)
+    if token is None:
+        logger.info(f"Source {source_id} is already being scraped")
+        return 0
+    try:
+        source = Source.objects.filter(pk=source_id, scrape_enabled=True).first()
+        if source is None:
+            return 0
+        return scraping.scrape(source).upserted
+    finally:
+        scraping.release_lock(source_id, token)
@@ -1,3 +1,1198 @@
-from django.test import TestCase
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from importlib.util import find_spec
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from core import counters
+from core.ai import sentiment as sentiment_model, summarizer
+from core.ai.cache import InferenceCache
+from core.cache import response_cache_key
+from core.scrapers.dedup import MinHashLSH
+from core.scrapers.sinks import NDJSONSink
+from core.scrapers.state import SourceStateStore
+from . import dedup, fact_checks, scraping, sentiment, summarization
+from .ingest import ingest
+from .dedup import rebuild_index
+from .models import Category, Source, News, NewsDuplicate, FactCheck, Tag, SavedNews, NewsRating, Comment, TrendingScore, SentimentRollup
+from .tasks import scrape_source
+from .trending import refresh_trending_scores
+
+User = get_user_model()
+
+
+# Counters are flushed explicitly, so query counts do not depend on a timer thread
+@override_settings(RESPONSE_CACHE_ALIAS='local', COUNTERS_LOCAL_FLUSH_INTERVAL=0)
+class NewsAPITestCase(APITestCase):
+    """Keeps the anonymous response cache in-process and empty for every test."""
+
+    def setUp(self):
+        caches['local'].clear()
+        super().setUp()
+
+
+class NewsListQueryBudgetTests(NewsAPITestCase):
+    """News list endpoints must serialize a page in a fixed number of queries."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email='reader@example.com', password='testpass123')
+        self.other = User.objects.create_user(email='other@example.com', password='testpass123')
+        self.source = Source.objects.create(
+            name='Test Source', url='https://example.com', source_type='blog'
+        )
+        self.category = Category.objects.create(name='Politics', slug='politics')
+
+        for i in range(30):
+            news = News.objects.create(
+                title=f'Story {i}',
+                slug=f'story-{i}',
+                content='Body',
+                source=self.source,
+                published_date=timezone.now() - timezone.timedelta(hours=i),
+                status='published',
+                is_fact_checked=i % 2 == 0,
+                county='Nairobi',
+            )
+            news.categories.add(self.category)
+            tag = Tag.objects.create(name=f'tag-{i}', slug=f'tag-{i}')
+            tag.news.add(news)
+            NewsRating.objects.create(user=self.user, news=news, rating=4)
+            NewsRating.objects.create(user=self.other, news=news, rating=2)
+            Comment.objects.create(user=self.other, news=news, content='First')
+            if i % 3 == 0:
+                SavedNews.objects.create(user=self.user, news=news)
+
+    def count_queries(self, url, params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response
+
+    def test_list_query_count_independent_of_page_size(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse('news:news-list')
+
+        small, _ = self.count_queries(url, {'page_size': 2})
+        large, response = self.count_queries(url, {'page_size': 30})
+
+        self.assertEqual(small, large)
+        # page, categories, tags, saved ids
+        self.assertLessEqual(large, 4)
+        item = response.data['results'][0]
+        self.assertEqual(item['comments_count'], 1)
+        self.assertEqual(item['average_rating'], 3.0)
+        self.assertTrue(item['is_saved'])
+
+    def test_saved_flags_cost_one_query_per_page(self):
+        url = reverse('news:news-list')
+        anonymous, _ = self.count_queries(url, {'page_size': 30})
+        self.client.force_authenticate(user=self.user)
+        authenticated, response = self.count_queries(url, {'page_size': 30})
+
+        self.assertEqual(authenticated, anonymous + 1)
+        saved = {item['slug'] for item in response.data['results'] if item['is_saved']}
+        self.assertEqual(saved, {f'story-{i}' for i in range(0, 30, 3)})
+
+    def test_action_endpoints_stay_within_budget(self):
+        self.client.force_authenticate(user=self.user)
+        for name in ['news-trending', 'news-fact-checked', 'news-local', 'news-saved']:
+            small, _ = self.count_queries(reverse(f'news:{name}'), {'page_size': 2, 'county': 'Nairobi'})
+            large, _ = self.count_queries(reverse(f'news:{name}'), {'page_size': 30, 'county': 'Nairobi'})
+            self.assertEqual(small, large, name)
+            self.assertLessEqual(large, 6, name)
+
+
+class FakeRedis:
+    """The Redis commands RedisCounterBuffer uses, in memory."""
+
+    def __init__(self):
+        self.hashes, self.sets, self.locked = {}, {}, False
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+    def hincrby(self, key, field, amount):
+        values = self.hashes.setdefault(key, {})
+        field = str(field).encode()
+        values[field] = str(int(values.get(field, 0)) + amount).encode()
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member.encode())
+
+    def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    def rename(self, source, target):
+        import redis
+
+        if source not in self.hashes:
+            raise redis.ResponseError('no such key')
+        self.hashes[target] = self.hashes.pop(source)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(str(field).encode(), None)
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+    def lock(self, name, timeout=None):
+        client = self
+
+        class Lock:
+            def acquire(self, blocking=True):
+                if client.locked:
+                    return False
+                client.locked = True
+                return True
+
+            def release(self):
+                client.locked = False
+
+        return Lock()
+
+
+@override_settings(COUNTERS_BACKEND='local')
+class NewsCounterTests(NewsAPITestCase):
+    """View and share counts are buffered and flushed in bulk."""
+
+    def setUp(self):
+        super().setUp()
+        counters.get_local_buffer().drain()
+        source = Source.objects.create(name='Test Source', url='https://example.com', source_type='blog')
+        self.news = News.objects.create(
+            title='Story', slug='story', content='Body', source=source,
+            published_date=timezone.now(), status='published',
+        )
+
+    def test_views_and_shares_are_written_behind(self):
+        detail = reverse('news:news-detail', args=[self.news.slug])
+        for _ in range(3):
+            response = self.client.get(detail)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.post(reverse('news:news-share', args=[self.news.slug]))
+
+        self.news.refresh_from_db()
+        self.assertEqual(self.news.view_count, 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            counters.flush()
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+        self.news.refresh_from_db()
+        self.assertEqual(self.news.view_count, 3)
+        self.assertEqual(self.news.share_count, 1)
+
+    def test_flush_timer_follows_the_setting(self):
+        buffer = counters.get_local_buffer()
+        with patch('core.counters.threading.Thread') as thread:
+            counters.increment(News, 'view_count', self.news.pk)
+            thread.assert_not_called()
+            with override_settings(COUNTERS_LOCAL_FLUSH_INTERVAL=5):
+                counters.increment(News, 'view_count', self.news.pk)
+            thread.assert_called_once()
+            # A timer that wakes up to a 0 interval stops, and the next increment may start one again
+            buffer._run()
+        self.assertIsNone(buffer._flusher_pid)
+
+    def test_failed_local_flush_keeps_its_deltas(self):
+        counters.increment(News, 'view_count', self.news.pk, 2)
+        with patch('core.counters.apply_increments', side_effect=DatabaseError('down')):
+            with self.assertRaises(DatabaseError):
+                counters.flush()
+
+        counters.flush()
+        self.news.refresh_from_db()
+        self.assertEqual(self.news.view_count, 2)
+
+    @override_settings(COUNTERS_BACKEND='redis')
+    def test_redis_snapshot_is_deleted_only_after_it_is_applied(self):
+        buffer = counters.RedisCounterBuffer.__new__(counters.RedisCounterBuffer)
+        buffer.client = FakeRedis()
+        with patch('core.counters.get_redis_buffer', return_value=buffer):
+            counters.increment(News, 'view_count', self.news.pk, 3)
+            with patch('core.counters.apply_increments', side_effect=DatabaseError('down')):
+                with self.assertRaises(DatabaseError):
+                    counters.flush()
+            counters.increment(News, 'view_count', self.news.pk, 1)
+
+            # Another flush holds the lock: nothing is applied twice
+            buffer.client.locked = True
+            self.assertEqual(counters.flush(), {})
+            buffer.client.locked = False
+
+            counters.flush()
+            self.news.refresh_from_db()
+            self.assertEqual(self.news.view_count, 4)
+            self.assertEqual(counters.flush(), {})
+        self.assertEqual(buffer.client.hashes, {})
+
+
+class TrendingScoreTests(NewsAPITestCase):
+    """Trending reads a precomputed, time-decayed ranking."""
+
+    def setUp(self):
+        super().setUp()
+        source = Source.objects.create(name='Test Source', url='https://example.com', source_type='blog')
+        now = timezone.now()
+        self.old = News.objects.create(
+            title='Old viral', slug='old-viral', content='Body', source=source, status='published',
+            published_date=now - timezone.timedelta(days=5), view_count=100, county='Mombasa',
+        )
+        self.fresh = News.objects.create(
+            title='Fresh', slug='fresh', content='Body', source=source, status='published',
+            published_date=now - timezone.timedelta(hours=1), view_count=10, county='Nairobi',
+        )
+
+    def test_recent_engagement_outranks_decayed_views(self):
+        self.assertEqual(refresh_trending_scores(), 2)
+
+        response = self.client.get(reverse('news:news-trending'))
+        self.assertEqual([item['slug'] for item in response.data], ['fresh', 'old-viral'])
+
+        response = self.client.get(reverse('news:news-trending'), {'county': 'mombasa'})
+        self.assertEqual([item['slug'] for item in response.data], ['old-viral'])
+
+    def test_limit_is_clamped(self):
+        refresh_trending_scores()
+        url = reverse('news:news-trending')
+        self.assertEqual(len(self.client.get(url, {'limit': -1}).data), 1)
+        self.assertEqual(len(self.client.get(url, {'limit': 'all'}).data), 2)
+
+    def test_refresh_only_touches_changed_articles(self):
+        refresh_trending_scores()
+        self.assertEqual(refresh_trending_scores(), 0)
+
+        News.objects.filter(pk=self.old.pk).update(view_count=5000)
+        self.assertEqual(refresh_trending_scores(), 1)
+        self.assertGreater(
+            TrendingScore.objects.get(news=self.old).score,
+            TrendingScore.objects.get(news=self.fresh).score,
+        )
+
+    def test_rerates_unsaves_and_deletions_are_picked_up(self):
+        user = User.objects.create_user(email='reader@example.com', password='testpass123')
+        rating = NewsRating.objects.create(user=user, news=self.old, rating=1)
+        saved = SavedNews.objects.create(user=user, news=self.fresh)
+        refresh_trending_scores()
+        self.assertEqual(refresh_trending_scores(), 0)
+
+        # Updates and deletes leave no newer created_at behind
+        NewsRating.objects.filter(pk=rating.pk).update(rating=5)
+        self.assertEqual(refresh_trending_scores(), 1)
+        self.assertEqual(TrendingScore.objects.get(news=self.old).rating_total, 5)
+
+        saved.delete()
+        self.assertEqual(refresh_trending_scores(), 1)
+        self.assertEqual(TrendingScore.objects.get(news=self.fresh).save_count, 0)
+        self.assertEqual(refresh_trending_scores(), 0)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Full-text search requires PostgreSQL')
+class NewsSearchTests(NewsAPITestCase):
+    """Search uses the ranked, highlighted full-text index."""
+
+    def setUp(self):
+        super().setUp()
+        source = Source.objects.create(name='Test Source', url='https://example.com', source_type='blog')
+        News.objects.create(
+            title='Floods hit Nairobi', slug='floods', content='Heavy rains flooded several estates.',
+            content_swahili='Mafuriko makubwa yamekumba Nairobi.', source=source,
+            published_date=timezone.now() - timezone.timedelta(days=1), status='published',
+        )
+        News.objects.create(
+            title='Budget reading', slug='budget', content='The minister mentioned floods once.',
+            source=source, published_date=timezone.now(), status='published',
+        )
+
+    def test_results_are_ranked_and_highlighted(self):
+        response = self.client.get(reverse('news:news-list'), {'search': 'flooding'})
+        results = response.data['results']
+        self.assertEqual([item['slug'] for item in results], ['floods', 'budget'])
+        self.assertIn('<mark>', results[0]['search_highlight'])
+
+    def test_swahili_content_is_searchable(self):
+        response = self.client.get(reverse('news:news-list'), {'search': 'mafuriko'})
+        self.assertEqual([item['slug'] for item in response.data['results']], ['floods'])
+
+
+class NewsKeysetPaginationTests(NewsAPITestCase):
+    """Feeds paginate by (published_date, id) cursors."""
+
+    def setUp(self):
+        super().setUp()
+        source = Source.objects.create(name='Test Source', url='https://example.com', source_type='blog')
+        same_time = timezone.now()
+        for i in range(23):
+            News.objects.create(
+                title=f'Story {i}', slug=f'story-{i}', content='Body', source=source, status='published',
+                # Pairs share a timestamp so the id tie-breaker matters
+                published_date=same_time - timezone.timedelta(minutes=i // 2),
+            )
+        self.expected = list(
+            News.objects.order_by('-published_date', '-id').values_list('slug', flat=True)
+        )
+
+    def test_walks_every_article_once_in_order(self):
+        url, slugs = reverse('news:news-list') + '?page_size=5', []
+        while url:
+            response = self.client.get(url)
+            self.assertNotIn('count', response.data)
+            slugs += [item['slug'] for item in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(slugs, self.expected)
+
+    def test_previous_link_returns_preceding_page(self):
+        first = self.client.get(reverse('news:news-list'), {'page_size': 5})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_page_numbers_are_opt_in(self):
+        response = self.client.get(reverse('news:news-list'), {'page': 2, 'page_size': 5})
+        self.assertEqual([item['slug'] for item in response.data['results']], self.expected[5:10])
+        self.assertIsNotNone(response.data['next'])
+        self.assertGreaterEqual(response.data['count'], 11)
+        if not response.data['count_is_estimate']:
+            self.assertEqual(response.data['count'], 23)
+
+    def test_page_numbers_are_bounded_by_the_rows_not_the_count(self):
+        last = self.client.get(reverse('news:news-list'), {'page': 5, 'page_size': 5})
+        self.assertEqual([item['slug'] for item in last.data['results']], self.expected[20:])
+        self.assertIsNone(last.data['next'])
+
+        past_end = self.client.get(reverse('news:news-list'), {'page': 6, 'page_size': 5})
+        self.assertEqual(past_end.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursors_with_invalid_values_are_rejected(self):
+        valid = ['2024-05-01T10:00:00', 1]
+        cursors = [
+            {'v': values, 'r': False}
+            for values in (['not a date', 1], ['2024-13-45T00:00:00', 1], [None, 1], ['2024-05-01T10:00:00', 'x'])
+        ] + [{'v': valid}, {'v': valid, 'r': 'yes'}, {'v': '2024', 'r': False}, [valid, False]]
+        for cursor in cursors:
+            encoded = base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+            response = self.client.get(reverse('news:news-list'), {'cursor': encoded})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, cursor)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Query plans are checked against PostgreSQL')
+class NewsQueryPlanTests(NewsAPITestCase):
+    """
+    EXPLAIN every news query issued by the hot endpoints and fail if any of
+    them has to fall back to a sequential scan of the news tables.
+
+    Sequential scans are disabled for the session, so the planner only picks
+    one when no index can serve the query.
+    """
+
+    SCANNED_TABLES = ('news_news', 'news_trendingscore')
+
+    def setUp(self):
+        super().setUp()
+        source = Source.objects.create(name='Test Source', url='https://example.com', source_type='blog')
+        self.source = source
+        counties = ['Nairobi', 'Mombasa', 'Kisumu', 'Nakuru']
+        News.objects.bulk_create([
+            News(
+                title=f'Story {i}', slug=f'story-{i}', content='Body', source=source,
+                status='published' if i % 5 else 'draft', is_fact_checked=i % 3 == 0,
+                published_date=timezone.now() - timezone.timedelta(hours=i),
+                county=counties[i % 4], town=f'Town {i % 10}',
+            )
+            for i in range(500)
+        ])
+        refresh_trending_scores()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cursor.execute('SET enable_seqscan = off')
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute('RESET enable_seqscan')
+
+    def assertNoSequentialScan(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with connection.cursor() as cursor:
+            for query in ctx.captured_queries:
+                if not query['sql'].startswith('SELECT'):
+                    continue
+                cursor.execute(f"EXPLAIN {query['sql']}")
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+                for table in self.SCANNED_TABLES:
+                    self.assertNotIn(f'Seq Scan on {table}', plan, f"{url} {params}:\n{plan}")
+        return response
+
+    def test_feed_endpoints_use_indexes(self):
+        list_url = reverse('news:news-list')
+        first = self.assertNoSequentialScan(list_url)
+        self.assertNoSequentialScan(first.data['next'])
+        self.assertNoSequentialScan(list_url, {'source': self.source.pk})
+        self.assertNoSequentialScan(list_url, {'is_fact_checked': 'true'})
+        self.assertNoSequentialScan(reverse('news:news-local'), {'county': 'nairobi'})
+        self.assertNoSequentialScan(reverse('news:news-local'), {'town': 'town 3'})
+        self.assertNoSequentialScan(reverse('news:news-fact-checked'))
+        self.assertNoSequentialScan(reverse('news:news-trending'))
+        self.assertNoSequentialScan(reverse('news:news-trending'), {'county': 'kisumu'})
+
+
+class AnonymousResponseCacheTests(NewsAPITestCase):
+    """Anonymous reads are cached, invalidated by signals and revalidated by one request."""
+
+    def setUp(self):
+        super().setUp()
+        Category.objects.create(name='Politics', slug='politics')
+        self.url = reverse('news:category-list')
+
+    def test_repeat_requests_skip_the_database(self):
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'utm_source': 'twitter'})
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_saves_invalidate_and_stale_copy_is_served_during_revalidation(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Sports', slug='sports')
+
+        # Another request is already recomputing this page
+        lock_key = f"{response_cache_key_for(self.client, self.url)}:lock"
+        caches['local'].add(lock_key, 1)
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'STALE')
+        self.assertEqual(len(response.data['results']), 1)
+
+        caches['local'].delete(lock_key)
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_lost_cache_connection_renders_uncached(self):
+        # The cache goes away between reading the generations and taking the lock
+        with patch.object(caches['local'], 'add', side_effect=ConnectionError('redis down')), \
+                patch.object(caches['local'], 'delete', side_effect=ConnectionError('redis down')):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_authenticated_requests_are_not_cached(self):
+        self.client.force_authenticate(user=User.objects.create_user(email='r@example.com', password='x'))
+        self.client.get(self.url)
+        self.assertNotIn('X-Cache', self.client.get(self.url))
+
+
+
+class ConditionalGetTests(NewsAPITestCase):
+    """Article detail answers If-None-Match with 304 until something visible changes."""
+
+    def setUp(self):
+        super().setUp()
+        counters.get_local_buffer().drain()
+        source = Source.objects.create(name='Test Source', url='https://example.com', source_type='blog')
+        self.news = News.objects.create(
+            title='Story', slug='story', content='Body', source=source,
+            published_date=timezone.now(), status='published',
+        )
+        self.user = User.objects.create_user(email='reader@example.com', password='testpass123')
+        self.url = reverse('news:news-detail', args=[self.news.slug])
+
+    def test_unchanged_article_is_not_reserialized(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_new_comment_changes_the_validators(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Comment.objects.create(news=self.news, user=self.user, content='First')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_rating_is_not_hidden_behind_if_modified_since(self):
+        first = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', first)
+
+        self.client.force_authenticate(user=self.user)
+        self.client.post(reverse('news:news-rate', args=[self.news.slug]), {'rating': 5})
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+    def test_category_tag_and_source_changes_change_the_validators(self):
+        category = Category.objects.create(name='Politics', slug='politics')
+        tag = Tag.objects.create(name='Budget', slug='budget')
+        changes = [
+            lambda: self.news.categories.add(category),
+            lambda: tag.news.add(self.news),
+            lambda: Category.objects.filter(pk=category.pk).first().save(),
+            lambda: Source.objects.filter(pk=self.news.source_id).first().save(),
+            lambda: tag.news.clear(),
+        ]
+        etag = self.client.get(self.url)['ETag']
+        for change in changes:
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response['ETag']
+        self.assertEqual(response.data['categories'][0]['name'], 'Politics')
+        self.assertEqual(response.data['tags'], [])
+
+    def test_etag_is_per_viewer(self):
+        anonymous = self.client.get(self.url)['ETag']
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=anonymous)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+def response_cache_key_for(client, url):
+    request = Request(APIRequestFactory().get(url))
+    return response_cache_key(request)
+
+
+@override_settings(DEDUP_ENABLED=False)
+class IngestTests(NewsAPITestCase):
+    """Scraped items are upserted in bulk on original_url."""
+
+    def item(self, n, **extra):
+        return {
+            'title': f'Floods hit Nairobi estate {n}',
+            'content': 'Residents were evacuated.',
+            'author': 'Reporter',
+            'published_date': '2024-05-01T08:00:00+03:00',
+            'source_url': f'https://example.com/news/{n}',
+            'source_type': 'twitter',
+            'categories': ['Weather'],
+            'tags': ['floods', 'nairobi'],
+            **extra,
+        }
+
+    def test_batch_is_upserted_in_a_fixed_number_of_queries(self):
+        ingest([self.item(0)])  # creates the source, category and tags
+        with CaptureQueriesContext(connection) as small:
+            ingest([self.item(n) for n in range(1, 2)])
+        with CaptureQueriesContext(connection) as large:
+            ingest([self.item(n) for n in range(2, 32)])
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+        self.assertEqual(News.objects.count(), 32)
+        self.assertEqual(len(set(News.objects.values_list('slug', flat=True))), 32)
+        article = News.objects.get(original_url='https://example.com/news/7')
+        self.assertEqual(article.source.name, 'twitter')
+        self.assertEqual(list(article.categories.values_list('slug', flat=True)), ['weather'])
+        self.assertEqual(sorted(article.tags.values_list('slug', flat=True)), ['floods', 'nairobi'])
+
+    def test_reingest_updates_in_place(self):
+        ingest([self.item(1)])
+        article = News.objects.get()
+        article.status = 'published'
+        article.save()
+
+        stats = ingest([self.item(1, title='Floods: death toll rises'), self.item(2, source_url='')])
+        self.assertEqual((stats.received, stats.upserted), (2, 1))
+        article.refresh_from_db()
+        self.assertEqual(News.objects.count(), 1)
+        self.assertEqual(article.title, 'Floods: death toll rises')
+        self.assertEqual(article.status, 'published')
+
+    def test_items_without_url_are_skipped(self):
+        stats = ingest([self.item(1, source_url=None), self.item(2)])
+        self.assertEqual((stats.skipped, stats.upserted), (1, 1))
+
+    def test_source_created_by_a_concurrent_worker_is_shared(self):
+        bulk_create = Source.objects.bulk_create
+
+        def racing_bulk_create(sources, **kwargs):
+            # Another worker creates the source between our lookup and insert
+            Source.objects.create(name='twitter', url='https://twitter.com', source_type='social_media')
+            return bulk_create(sources, **kwargs)
+
+        with patch.object(Source.objects, 'bulk_create', racing_bulk_create):
+            ingest([self.item(1)])
+        self.assertEqual(Source.objects.filter(name='twitter').count(), 1)
+        self.assertEqual(News.objects.get().source, Source.objects.get(name='twitter'))
+
+
+class NewsDedupTests(NewsAPITestCase):
+    """The same story scraped from several platforms is stored once."""
+
+    STORY = (
+        "Heavy rains have displaced hundreds of families in Nairobi's Mathare estate, "
+        "with the county government opening three evacuation centres on Tuesday night "
+        "as the Nairobi River burst its banks for the second time this week."
+    )
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(DEDUP_INDEX_PATH=os.path.join(directory.name, 'dedup.npz'))
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def item(self, url, content, source_type):
+        return {
+            'title': content[:60], 'content': content, 'author': 'someone',
+            'published_date': timezone.now().isoformat(), 'source_url': url, 'source_type': source_type,
+        }
+
+    def test_reposts_link_to_the_canonical_article(self):
+        ingest([self.item('https://blog.example.com/floods', self.STORY, 'blog')])
+        stats = ingest([
+            self.item('https://twitter.com/status/1', self.STORY + ' #KenyaFloods https://t.co/x', 'twitter'),
+            self.item('https://reddit.com/r/Kenya/1', self.STORY.upper(), 'reddit'),
+            self.item('https://twitter.com/status/2', 'Central Bank holds the lending rate at 13 percent.', 'twitter'),
+        ])
+        self.assertEqual((stats.upserted, stats.duplicates), (1, 2))
+
+        canonical = News.objects.get(original_url='https://blog.example.com/floods')
+        self.assertEqual(
+            sorted(canonical.duplicates.values_list('source__name', flat=True)), ['reddit', 'twitter']
+        )
+        self.assertEqual(News.objects.count(), 2)
+
+    def test_rebuilt_index_catches_copies_of_stored_articles(self):
+        source = Source.objects.create(name='blog', url='https://blog.example.com', source_type='blog')
+        News.objects.create(
+            title='Floods', slug='floods', content=self.STORY, source=source,
+            original_url='https://blog.example.com/floods', published_date=timezone.now(),
+        )
+        self.assertEqual(rebuild_index(), 1)
+
+        stats = ingest([self.item('https://facebook.com/1', self.STORY, 'facebook')])
+        self.assertEqual(stats.duplicates, 1)
+        self.assertEqual(NewsDuplicate.objects.get().canonical.slug, 'floods')
+
+    def test_saving_keeps_stories_another_worker_saved(self):
+        ingest([self.item('https://blog.example.com/floods', self.STORY, 'blog')])
+        index = dedup.get_index()
+        index.find_or_add('https://blog.example.com/rates', 'Central Bank holds the lending rate at 13 percent.')
+
+        # Another worker saves its own story meanwhile
+        other = MinHashLSH.load(settings.DEDUP_INDEX_PATH)
+        other.find_or_add('https://blog.example.com/fuel', 'Fuel prices rise by five shillings a litre from Monday.')
+        other.save(settings.DEDUP_INDEX_PATH)
+        os.utime(settings.DEDUP_INDEX_PATH, ns=(time.time_ns(), time.time_ns() + 1000))
+
+        dedup.save_index()
+        self.assertEqual(sorted(MinHashLSH.load(settings.DEDUP_INDEX_PATH).signatures), [
+            'https://blog.example.com/floods', 'https://blog.example.com/fuel', 'https://blog.example.com/rates',
+        ])
+
+    @override_settings(DEDUP_LOCK_TIMEOUT=0)
+    def test_ingest_goes_ahead_when_the_index_lock_is_held(self):
+        caches['default'].add(dedup.LOCK_KEY, 'another-worker')
+        self.addCleanup(caches['default'].delete, dedup.LOCK_KEY)
+        with self.assertLogs('news.dedup', 'WARNING'):
+            stats = ingest([self.item('https://blog.example.com/floods', self.STORY, 'blog')])
+        self.assertEqual(stats.upserted, 1)
+        self.assertEqual(caches['default'].get(dedup.LOCK_KEY), 'another-worker')
+
+
+class SourceStateStoreTests(NewsAPITestCase):
+    """Scraper cursors persist on Source next to its scraping config."""
+
+    def test_cursor_is_stored_on_the_source(self):
+        source = Source.objects.create(name='reddit', url='https://reddit.com', source_type='social_media')
+        store = SourceStateStore()
+        self.assertEqual(store.get('reddit'), {})
+
+        store.set('reddit', {'subreddits': {'Kenya': {'fullname': 't3_abc', 'created_utc': 1714550400.0}}})
+        source.refresh_from_db()
+        self.assertEqual(source.scraping_state['subreddits']['Kenya']['fullname'], 't3_abc')
+        self.assertIsNotNone(source.last_scraped)
+
+    def test_cursor_of_an_unknown_source_is_not_saved(self):
+        with self.assertLogs('core.scrapers.state', 'WARNING'):
+            SourceStateStore().set('telegram', {'channels': {'KenyaUpdates': 10}})
+        self.assertEqual(SourceStateStore().get('telegram'), {})
+        self.assertFalse(Source.objects.exists())
+
+
+class FakeScraper:
+    def __init__(self, source, items):
+        self.source_name = source.name
+        self.state = dict(source.scraping_state)
+        self.items = items
+
+    async def process(self):
+        self.state['etag'] = '"v2"'
+        return self.items
+
+
+@override_settings(DEDUP_ENABLED=False, SCRAPE_JITTER=0)
+class ScrapeSchedulingTests(NewsAPITestCase):
+    """Each enabled source is scraped on its own adaptive schedule."""
+
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+        self.source = Source.objects.create(
+            name='Kilimo Today', url='https://kilimo.example.com', source_type='blog', scrape_enabled=True,
+        )
+
+    def items(self, count, published):
+        return [{
+            'title': f'Tea prices update {n}',
+            'content': 'Auction prices rose again this week.',
+            'published_date': published.isoformat(),
+            'source_url': f'https://kilimo.example.com/tea-{n}',
+            'source': self.source.name,
+        } for n in range(count)]
+
+    def test_due_sources_are_claimed_once(self):
+        Source.objects.create(name='Dormant', url='https://dormant.example.com', source_type='blog')
+        later = Source.objects.create(
+            name='Later', url='https://later.example.com', source_type='blog', scrape_enabled=True,
+            next_scrape_at=timezone.now() + timedelta(hours=1),
+        )
+        self.assertEqual(scraping.claim_due_sources(), [self.source.pk])
+        self.assertEqual(scraping.claim_due_sources(), [])
+        # Unfinished runs are handed out again once their lock has expired
+        self.assertEqual(
+            sorted(scraping.claim_due_sources(timezone.now() + timedelta(hours=2))), [self.source.pk, later.pk]
+        )
+
+    def test_run_ingests_and_adapts_interval_to_publish_rate(self):
+        now = timezone.now()
+        self.source.last_scraped = now - timedelta(hours=2)
+        self.source.save()
+        # 40 new items in 2 hours: 20/h observed, smoothed to 6/h
+        with patch.object(scraping, 'scraper_for', lambda source: FakeScraper(source, self.items(40, now))):
+            self.assertEqual(scrape_source(self.source.pk), 40)
+
+        self.source.refresh_from_db()
+        self.assertEqual(News.objects.filter(source=self.source).count(), 40)
+        self.assertEqual(self.source.scraping_state, {'etag': '"v2"'})
+        self.assertAlmostEqual(self.source.publish_rate, 6.0, places=3)
+        self.assertEqual(self.source.scrape_interval, 3000)  # 5 items at 6/h
+        self.assertAlmostEqual(
+            (self.source.next_scrape_at - self.source.last_scraped).total_seconds(), 3000, delta=1
+        )
+
+    def test_quiet_source_backs_off(self):
+        self.source.last_scraped = timezone.now() - timedelta(hours=6)
+        self.source.save()
+        stale = self.items(3, timezone.now() - timedelta(days=2))
+        with patch.object(scraping, 'scraper_for', lambda source: FakeScraper(source, stale)):
+            scrape_source(self.source.pk)
+        self.source.refresh_from_db()
+        self.assertEqual(self.source.publish_rate, 0)
+        self.assertEqual(self.source.scrape_interval, 12 * 3600)
+
+    def test_source_is_not_scraped_twice_at_once(self):
+        token = scraping.acquire_lock(self.source.pk)
+        with patch.object(scraping, 'scraper_for') as scraper_for:
+            self.assertEqual(scrape_source(self.source.pk), 0)
+        scraper_for.assert_not_called()
+
+        scraping.release_lock(self.source.pk, token)
+        self.assertIsNotNone(scraping.acquire_lock(self.source.pk))
+
+    def test_failed_run_keeps_cursor_and_retries_later(self):
+        self.source.scraping_state = {'etag': '"v1"'}
+        self.source.save()
+        with patch.object(scraping, 'scraper_for', side_effect=RuntimeError('connection reset')):
+            self.assertEqual(scrape_source(self.source.pk), 0)
+        self.source.refresh_from_db()
+        self.assertEqual(self.source.scraping_state, {'etag': '"v1"'})
+        self.assertGreater(self.source.next_scrape_at, timezone.now() + timedelta(hours=5))
+
+    def test_sources_scraped_by_different_workers_share_the_duplicate_index(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        other = Source.objects.create(
+            name='Shamba Daily', url='https://shamba.example.com', source_type='blog', scrape_enabled=True,
+        )
+        story = NewsDedupTests.STORY
+        published = timezone.now().isoformat()
+        with override_settings(DEDUP_ENABLED=True, DEDUP_INDEX_PATH=os.path.join(directory.name, 'dedup.npz')):
+            for source in (self.source, other):
+                item = {
+                    'title': 'Floods in Mathare', 'content': story, 'published_date': published,
+                    'source_url': f'{source.url}/floods', 'source': source.name,
+                }
+                # Each run starts from a fresh worker's view of the index
+                with patch.dict(dedup._loaded, path=None, mtime=None, index=None), \
+                        patch.object(scraping, 'scraper_for', lambda source: FakeScraper(source, [item])):
+                    scrape_source(source.pk)
+
+        self.assertEqual(News.objects.count(), 1)
+        self.assertEqual(NewsDuplicate.objects.get().canonical.source, self.source)
+        self.assertIsNone(caches['default'].get(dedup.LOCK_KEY))
+
+
+class SummarizationTests(NewsAPITestCase):
+    """Unprocessed articles get summaries in batches written back in bulk."""
+
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+        summarizer.CACHE.clear_local()
+        self.source = Source.objects.create(name='Nation', url='https://nation.africa', source_type='newspaper')
+
+    def article(self, n, words, **extra):
+        return News.objects.create(
+            title=f'Budget reading {n}', slug=f'budget-reading-{n}', source=self.source,
+            content=' '.join(['bajeti'] * words), published_date=timezone.now(), **extra,
+        )
+
+    def fake_pipeline(self, texts, **kwargs):
+        return [{'summary_text': f'{len(text.split())} word story'} for text in texts]
+
+    def test_pending_articles_are_summarized_in_a_fixed_number_of_queries(self):
+        self.article(0, 300)
+        with patch.object(summarizer, 'get_pipeline', return_value=self.fake_pipeline):
+            summarization.summarize_pending()
+            for n in range(1, 3):
+                self.article(n, 100 * n)
+            with CaptureQueriesContext(connection) as small:
+                summarization.summarize_pending()
+            for n in range(3, 23):
+                self.article(n, 100 * n)
+            with CaptureQueriesContext(connection) as large:
+                summarization.summarize_pending()
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+        article = News.objects.get(slug='budget-reading-7')
+        self.assertEqual(article.summary, '700 word story')
+        self.assertTrue(article.is_ai_processed)
+        self.assertIsNotNone(article.ai_processing_date)
+
+    def test_existing_summaries_are_kept(self):
+        edited = self.article(1, 500, summary='Treasury tables a KSh 4 trillion budget.')
+        with patch.object(summarizer, 'get_pipeline', return_value=self.fake_pipeline):
+            self.assertEqual(summarization.summarize_pending(), 0)
+        edited.refresh_from_db()
+        self.assertEqual(edited.summary, 'Treasury tables a KSh 4 trillion budget.')
+        self.assertTrue(edited.is_ai_processed)
+
+    def test_reprocessing_unchanged_articles_skips_the_model(self):
+        for n in range(1, 4):
+            self.article(n, 100 * n)
+        with patch.object(summarizer, 'get_pipeline', return_value=self.fake_pipeline):
+            summarization.summarize_pending()
+
+        # A deploy resets the backlog and the worker's memory; the shared tier still has every result
+        News.objects.update(summary='', is_ai_processed=False)
+        summarizer.CACHE.clear_local()
+        with patch.object(summarizer, 'get_pipeline') as get_pipeline:
+            self.assertEqual(summarization.summarize_pending(), 3)
+        get_pipeline.assert_not_called()
+        self.assertEqual(News.objects.get(slug='budget-reading-2').summary, '200 word story')
+
+    def test_runs_do_not_overlap(self):
+        self.article(1, 500)
+        caches['default'].add(summarization.LOCK_KEY, 1)
+        self.assertEqual(summarization.summarize_pending(), 0)
+        self.assertFalse(News.objects.get().is_ai_processed)
+
+
+class InferenceCacheTests(NewsAPITestCase):
+    """AI results are cached by model, task and normalized content."""
+
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+        self.calls = []
+
+    def compute(self, texts):
+        self.calls.append(texts)
+        return [text.upper() for text in texts]
+
+    def test_only_distinct_uncached_texts_are_computed(self):
+        cache = InferenceCache('test/model-a', 'shout')
+        texts = ['mvua kubwa', 'mvua  kubwa\u200b', 'jua kali']
+        self.assertEqual(cache.map(texts, self.compute), ['MVUA KUBWA', 'MVUA KUBWA', 'JUA KALI'])
+        self.assertEqual(self.calls, [['mvua kubwa', 'jua kali']])
+
+        self.assertEqual(cache.map(['jua kali', 'upepo'], self.compute), ['JUA KALI', 'UPEPO'])
+        self.assertEqual(self.calls[-1], ['upepo'])
+
+    def test_shared_tier_serves_other_processes_but_not_other_models(self):
+        InferenceCache('test/model-a', 'shout').map(['mvua kubwa'], self.compute)
+        fresh = InferenceCache('test/model-a', 'shout')
+        self.assertEqual(fresh.map(['mvua kubwa'], self.compute), ['MVUA KUBWA'])
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(fresh.stats(), {'local_hits': 0, 'shared_hits': 1, 'misses': 1})
+
+        InferenceCache('test/model-b', 'shout').map(['mvua kubwa'], self.compute)
+        self.assertEqual(len(self.calls), 2)
+
+
+class HashingEmbedder:
+    """Bag-of-words vectors: sentences sharing most words score high."""
+
+    def encode(self, texts):
+        import numpy as np
+
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, sum(map(ord, word.strip('.,!?'))) % 64] += 1
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+
+
+class FactCheckMatchingTests(NewsAPITestCase):
+    """Text is matched against known fact-check verdicts through the claim index."""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(FACT_INDEX_DIR=directory.name, FACT_MATCH_THRESHOLD=0.8)
+        override.enable()
+        self.addCleanup(override.disable)
+        patcher = patch.object(fact_checks, 'get_embedder', return_value=HashingEmbedder())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        source = Source.objects.create(name='Nation', url='https://nation.africa', source_type='newspaper')
+        self.news = News.objects.create(
+            title='Fuel prices', slug='fuel-prices', source=source, content='...', published_date=timezone.now(),
+        )
+        self.fuel = FactCheck.objects.create(
+            news=self.news, claim='Fuel prices in Kenya were cut by half in May', verdict='false',
+            explanation='EPRA lowered pump prices by under 5 percent.',
+        )
+        FactCheck.objects.create(
+            news=self.news, claim='The county hired ten thousand new teachers this year', verdict='mostly_false',
+            explanation='The TSC hired 3,000 teachers nationally.',
+        )
+        fact_checks.rebuild_index()
+
+    def test_scraped_text_is_matched_sentence_by_sentence(self):
+        text = 'Habari za leo. Fuel prices in Kenya were cut by half in May, a viral post says.'
+        [(sentence, fact_check, similarity)] = fact_checks.match_text(text)
+        self.assertEqual(fact_check, self.fuel)
+        self.assertTrue(sentence.startswith('Fuel prices'))
+        self.assertGreater(similarity, 0.8)
+
+    def test_new_and_deleted_fact_checks_update_the_index_incrementally(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            new = FactCheck.objects.create(
+                news=self.news, claim='Matatu fares in Nairobi will double from Monday', verdict='false',
+                explanation='NTSA has announced no fare changes.',
+            )
+        self.assertEqual(len(callbacks), 1)
+
+        fact_checks.index_fact_checks([new.pk])
+        response = self.client.get(reverse('news:news-match-claims'), {'q': 'Matatu fares in Nairobi will double from Monday'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['fact_check']['verdict'], 'false')
+        self.assertEqual(response.data[0]['news'], self.news.pk)
+
+        fuel_pk = self.fuel.pk
+        self.fuel.delete()
+        fact_checks.index_fact_checks([fuel_pk])
+        self.assertEqual(fact_checks.match_text('Fuel prices in Kenya were cut by half in May'), [])
+        self.assertEqual(len(fact_checks.get_index()), 2)
+
+
+class SentimentRollupTests(NewsAPITestCase):
+    """Scraped items are scored into hourly rollups that dashboards read directly."""
+
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+        sentiment_model.CACHE.clear_local()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        # One writer per stream, as in the scraping pipeline
+        self.sink = NDJSONSink(self.directory, 'scraped')
+        self.hour = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+
+    def fake_pipeline(self, texts, **kwargs):
+        return [
+            [{'label': 'positive', 'score': 1.0 if 'safi' in text else 0.0},
+             {'label': 'negative', 'score': 1.0 if 'mbaya' in text else 0.0}]
+            for text in texts
+        ]
+
+    def write_segment(self, items):
+        for item in items:
+            self.sink.write(item)
+        self.sink.rotate()
+
+    def item(self, content, county, minutes=0, **extra):
+        return {
+            'content': content, 'county': county, 'source_type': 'twitter',
+            'published_date': (self.hour + timedelta(minutes=minutes)).isoformat(), **extra,
+        }
+
+    def test_segments_roll_up_once_and_later_items_add_to_the_hour(self):
+        self.write_segment([
+            self.item('Huduma ni safi', 'Nairobi', 5, engagement_metrics={'likes': 100}, categories=['Health']),
+            self.item('Barabara mbaya sana', 'Nairobi', 30),
+            self.item('Mvua inanyesha', 'Kisumu', 70),
+            {'content': '', 'county': 'Nairobi'},
+        ])
+        with patch.object(sentiment_model, 'get_pipeline', return_value=self.fake_pipeline):
+            sentiment.process_stream(self.directory)
+            self.assertEqual(sentiment.process_stream(self.directory), 0)
+            self.write_segment([self.item('Hospitali safi', 'Nairobi', 50)])
+            sentiment.process_stream(self.directory)
+
+        nairobi = SentimentRollup.objects.get(bucket=self.hour, county='Nairobi', topic='')
+        self.assertEqual((nairobi.item_count, nairobi.positive_count, nairobi.negative_count), (3, 2, 1))
+        self.assertAlmostEqual(nairobi.mean_score, 1 / 3)
+        # The liked post outweighs the complaint
+        self.assertGreater(nairobi.weighted_score, nairobi.mean_score)
+        self.assertEqual(SentimentRollup.objects.get(county='Nairobi', topic='health').item_count, 1)
+        self.assertEqual(SentimentRollup.objects.get(county='Kisumu').bucket, self.hour + timedelta(hours=1))
+        self.assertEqual(SentimentRollup.objects.count(), 3)
+
+    def test_dashboard_reads_hourly_series_for_a_county_or_all_counties(self):
+        self.write_segment([
+            self.item('Huduma ni safi', 'Nairobi', 5),
+            self.item('Barabara mbaya', 'Mombasa', 10),
+            self.item('Soko safi', 'Nairobi', 65),
+        ])
+        with patch.object(sentiment_model, 'get_pipeline', return_value=self.fake_pipeline):
+            sentiment.process_stream(self.directory)
+
+        url = reverse('news:sentiment-list')
+        response = self.client.get(url, {'county': 'nairobi'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['item_count'] for row in response.data], [1, 1])
+        self.assertEqual(response.data[0]['mean_score'], 1.0)
+
+        response = self.client.get(url)
+        self.assertEqual([(row['item_count'], row['mean_score']) for row in response.data], [(2, 0.0), (1, 1.0)])
+        self.assertEqual(self.client.get(url, {'hours': 'all'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_inserts_stay_within_the_bind_parameter_limit(self):
+        rollups = [
+            sentiment_model.Rollup(self.hour, f'County {n}', '', 1, 0.5, 0.5, 1.0, 1, 0) for n in range(10)
+        ]
+        # 9 parameters per row: 3 rows per INSERT
+        with patch.object(connection.features, 'max_query_params', 27), \
+                CaptureQueriesContext(connection) as queries:
+            sentiment.save_rollups(rollups)
+        self.assertEqual(len(queries.captured_queries), 4)
+        self.assertEqual(SentimentRollup.objects.count(), 10)
+
+    @skipUnless(
+        all(find_spec(name) for name in ('tweepy', 'facebook_sdk', 'telethon', 'praw')),
+        'The social scrapers need their API clients',
+    )
+    def test_scraped_tweets_roll_up_by_the_county_and_topics_they_name(self):
+        from core.scrapers.social_scrapper import TwitterScraper
+
+        tweets = [
+            ('Hospitali ya Kisumu ni safi sana', {'likes': 40, 'retweets': 2}),
+            ('Barabara mbaya in Kisumu after the floods', {'likes': 3, 'retweets': 0}),
+            ('Habari za asubuhi', {'likes': 0, 'retweets': 0}),
+        ]
+
+        async def iter_scrape():
+            for n, (text, engagement) in enumerate(tweets):
+                yield {
+                    'content': text, 'author': 1000 + n, 'date': self.hour + timedelta(minutes=n),
+                    'url': f'https://twitter.com/user/status/{n}', 'engagement': engagement,
+                }
+
+        scraper = TwitterScraper()
+        scraper.iter_scrape = iter_scrape
+        # What the scraping pipeline writes: the scraper's own clean_data output
+        self.write_segment(asyncio.run(scraper.process()))
+        with patch.object(sentiment_model, 'get_pipeline', return_value=self.fake_pipeline):
+            sentiment.process_stream(self.directory)
+
+        kisumu = SentimentRollup.objects.get(bucket=self.hour, county='Kisumu', topic='')
+        self.assertEqual((kisumu.item_count, kisumu.positive_count, kisumu.negative_count), (2, 1, 1))
+        self.assertEqual(SentimentRollup.objects.get(county='Kisumu', topic='health').item_count, 1)
+        self.assertEqual(SentimentRollup.objects.get(county='Kisumu', topic='weather').item_count, 1)
+        # Items naming no county still count towards the all-counties series
+        self.assertEqual(SentimentRollup.objects.get(county='', topic='').item_count, 1)
+
+
+
+class CommentThreadTests(NewsAPITestCase):
+    """News comment threads are paginated by top-level comment and nest to any depth."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email='reader@example.com', password='testpass123')
+        source = Source.objects.create(name='Star', url='https://the-star.co.ke', source_type='newspaper')
+        self.news = News.objects.create(
+            title='Floods in Budalang\'i', slug='floods', content='Body', source=source,
+            published_date=timezone.now(), status='published',
+        )
+
+    def thread(self, depth):
+        root = node = Comment.objects.create(news=self.news, user=self.user, content='root')
+        for level in range(1, depth + 1):
+            node = Comment.objects.create(news=self.news, user=self.user, parent=node, content=f'level {level}')
+        return root
+
+    def test_threads_load_in_constant_queries_whatever_their_depth(self):
+        url = reverse('news:comment-list')
+        self.thread(1)
+        with CaptureQueriesContext(connection) as shallow:
+            self.client.get(url, {'news': 'floods'})
+        self.thread(8)
+        Comment.objects.create(news=self.news, user=self.user, content='unapproved', is_approved=False)
+        with CaptureQueriesContext(connection) as deep:
+            response = self.client.get(url, {'news': 'floods'})
+
+        self.assertEqual(len(deep.captured_queries), len(shallow.captured_queries))
+        node = response.data['results'][0]
+        depth = 0
+        while node['replies']:
+            self.assertEqual(node['replies_count'], 1)
+            [node] = node['replies']
+            depth += 1
+        self.assertEqual(depth, 8)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_replies_count_leaves_out_unapproved_replies(self):
+        root = self.thread(1)
+        Comment.objects.create(news=self.news, user=self.user, parent=root, content='spam', is_approved=False)
+
+        listed = self.client.get(reverse('news:comment-list'), {'news': 'floods'}).data['results'][0]
+        self.assertEqual(listed['replies_count'], 1)
+        self.assertEqual(len(listed['replies']), 1)
+
+        self.client.force_authenticate(self.user)
+        updated = self.client.patch(reverse('news:comment-detail', args=[root.pk]), {'content': 'edited'})
+        self.assertEqual(updated.data['replies_count'], 1)
+
+    def test_comment_detail_loads_its_thread(self):
+        root = self.thread(2)
+        response = self.client.get(reverse('news:comment-detail', args=[root.pk]))
+        self.assertEqual(response.data['replies'][0]['replies'][0]['content'], 'level 2')
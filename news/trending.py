@@ -0,0 +1,127 @@
+"""
+Time-decayed trending scores for news articles.
+
+An article's trending value is its weighted engagement decayed with a
+configurable half-life::
+
+    value(now) = engagement * 2 ** (-(now - published_date) / half_life)
+
+Taking the log and dropping the term that only depends on ``now`` gives a
+score whose ordering never changes as time passes::
+
+    score = ln(1 + engagement) + ln(2) * published_date / half_life
+
+so a stored score stays valid until the article's engagement changes, and
+the refresh task only has to touch articles with new activity. Each score
+row keeps the inputs it was computed from, and an article is rescored when
+any current total differs from them. That covers re-ratings, unsaves and
+deleted comments or ratings as well as new rows, and needs no timestamp to
+agree with the last run.
+"""
+import math
+
+from django.conf import settings
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Lower
+from django.utils import timezone
+
+from .models import News, NewsRating, Comment, SavedNews, TrendingScore
+
+
+def engagement(views, shares, rating_total, comments, saves):
+    """Blend raw engagement signals into one weighted number."""
+    weights = settings.TRENDING_WEIGHTS
+    return (
+        weights['views'] * views
+        + weights['shares'] * shares
+        + weights['ratings'] * rating_total / 5
+        + weights['comments'] * comments
+        + weights['saves'] * saves
+    )
+
+
+def decayed_score(engagement_value, published_date):
+    """Return the time-invariant log score for engagement published at published_date."""
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    return math.log1p(engagement_value) + math.log(2) * published_date.timestamp() / half_life
+
+
+def _aggregate(model, value):
+    """Correlated subquery aggregating ``value`` over ``model`` rows of the outer article."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(news=OuterRef('pk'))
+            .order_by().values('news').annotate(total=value).values('total'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def refresh_trending_scores(full=False):
+    """
+    Recompute scores for published articles in the trending window whose
+    engagement (or date or county) differs from their stored score's, or
+    for all of them with full=True, and drop expired rows.
+
+    Returns the number of scores written.
+    """
+    window_start = timezone.now() - timezone.timedelta(days=settings.TRENDING_WINDOW_DAYS)
+
+    TrendingScore.objects.filter(
+        Q(published_date__lt=window_start) | ~Q(news__status='published')
+    ).delete()
+
+    candidates = News.objects.filter(status='published', published_date__gte=window_start).annotate(
+        rating_total=_aggregate(NewsRating, Sum('rating')),
+        comment_total=_aggregate(Comment, Count('pk')),
+        save_total=_aggregate(SavedNews, Count('pk')),
+    )
+    if not full:
+        candidates = candidates.alias(county_key=Lower('county')).filter(
+            Q(trending__isnull=True)
+            | ~Q(view_count=F('trending__view_count'))
+            | ~Q(share_count=F('trending__share_count'))
+            | ~Q(rating_total=F('trending__rating_total'))
+            | ~Q(comment_total=F('trending__comment_count'))
+            | ~Q(save_total=F('trending__save_count'))
+            | ~Q(published_date=F('trending__published_date'))
+            | ~Q(county_key=F('trending__county'))
+        )
+    candidates = candidates.values(
+        'pk', 'county', 'published_date', 'view_count', 'share_count',
+        'rating_total', 'comment_total', 'save_total',
+    )
+
+    scores = [
+        TrendingScore(
+            news_id=row['pk'],
+            score=decayed_score(
+                engagement(
+                    row['view_count'], row['share_count'], row['rating_total'],
+                    row['comment_total'], row['save_total'],
+                ),
+                row['published_date'],
+            ),
+            county=row['county'].lower(),
+            published_date=row['published_date'],
+            view_count=row['view_count'],
+            share_count=row['share_count'],
+            rating_total=row['rating_total'],
+            comment_count=row['comment_total'],
+            save_count=row['save_total'],
+        )
+        for row in candidates.iterator()
+    ]
+
+    TrendingScore.objects.bulk_create(
+        scores,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['news'],
+        update_fields=[
+            'score', 'county', 'published_date', 'view_count', 'share_count',
+            'rating_total', 'comment_count', 'save_count', 'updated_at',
+        ],
+    )
+    return len(scores)
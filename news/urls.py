@@ -11,6 +11,7 @@ router.register(r'sources', views.SourceViewSet)
 router.register(r'tags', views.TagViewSet)
 router.register(r'news', views.NewsViewSet)
 router.register(r'comments', views.CommentViewSet)
+router.register(r'sentiment', views.SentimentViewSet, basename='sentiment')
 
 # The API URLs are now determined automatically by the router
 urlpatterns = [
@@ -1,44 +1,58 @@
-from django.db.models import Q, Count, Avg, F
+from django.conf import settings
+from django.db.models import Q, Count, Avg, F, Max, Sum, Exists, OuterRef, Prefetch, Subquery
+from django.http import Http404
 from django.utils import timezone
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.pagination import PageNumberPagination
 from django_filters.rest_framework import DjangoFilterBackend
 
+from core import counters, viewer_state
+from core.cache import AnonymousResponseCacheMixin, cache_anonymous_response
+from core.conditional import ConditionalGetMixin, relation_versions
+from core.pagination import KeysetPagination
+from core.search import FullTextSearchFilter
+
+from .fact_checks import match_text
 from .models import (
     Category, Source, News, Tag, FactCheck, 
-    SavedNews, NewsRating, Comment
+    SavedNews, NewsRating, Comment, TrendingScore, SentimentRollup
 )
 from .serializers import (
     CategorySerializer, SourceSerializer, NewsListSerializer, 
     NewsDetailSerializer, TagSerializer, FactCheckSerializer, 
     SavedNewsSerializer, NewsRatingSerializer, CommentSerializer,
-    CommentDetailSerializer
+    CommentDetailSerializer, SentimentRollupSerializer
 )
 
 
-class NewsPagination(PageNumberPagination):
-    """Custom pagination for news articles."""
+# List serializers embed the source name, categories and tags
+FEED_CACHE_NAMESPACES = ('news', 'categories', 'tags', 'sources')
+
+
+class NewsPagination(KeysetPagination):
+    """Keyset pagination for news feeds; ?page=N opts into page numbers."""
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 50
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(AnonymousResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for news categories."""
     
+    cache_namespaces = ('categories',)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
     lookup_field = 'slug'
 
 
-class SourceViewSet(viewsets.ReadOnlyModelViewSet):
+class SourceViewSet(AnonymousResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for news sources."""
     
+    cache_namespaces = ('sources',)
     queryset = Source.objects.all()
     serializer_class = SourceSerializer
     permission_classes = [AllowAny]
@@ -46,49 +60,128 @@ class SourceViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['name', 'description']
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(AnonymousResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for news tags."""
     
+    cache_namespaces = ('tags',)
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [AllowAny]
     lookup_field = 'slug'
 
 
-class NewsViewSet(viewsets.ReadOnlyModelViewSet):
+class NewsViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for news articles."""
     
     queryset = News.objects.filter(status='published')
     permission_classes = [AllowAny]
     pagination_class = NewsPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['categories__slug', 'tags__slug', 'source', 'county', 'town', 'is_fact_checked']
     search_fields = ['title', 'content', 'summary', 'author']
+    search_headline_field = 'content'
     ordering_fields = ['published_date', 'view_count', 'share_count']
-    ordering = ['-published_date']
+    ordering = ['-published_date', '-id']
     lookup_field = 'slug'
     
+    def get_queryset(self):
+        queryset = super().get_queryset().for_listing()
+        if self.action == 'retrieve':
+            # Details render the article body
+            queryset = queryset.defer(None)
+        return queryset
+    
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return NewsDetailSerializer
         return NewsListSerializer
     
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
+    def list_response(self, queryset, paginate=True):
+        """Serialize a news queryset; per-user state is resolved for the page at once."""
+        page = self.paginate_queryset(queryset) if paginate else None
+        news = page if page is not None else list(queryset)
         
-        # Increment view count
-        instance.view_count += 1
-        instance.save(update_fields=['view_count'])
+        serializer = NewsListSerializer(news, many=True, context=self.get_serializer_context())
         
-        serializer = self.get_serializer(instance)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
         return Response(serializer.data)
     
+    @cache_anonymous_response(*FEED_CACHE_NAMESPACES)
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.list_response(queryset)
+    
+    def get_version(self):
+        """
+        Version columns for the requested article: everything that changes the
+        detail body except the view/share counters, in one query (plus the
+        cache generations of the related namespaces).
+        """
+        def latest(model, field, **filters):
+            return Subquery(
+                model.objects.filter(news=OuterRef('pk'), **filters)
+                .order_by().values('news').annotate(value=Max(field)).values('value')
+            )
+        
+        def aggregate(model, value, **filters):
+            return Subquery(
+                model.objects.filter(news=OuterRef('pk'), **filters)
+                .order_by().values('news').annotate(value=value).values('value')
+            )
+        
+        queryset = News.objects.filter(
+            status='published', **{self.lookup_field: self.get_lookup_value(News)}
+        ).annotate(
+            fact_checked_at=latest(FactCheck, 'checked_date'),
+            comment_updated_at=latest(Comment, 'updated_at'),
+            comment_total=aggregate(Comment, Count('pk'), parent=None, is_approved=True),
+            rating_total=aggregate(NewsRating, Sum('rating')),
+            rating_count=aggregate(NewsRating, Count('pk')),
+        )
+        fields = [
+            'pk', 'updated_at', 'fact_checked_at', 'comment_updated_at',
+            'comment_total', 'rating_total', 'rating_count',
+        ]
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                is_saved=Exists(SavedNews.objects.filter(user=user, news=OuterRef('pk')))
+            )
+            fields.append('is_saved')
+        
+        version = queryset.values(*fields).first()
+        if version is None:
+            raise Http404
+        if user.is_authenticated:
+            version['language'] = user.preferred_language
+        # Renamed categories, tags or sources
+        version['relations'] = relation_versions(('categories', 'tags', 'sources'))
+        return version
+    
+    def retrieve(self, request, *args, **kwargs):
+        version = self.get_version()
+        
+        # Buffer the view; the flush task folds it into the row later
+        counters.increment(News, 'view_count', version['pk'])
+        
+        def render():
+            instance = self.get_object()
+            instance.view_count += 1
+            if 'is_saved' in version:
+                viewer_state.for_request(request).mark('saved_news', [instance.pk], version['is_saved'])
+            serializer = self.get_serializer(instance)
+            return Response(serializer.data)
+        
+        # View/share counts are left out of the validators, so a 304 may
+        # carry slightly stale counters in the client's cached copy
+        return self.conditional_response(request, version, render)
+    
     @action(detail=True, methods=['post'])
     def share(self, request, slug=None):
         """Endpoint to track when a news article is shared."""
         news = self.get_object()
-        news.share_count += 1
-        news.save(update_fields=['share_count'])
+        counters.increment(News, 'share_count', news.pk)
         return Response({'status': 'share counted'})
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
@@ -158,49 +251,87 @@ class NewsViewSet(viewsets.ReadOnlyModelViewSet):
     def saved(self, request):
         """Endpoint to list all saved news articles for a user."""
         user = request.user
-        saved_news = SavedNews.objects.filter(user=user).order_by('-saved_date')
+        saved_news = SavedNews.objects.filter(user=user).prefetch_related(
+            Prefetch('news', queryset=News.objects.for_listing())
+        ).order_by('-saved_date')
         
         page = self.paginate_queryset(saved_news)
+        items = page if page is not None else list(saved_news)
+        
+        # Everything on this page is saved by the user by definition
+        viewer_state.for_request(request).mark('saved_news', [item.news_id for item in items])
+        serializer = SavedNewsSerializer(items, many=True, context=self.get_serializer_context())
+        
         if page is not None:
-            serializer = SavedNewsSerializer(page, many=True)
             return self.get_paginated_response(serializer.data)
-        
-        serializer = SavedNewsSerializer(saved_news, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @cache_anonymous_response(*FEED_CACHE_NAMESPACES, 'trending')
     def trending(self, request):
-        """Endpoint to get trending news based on view and share counts."""
-        # Get news from the last 7 days
-        last_week = timezone.now() - timezone.timedelta(days=7)
-        trending_news = News.objects.filter(
-            status='published',
-            published_date__gte=last_week
-        ).order_by('-view_count', '-share_count')[:10]
+        """
+        Endpoint to get trending news, optionally per county or category.
         
-        serializer = NewsListSerializer(
-            trending_news, 
-            many=True,
-            context={'request': request}
-        )
-        return Response(serializer.data)
+        Reads the top-N from the precomputed TrendingScore table, which the
+        refresh_trending_scores beat task keeps up to date.
+        """
+        window_start = timezone.now() - timezone.timedelta(days=settings.TRENDING_WINDOW_DAYS)
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), 50))
+        except ValueError:
+            limit = 10
+        
+        scores = TrendingScore.objects.filter(published_date__gte=window_start)
+        county = request.query_params.get('county')
+        if county:
+            scores = scores.filter(county=county.lower())
+        category = request.query_params.get('category')
+        if category:
+            scores = scores.filter(news__categories__slug=category)
+        
+        news_ids = list(scores.order_by('-score').values_list('news_id', flat=True)[:limit])
+        
+        if not news_ids and not TrendingScore.objects.exists():
+            # Scores have not been computed yet, e.g. right after a deploy
+            trending_news = self.get_queryset().filter(
+                published_date__gte=window_start
+            ).order_by('-view_count', '-share_count')[:limit]
+            return self.list_response(trending_news, paginate=False)
+        
+        news_by_id = self.get_queryset().in_bulk(news_ids)
+        trending_news = [news_by_id[pk] for pk in news_ids if pk in news_by_id]
+        return self.list_response(trending_news, paginate=False)
     
     @action(detail=False, methods=['get'])
     def fact_checked(self, request):
         """Endpoint to get fact-checked news articles."""
-        fact_checked_news = News.objects.filter(
-            status='published',
+        fact_checked_news = self.get_queryset().filter(
             is_fact_checked=True
-        ).order_by('-published_date')
+        ).order_by('-published_date', '-id')
         
-        page = self.paginate_queryset(fact_checked_news)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(fact_checked_news, many=True)
-        return Response(serializer.data)
-    
+        return self.list_response(fact_checked_news)
+
+    @action(detail=False, methods=['get'])
+    def match_claims(self, request):
+        """
+        Endpoint to match text (?q=, e.g. a chatbot question) against
+        known fact-check verdicts.
+        """
+        text = request.query_params.get('q', '')[:5000]
+        if not text.strip():
+            return Response({'detail': 'q is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        context = self.get_serializer_context()
+        return Response([
+            {
+                'sentence': sentence,
+                'similarity': round(similarity, 3),
+                'news': fact_check.news_id,
+                'fact_check': FactCheckSerializer(fact_check, context=context).data,
+            }
+            for sentence, fact_check, similarity in match_text(text)
+        ])
+
     @action(detail=False, methods=['get'])
     def local(self, request):
         """Endpoint to get local news based on user's preferences or query params."""
@@ -220,15 +351,9 @@ class NewsViewSet(viewsets.ReadOnlyModelViewSet):
         if town:
             filters &= Q(town__iexact=town)
         
-        local_news = News.objects.filter(filters).order_by('-published_date')
-        
-        page = self.paginate_queryset(local_news)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        local_news = self.get_queryset().filter(filters).order_by('-published_date', '-id')
         
-        serializer = self.get_serializer(local_news, many=True)
-        return Response(serializer.data)
+        return self.list_response(local_news)
 
 
 class CommentViewSet(viewsets.ModelViewSet):
@@ -247,7 +372,8 @@ class CommentViewSet(viewsets.ModelViewSet):
         if news_slug:
             queryset = queryset.filter(news__slug=news_slug)
         
-        return queryset.select_related('user', 'news').prefetch_related('replies')
+        # Paginated by top-level comment; the serializer loads each page's threads in one query
+        return queryset.select_related('user')
 
     def get_serializer_class(self):
         """Return different serializer for detail actions."""
@@ -261,4 +387,47 @@ class CommentViewSet(viewsets.ModelViewSet):
 
     def perform_update(self, serializer):
         """Set is_edited flag when updating a comment."""
-        serializer.save(is_edited=True)
\ No newline at end of file
+        serializer.save(is_edited=True)
+
+
+class SentimentViewSet(viewsets.GenericViewSet):
+    """
+    Hourly sentiment of scraped social items for a county (?county=, all
+    counties when omitted) and topic (?topic=, all topics when omitted) over
+    the last ?hours= hours, oldest first.
+    """
+    
+    queryset = SentimentRollup.objects.all()
+    serializer_class = SentimentRollupSerializer
+    permission_classes = [AllowAny]
+    default_hours = 48
+    max_hours = 24 * 31
+    
+    def list(self, request):
+        try:
+            hours = min(int(request.query_params.get('hours', self.default_hours)), self.max_hours)
+        except ValueError:
+            return Response({'detail': 'hours must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        county = request.query_params.get('county', '')
+        topic = request.query_params.get('topic', '').strip().lower()
+        rollups = self.get_queryset().filter(
+            topic=topic,
+            bucket__gte=timezone.now() - timezone.timedelta(hours=max(hours, 1)),
+        ).order_by('bucket')
+        if county:
+            rollups = rollups.filter(county__iexact=county)
+        else:
+            # One row per hour, summed over the counties
+            rollups = [
+                SentimentRollup(county='', topic=topic, **row)
+                for row in rollups.values('bucket').annotate(
+                    item_count=Sum('item_count'),
+                    score_sum=Sum('score_sum'),
+                    weighted_score_sum=Sum('weighted_score_sum'),
+                    weight_sum=Sum('weight_sum'),
+                    positive_count=Sum('positive_count'),
+                    negative_count=Sum('negative_count'),
+                )
+            ]
+        return Response(self.get_serializer(rollups, many=True).data)
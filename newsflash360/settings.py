@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Third-party apps
     'rest_framework',
     'corsheaders',
@@ -210,6 +211,30 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Caches: Redis shared by every process, with a small in-process LRU in front
+# for hot anonymous responses (see core/cache.py)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get(
+            'CACHE_REDIS_URL',
+            f"redis://{os.environ.get('REDIS_HOST', 'localhost')}:{os.environ.get('REDIS_PORT', 6379)}/2"
+        ),
+    },
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'newsflash360-local',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_LOCAL_ALIAS = 'local'
+RESPONSE_CACHE_TTL = 60  # seconds a response is served as fresh
+RESPONSE_CACHE_STALE_TTL = 600  # extra seconds it may be served stale while revalidating
+RESPONSE_CACHE_LOCAL_TTL = 10
+RESPONSE_CACHE_LOCK_TIMEOUT = 30
+
 # Email settings
 EMAIL_BACKEND = os.environ.get(
     'EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend'
@@ -228,6 +253,131 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'flush-engagement-counters': {
+        'task': 'core.tasks.flush_counters',
+        'schedule': 10.0,
+    },
+    'refresh-trending-scores': {
+        'task': 'news.tasks.refresh_trending_scores',
+        'schedule': 300.0,
+    },
+    'ingest-scraped-news': {
+        'task': 'news.tasks.ingest_scraped_news',
+        'schedule': 60.0,
+    },
+    'prune-scraped-segments': {
+        'task': 'news.tasks.prune_scraped_segments',
+        'schedule': 3600.0,
+    },
+    'dispatch-due-scrapes': {
+        'task': 'news.tasks.dispatch_due_scrapes',
+        'schedule': 60.0,
+    },
+    'summarize-news': {
+        'task': 'news.tasks.summarize_news',
+        'schedule': 120.0,
+    },
+    'summarize-forum-posts': {
+        'task': 'forum.tasks.summarize_posts',
+        'schedule': 600.0,
+    },
+    'recount-forum-category-posts': {
+        'task': 'forum.tasks.recount_category_posts',
+        'schedule': 3600.0,
+    },
+    'score-scraped-sentiment': {
+        'task': 'news.tasks.score_sentiment',
+        'schedule': 300.0,
+    },
+    'moderate-forum-reports': {
+        'task': 'forum.tasks.moderate_reports',
+        'schedule': 60.0,
+    },
+}
+
+# Write-behind engagement counters (see core/counters.py)
+COUNTERS_BACKEND = os.environ.get('COUNTERS_BACKEND', 'redis')  # 'redis' or 'local'
+COUNTERS_REDIS_URL = os.environ.get(
+    'COUNTERS_REDIS_URL',
+    f"redis://{os.environ.get('REDIS_HOST', 'localhost')}:{os.environ.get('REDIS_PORT', 6379)}/1"
+)
+# Seconds between local flushes; 0 turns the timer thread off
+COUNTERS_LOCAL_FLUSH_INTERVAL = int(os.environ.get('COUNTERS_LOCAL_FLUSH_INTERVAL', 5))
+
+# Postgres text search configuration per content language (see core/search.py).
+# Postgres ships no Swahili/Sheng stemmer, so those are indexed unstemmed
+# unless a custom configuration is installed and named here.
+SEARCH_CONFIGS = {
+    'en': 'english',
+    'sw': os.environ.get('SEARCH_CONFIG_SWAHILI', 'simple'),
+    'sheng': os.environ.get('SEARCH_CONFIG_SHENG', 'simple'),
+}
+
+# Trending news ranking (see news/trending.py)
+TRENDING_WINDOW_DAYS = 7
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_WEIGHTS = {
+    'views': 1,
+    'shares': 5,
+    'ratings': 3,
+    'comments': 4,
+    'saves': 6,
+}
+
+# Scraped article ingest (see news/ingest.py)
+SCRAPER_RESULTS_DIR = os.environ.get('SCRAPER_RESULTS_DIR', os.path.join(BASE_DIR, 'scraping_results'))
+INGEST_BATCH_SIZE = 1000
+# Segments are deleted once every consumer read them, or unread after this long (seconds)
+SCRAPER_SEGMENT_MAX_AGE = 7 * 24 * 3600
+INGEST_DEFAULT_STATUS = 'draft'  # articles from unverified sources wait for review
+
+# Cross-platform near-duplicate detection at ingest (see news/dedup.py)
+DEDUP_ENABLED = True
+# Shared by every ingesting worker, so it must live on storage they all reach
+DEDUP_INDEX_PATH = os.environ.get('DEDUP_INDEX_PATH', os.path.join(SCRAPER_RESULTS_DIR, 'dedup_index.npz'))
+DEDUP_WINDOW_DAYS = 3
+DEDUP_THRESHOLD = 0.8
+# Seconds an ingest may hold, or wait for, the index lock; well within SCRAPE_LOCK_TIMEOUT
+DEDUP_LOCK_TIMEOUT = 10 * 60
+
+# Per-source scrape scheduling (see news/scraping.py and core/scrapers/scheduler.py)
+SCRAPE_MIN_INTERVAL = 15 * 60  # seconds
+SCRAPE_MAX_INTERVAL = 12 * 3600
+SCRAPE_TARGET_ITEMS = 5  # new items a run should pick up on average
+SCRAPE_RATE_SMOOTHING = 0.3  # weight of the latest run in the publish rate
+SCRAPE_JITTER = 0.1  # +/- fraction of the interval
+SCRAPE_LOCK_TIMEOUT = 30 * 60  # also the hard time limit of a scrape task
+
+# AI summaries (see core/ai/summarizer.py; model and batch size come from SUMMARIZER_* env vars)
+SUMMARIZER_PRELOAD = os.environ.get('SUMMARIZER_PRELOAD', 'true').lower() == 'true'  # load in each worker at start
+SUMMARIZE_NEWS_BATCH_SIZE = 64  # articles read and written per round trip
+SUMMARIZE_NEWS_LIMIT = 512  # articles per task run
+SUMMARIZE_POSTS_LIMIT = 64
+SUMMARIZE_LOCK_TIMEOUT = 30 * 60
+
+# Inference results keyed by model, task and content hash (see core/ai/cache.py)
+AI_CACHE_ALIAS = 'default'
+AI_CACHE_TIMEOUT = 90 * 24 * 3600
+
+# Claim matching against fact-checks (see core/ai/fact_checker.py and news/fact_checks.py)
+FACT_INDEX_DIR = os.environ.get('FACT_INDEX_DIR', os.path.join(BASE_DIR, 'indexes', 'fact_checks'))
+FACT_EMBEDDING_MODEL = os.environ.get(
+    'FACT_EMBEDDING_MODEL', 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+)
+FACT_INDEX_DTYPE = 'int8'  # or 'float32'
+FACT_MATCH_THRESHOLD = 0.75  # cosine similarity
+
+# Hourly sentiment rollups of scraped items (see core/ai/sentiment.py and news/sentiment.py;
+# model and inference batch size come from SENTIMENT_* env vars)
+SENTIMENT_ITEMS_PER_BATCH = 512  # items scored and rolled up at a time
+SENTIMENT_WRITE_BATCH_SIZE = 500  # rollup rows per INSERT, lowered to the database's parameter limit
+SENTIMENT_LOCK_TIMEOUT = 30 * 60
+
+# Forum report moderation queue (see forum/moderation.py)
+FORUM_POST_REPORT_THRESHOLD = 3  # unresolved reports that flag a published post
+FORUM_COMMENT_REPORT_THRESHOLD = 3  # unresolved reports that deactivate a comment
+FORUM_MODERATION_BATCH_SIZE = 200  # reports claimed per transaction
 
 # AWS S3 settings (optional, for production media storage)
 AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID', '')
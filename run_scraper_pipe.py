@@ -5,7 +5,7 @@ import os
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.scrapers.pipeline import ScrapingPipeline
+from core.scrapers.pipeline_scrapers import ScrapingPipeline
 
 async def main():
     pipeline = ScrapingPipeline()
@@ -0,0 +1,78 @@
+import numpy as np
+
+from core.ai.fact_checker import ClaimIndex, quantize, split_claims
+
+
+def unit(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def random_claims(count, dim=64, seed=3):
+    return unit(np.random.RandomState(seed).normal(size=(count, dim)))
+
+
+def test_int8_rows_keep_cosine_similarity():
+    vectors = random_claims(50)
+    stored, scales = quantize(vectors, 'int8')
+    assert stored.dtype == np.int8
+    restored = stored.astype(np.float32) * scales[:, None]
+    assert np.abs((restored * vectors).sum(axis=1) - 1).max() < 0.01
+
+
+def test_search_finds_nearest_claims_from_the_mapped_file(tmp_path):
+    vectors = random_claims(1000)
+    index = ClaimIndex.build(str(tmp_path), 'test-encoder', range(1, 1001), vectors)
+
+    reopened = ClaimIndex(str(tmp_path))
+    queries = unit(vectors[[10, 500]] + 0.05 * random_claims(2, seed=9))
+    [first, second] = reopened.search(queries, k=3)
+    assert first[0][0] == 11 and second[0][0] == 501
+    assert first[0][1] > 0.9 and first[0][1] >= first[1][1]
+    assert len(index) == 1000
+
+
+def test_appends_replace_and_delete_claims_incrementally(tmp_path):
+    vectors = random_claims(20)
+    index = ClaimIndex.build(str(tmp_path), 'test-encoder', range(20), vectors, dtype='float32')
+    reader = ClaimIndex(str(tmp_path))
+    assert reader.search(vectors[5], k=1)[0][0][0] == 5
+
+    # Claim 5 is edited to read like claim 7's, and claim 7 is deleted
+    index.append([5], vectors[[7]])
+    index.append([7])
+    [matches] = reader.search(vectors[7], k=2)
+    assert matches[0][0] == 5 and abs(matches[0][1] - 1) < 1e-5
+    assert 7 not in [claim_id for claim_id, _ in matches]
+    assert len(reader) == 19
+
+
+def test_rebuild_is_picked_up_by_open_readers(tmp_path):
+    ClaimIndex.build(str(tmp_path), 'test-encoder', [1], random_claims(1))
+    reader = ClaimIndex(str(tmp_path))
+    assert not reader.is_stale()
+    ClaimIndex.build(str(tmp_path), 'test-encoder', [], np.zeros((0, 0)), dim=64)
+    assert reader.is_stale()
+    assert len(ClaimIndex(str(tmp_path))) == 0
+
+
+def test_appends_racing_a_rebuild_reach_the_new_index(tmp_path):
+    vectors = random_claims(4)
+    old = ClaimIndex.build(str(tmp_path), 'test-encoder', [1, 2], vectors[:2])
+    since = old.position()
+    # Appended while the rebuild embeds its snapshot of claims 1 and 2
+    old.append([3], vectors[[2]])
+    ClaimIndex.build(str(tmp_path), 'test-encoder', [1, 2], vectors[:2], since=since)
+    # Appended by a writer that still has the replaced file open
+    old.append([4], vectors[[3]])
+
+    rebuilt = ClaimIndex(str(tmp_path))
+    assert len(rebuilt) == 4
+    assert [matches[0][0] for matches in rebuilt.search(vectors[2:], k=1)] == [3, 4]
+
+
+def test_text_is_split_into_checkable_sentences():
+    text = 'Habari! The county has hired 10,000 new teachers this year. Fuel prices fell by half in May.'
+    assert split_claims(text) == [
+        'The county has hired 10,000 new teachers this year.', 'Fuel prices fell by half in May.'
+    ]
@@ -0,0 +1,60 @@
+import random
+import time
+
+from core.scrapers.dedup import MinHashLSH
+
+STORY = (
+    "Heavy rains have displaced hundreds of families in Nairobi's Mathare estate, "
+    "with the county government opening three evacuation centres on Tuesday night "
+    "as the Nairobi River burst its banks for the second time this week."
+)
+
+
+def test_edited_copy_is_a_duplicate_and_different_story_is_not():
+    index = MinHashLSH()
+    assert index.find_or_add('https://blog.example.com/floods', STORY) is None
+
+    repost = STORY.replace('Tuesday night', 'Tuesday night.') + ' #KenyaFloods https://t.co/abc'
+    match = index.find_or_add('https://twitter.com/status/1', repost)
+    assert match[0] == 'https://blog.example.com/floods'
+    assert match[1] >= index.threshold
+
+    other = "The Central Bank of Kenya held its benchmark lending rate at 13 percent on Wednesday."
+    assert index.find_or_add('https://reddit.com/r/Kenya/2', other) is None
+    assert len(index) == 2
+
+
+def test_same_key_is_not_its_own_duplicate():
+    index = MinHashLSH()
+    index.find_or_add('a', STORY)
+    assert index.find_or_add('a', STORY) is None
+
+
+def test_prune_drops_items_outside_the_window():
+    index = MinHashLSH()
+    index.find_or_add('old', STORY, timestamp=time.time() - 10 * 86400)
+    assert index.prune(max_age=7 * 86400) == 1
+    assert index.find_or_add('new', STORY) is None
+
+
+def test_round_trip_keeps_matches(tmp_path):
+    index = MinHashLSH(threshold=0.75)
+    index.find_or_add('https://blog.example.com/floods', STORY)
+    path = str(tmp_path / 'dedup.npz')
+    index.save(path)
+
+    restored = MinHashLSH.load(path)
+    assert restored.threshold == 0.75
+    assert restored.find_or_add('copy', STORY)[0] == 'https://blog.example.com/floods'
+    assert len(MinHashLSH.load(str(tmp_path / 'missing.npz'))) == 0
+
+
+def test_lookup_is_sub_millisecond():
+    words = STORY.split()
+    index = MinHashLSH()
+    index.extend((f'item-{i}', ' '.join(random.sample(words, len(words))), time.time()) for i in range(5000))
+    signature = index.signature(STORY)
+    started = time.perf_counter()
+    for _ in range(200):
+        index.query(signature)
+    assert (time.perf_counter() - started) / 200 < 0.001
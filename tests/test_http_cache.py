@@ -0,0 +1,52 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.scrapers.http_cache import DiskHTTPCache, freshness_lifetime, is_storable
+
+
+def test_freshness_follows_cache_control_then_expires():
+    assert freshness_lifetime({'Cache-Control': 'public, max-age=300'}) == 300
+    assert freshness_lifetime({'Cache-Control': 'no-cache, max-age=300'}) == 0
+    assert freshness_lifetime({'Expires': 'Thu, 01 Jan 1970 00:00:00 GMT'}) == 0
+    assert freshness_lifetime({}) == 0
+    assert not is_storable(200, {'Cache-Control': 'no-store'})
+    assert not is_storable(404, {})
+
+
+def test_entries_round_trip_and_expose_validators(tmp_path):
+    cache = DiskHTTPCache(str(tmp_path))
+    cache.set('https://blog.example.com/', b'<html>habari</html>', {
+        'ETag': '"abc"', 'Last-Modified': 'Wed, 01 May 2024 08:00:00 GMT',
+        'Cache-Control': 'max-age=60', 'Set-Cookie': 'session=1',
+    })
+
+    entry = cache.get('https://blog.example.com/')
+    assert entry.body == b'<html>habari</html>'
+    assert entry.is_fresh()
+    assert 'Set-Cookie' not in entry.headers
+    assert entry.validators() == {
+        'If-None-Match': '"abc"', 'If-Modified-Since': 'Wed, 01 May 2024 08:00:00 GMT',
+    }
+    assert not entry.is_fresh(now=time.time() + 61)
+    assert cache.get('https://blog.example.com/other') is None
+
+
+def test_touch_after_304_refreshes_lifetime_without_rewriting_body(tmp_path):
+    cache = DiskHTTPCache(str(tmp_path))
+    entry = cache.set('https://blog.example.com/', b'body', {'ETag': '"v1"', 'Cache-Control': 'no-cache'})
+    assert not entry.is_fresh()
+
+    cache.touch(entry, {'ETag': '"v1"', 'Cache-Control': 'max-age=120'})
+    entry = cache.get('https://blog.example.com/')
+    assert entry.is_fresh()
+    assert entry.body == b'body'
+
+
+def test_concurrent_writers_do_not_share_a_temporary_file(tmp_path):
+    cache = DiskHTTPCache(str(tmp_path))
+    bodies = [f'version {n}'.encode() * 1000 for n in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda body: cache.set('https://blog.example.com/', body, {'ETag': '"v"'}), bodies))
+
+    assert cache.get('https://blog.example.com/').body in bodies
+    assert not [path for path in tmp_path.rglob('*') if path.name.endswith('.part')]
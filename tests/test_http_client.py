@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from core.scrapers import http_client
+from core.scrapers.http_client import ScrapingClient
+
+
+class FakeResponse:
+    request_info = None
+    history = ()
+
+    def __init__(self, status, body=''):
+        self.status = status
+        self.reason = 'Service Unavailable' if status >= 500 else 'OK'
+        self.body = body
+
+    async def text(self, errors='strict'):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        return self.responses.pop(0)
+
+
+def robots_checks(*responses, url='https://blog.example.com/news/1', advance=0):
+    """Whether url may be fetched after each robots.txt response, advancing time in between."""
+    async def run():
+        client = ScrapingClient()
+        await client.close()
+        client.session = FakeSession(*responses)
+        state = client.host_state(url)
+        allowed = []
+        for _ in responses:
+            allowed.append((await client.robots_for(url, state)).can_fetch(http_client.USER_AGENT, url))
+            state.robots_expires_at -= advance
+        return allowed, client.session.requested
+
+    return asyncio.run(run())
+
+
+def test_unavailable_robots_txt_disallows_until_a_retry_succeeds():
+    allowed, requested = robots_checks(
+        FakeResponse(503), FakeResponse(200, 'User-agent: *\nDisallow: /private/'),
+        advance=http_client.ROBOTS_RETRY,
+    )
+    assert allowed == [False, True]
+    assert len(requested) == 2
+
+
+def test_missing_robots_txt_allows_everything_for_a_day():
+    allowed, requested = robots_checks(FakeResponse(404), FakeResponse(503), advance=http_client.ROBOTS_RETRY)
+    assert allowed == [True, True]
+    assert len(requested) == 1
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+from core.scrapers.concurrency import AsyncTokenBucket, ScraperThrottle, get_limits
+
+
+def test_token_bucket_allows_burst_then_paces():
+    async def take(bucket, n):
+        started = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    bucket = AsyncTokenBucket(rate=20, burst=3)
+    assert asyncio.run(take(bucket, 3)) < 0.05
+    # Three more tokens at 20/s take ~0.15s
+    assert asyncio.run(take(bucket, 3)) >= 0.1
+
+
+def test_paused_bucket_holds_callers_back():
+    async def run():
+        bucket = AsyncTokenBucket(rate=100, burst=5)
+        bucket.pause(0.2)
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.15
+
+
+def test_blocking_calls_from_several_scrapers_overlap():
+    def slow_request():
+        time.sleep(0.3)
+        return 'ok'
+
+    async def scrape(throttle):
+        return await throttle.run_blocking(slow_request)
+
+    async def run():
+        throttles = [ScraperThrottle(name) for name in ('twitter', 'facebook', 'reddit')]
+        started = time.monotonic()
+        results = await asyncio.gather(*[scrape(t) for t in throttles])
+        return results, time.monotonic() - started
+
+    results, elapsed = asyncio.run(run())
+    assert results == ['ok', 'ok', 'ok']
+    # Slowest source, not the sum of all three
+    assert elapsed < 0.6
+
+
+def test_limits_can_be_overridden_from_environment(monkeypatch):
+    monkeypatch.setenv('SCRAPER_REDDIT_CONCURRENCY', '3')
+    monkeypatch.setenv('SCRAPER_REDDIT_RATE', '0.25')
+    limits = get_limits('reddit')
+    assert limits.concurrency == 3
+    assert limits.rate == 0.25
+    assert get_limits('unknown-blog').concurrency > 0
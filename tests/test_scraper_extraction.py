@@ -0,0 +1,54 @@
+import asyncio
+import os
+
+from core.scrapers.extraction import compile_selectors, extract, extract_async
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'html')
+LISTING_CONFIG = {'article_selector': 'article.post', 'content_selector': '.content'}
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def test_configured_selectors_extract_complete_articles_with_absolute_links():
+    articles = extract(fixture('blog_listing.html'), LISTING_CONFIG, 'https://kilimo.example.com/latest')
+
+    assert [a['url'] for a in articles] == [
+        'https://kilimo.example.com/2024/05/02/tea-bonus',
+        'https://kilimo.example.com/2024/05/01/maize-planting',
+    ]
+    assert articles[0]['author'] == 'Wanjiru Kamau'
+    assert articles[0]['date'] == '2024-05-02T08:30:00+03:00'
+    # The sponsored entry has no content and is skipped
+    assert all('tractor' not in a['title'] for a in articles)
+
+
+def test_selectors_are_compiled_once_per_config():
+    assert compile_selectors(dict(LISTING_CONFIG)) is compile_selectors(dict(LISTING_CONFIG))
+    assert compile_selectors({}) is None
+
+
+def test_readability_fallback_finds_main_story_and_metadata():
+    [article] = extract(fixture('news_article.html'), {}, 'https://citydesk.example.com/')
+
+    assert article['title'] == 'Nairobi unveils new matatu routes to ease CBD congestion'
+    assert article['author'] == 'Achieng Odhiambo'
+    assert article['url'] == 'https://citydesk.example.com/transport/matatu-routes'
+    assert article['content'].startswith('Nairobi County has published')
+    assert 'Most read' not in article['content'] and 'Finally' not in article['content']
+
+
+def test_stale_or_invalid_selectors_fall_back_and_declared_encoding_is_honoured():
+    assert extract(fixture('news_article.html'), {'article_selector': '.gone'})[0]['author'] == 'Achieng Odhiambo'
+
+    [article] = extract(fixture('swahili_article.html'), {'article_selector': 'div[['}, 'https://pwani.example.com/')
+    assert article['author'] == 'José Mwakilema'
+    assert article['date'] == '2024-03-11'
+
+
+def test_extract_async_without_process_pool(monkeypatch):
+    monkeypatch.setenv('SCRAPER_PARSE_WORKERS', '0')
+    articles = asyncio.run(extract_async(fixture('blog_listing.html'), LISTING_CONFIG, 'https://kilimo.example.com/'))
+    assert len(articles) == 2
@@ -0,0 +1,25 @@
+import random
+
+from core.scrapers.scheduler import adaptive_interval, jittered, observe_rate
+
+
+def test_publish_rate_is_smoothed_and_needs_an_elapsed_window():
+    assert observe_rate(0.0, 12, elapsed_hours=None) == 0.0
+    # 12 items in 2 hours observed at 6/h, blended with the previous 1/h
+    assert observe_rate(1.0, 12, elapsed_hours=2, smoothing=0.5) == 3.5
+    assert observe_rate(4.0, 0, elapsed_hours=1, smoothing=0.25) == 3.0
+
+
+def test_interval_targets_items_per_run_within_bounds():
+    # 10 new items/hour and 5 wanted per run: every 30 minutes
+    assert adaptive_interval(10, 5, min_interval=60, max_interval=86400) == 1800
+    assert adaptive_interval(1000, 5, min_interval=900, max_interval=86400) == 900
+    assert adaptive_interval(0.01, 5, min_interval=900, max_interval=43200) == 43200
+    assert adaptive_interval(0, 5, min_interval=900, max_interval=43200) == 43200
+
+
+def test_jitter_stays_within_the_fraction():
+    rng = random.Random(7)
+    spread = [jittered(3600, 0.1, rng) for _ in range(200)]
+    assert all(3240 <= value <= 3960 for value in spread)
+    assert len(set(spread)) > 1
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+
+from core.scrapers.base import BaseScraper
+from core.scrapers.sinks import NDJSONSink, completed_segments, prune_segments, read_segment, tail, tail_segments
+
+
+class ListScraper(BaseScraper):
+    def __init__(self, items):
+        super().__init__('list')
+        self.items = items
+
+    async def scrape(self):
+        return self.items
+
+    async def clean_data(self, data):
+        return {'title': data['text'].title(), 'published_date': data['date']}
+
+    async def validate_data(self, data):
+        return bool(data['text'])
+
+
+def test_sink_rotates_and_only_publishes_complete_segments(tmp_path):
+    sink = NDJSONSink(str(tmp_path), 'scraped', max_items=2)
+    for i in range(5):
+        sink.write({'n': i, 'at': datetime(2024, 1, 1)})
+
+    # Two full segments published, the fifth item still in an open .part file
+    assert len(completed_segments(str(tmp_path), 'scraped')) == 2
+    assert any(name.endswith('.part') for name in os.listdir(tmp_path))
+
+    sink.close()
+    segments = completed_segments(str(tmp_path), 'scraped')
+    assert len(segments) == 3
+    items = [item for path in segments for item in read_segment(path)]
+    assert [item['n'] for item in items] == [0, 1, 2, 3, 4]
+    assert items[0]['at'] == '2024-01-01T00:00:00'
+
+
+def test_gzip_segments_round_trip(tmp_path):
+    with NDJSONSink(str(tmp_path), 'scraped', compression='gzip') as sink:
+        sink.write({'title': 'Habari'})
+    [segment] = completed_segments(str(tmp_path), 'scraped')
+    assert segment.endswith('.ndjson.gz')
+    assert list(read_segment(segment)) == [{'title': 'Habari'}]
+
+
+def test_tail_resumes_after_last_finished_segment(tmp_path):
+    directory = str(tmp_path)
+    sink = NDJSONSink(directory, 'scraped', max_items=1)
+    sink.write({'n': 1})
+    sink.write({'n': 2})
+
+    assert [item['n'] for item in tail(directory, 'scraped', consumer='ingest')] == [1, 2]
+    assert list(tail(directory, 'scraped', consumer='ingest')) == []
+
+    sink.write({'n': 3})
+    assert [item['n'] for item in tail(directory, 'scraped', consumer='ingest')] == [3]
+    # Consumers keep independent checkpoints
+    assert len(list(tail(directory, 'scraped', consumer='ai'))) == 3
+
+
+def test_stream_yields_validated_cleaned_items():
+    scraper = ListScraper([{'text': 'kenya news', 'date': '2024-01-01'}, {'text': '', 'date': None}])
+    items = asyncio.run(scraper.process())
+    assert items == [{'title': 'Kenya News', 'published_date': '2024-01-01'}]
+    assert scraper.last_scraped is not None
+
+
+def test_tail_reads_segments_published_out_of_name_order(tmp_path):
+    directory = str(tmp_path)
+    with NDJSONSink(directory, 'scraped') as late_writer:
+        late_writer.write({'n': 1})
+    assert [item['n'] for item in tail(directory, 'scraped', consumer='ingest')] == [1]
+
+    # Another writer publishes a segment whose name sorts before the finished one
+    (tmp_path / 'scraped-20000101T000000-9-000001.ndjson').write_text('{"n": 0}\n')
+    assert [item['n'] for item in tail(directory, 'scraped', consumer='ingest')] == [0]
+    assert list(tail(directory, 'scraped', consumer='ingest')) == []
+
+
+def test_sinks_in_one_process_never_share_segment_names(tmp_path):
+    for n in range(3):
+        with NDJSONSink(str(tmp_path), 'scraped') as sink:
+            sink.write({'n': n})
+    assert len(completed_segments(str(tmp_path), 'scraped')) == 3
+
+
+def test_segments_are_pruned_once_every_consumer_finished_them(tmp_path):
+    directory = str(tmp_path)
+    sink = NDJSONSink(directory, 'scraped', max_items=1)
+    for n in range(3):
+        sink.write({'n': n})
+    list(tail(directory, 'scraped', consumer='ingest'))
+    assert prune_segments(directory, 'scraped', ['ingest', 'sentiment']) == 0
+
+    # The first segment is checkpointed when the consumer asks for the next
+    segments = tail_segments(directory, 'scraped', consumer='sentiment')
+    list(next(segments))
+    next(segments)
+    assert prune_segments(directory, 'scraped', ['ingest', 'sentiment']) == 1
+    assert len(completed_segments(directory, 'scraped')) == 2
+
+    # Segments past the maximum age go whether or not they were read
+    old = time.time() - 3600
+    for path in completed_segments(directory, 'scraped'):
+        os.utime(path, (old, old))
+    assert prune_segments(directory, 'scraped', ['ingest', 'sentiment'], max_age=60) == 2
+    assert completed_segments(directory, 'scraped') == []
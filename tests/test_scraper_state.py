@@ -0,0 +1,13 @@
+from core.scrapers.state import JSONFileStateStore
+
+
+def test_file_store_round_trips_cursors_per_scraper(tmp_path):
+    store = JSONFileStateStore(str(tmp_path / 'state' / 'scraper_state.json'))
+    assert store.get('twitter') == {}
+
+    store.set('twitter', {'since_id': '1790000000000000000'})
+    store.set('telegram', {'channels': {'KenyaUpdates': 4521}})
+
+    reopened = JSONFileStateStore(str(tmp_path / 'state' / 'scraper_state.json'))
+    assert reopened.get('twitter') == {'since_id': '1790000000000000000'}
+    assert reopened.get('telegram')['channels']['KenyaUpdates'] == 4521
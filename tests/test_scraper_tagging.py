@@ -0,0 +1,17 @@
+from core.scrapers.tagging import find_county, tag_item
+
+
+def test_the_most_named_county_wins_and_spelling_variants_count():
+    assert find_county('Muranga farmers met Nairobi buyers; prices in Murang\'a fell') == "Murang'a"
+    assert find_county('From Uasin-Gishu to elgeyo marakwet') == 'Uasin Gishu'
+    # Not a county: part of a longer word
+    assert find_county('Ameru heritage') is None
+
+
+def test_items_get_county_and_topics_unless_the_scraper_set_them():
+    tagged = tag_item({'title': 'ignored', 'content': 'Mafuriko Kisumu: barabara zimefungwa'})
+    assert (tagged['county'], tagged['topics']) == ('Kisumu', ['transport', 'weather'])
+
+    kept = tag_item({'content': 'Mombasa traffic', 'county': 'Kilifi', 'categories': ['Business']})
+    assert (kept['county'], kept.get('topics')) == ('Kilifi', None)
+    assert 'county' not in tag_item({'content': 'No place named here'})
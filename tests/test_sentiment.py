@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from core.ai.sentiment import Rollup, aggregate, engagement_weights, merge, polarity, rollup, score
+
+
+class FakePipeline:
+    """Positive if the text mentions 'good', negative for 'bad', else neutral."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts, **kwargs):
+        self.batches.append(len(texts))
+        return [self.labels(text) for text in texts]
+
+    @staticmethod
+    def labels(text):
+        positive = 0.9 if 'good' in text else 0.05
+        negative = 0.9 if 'bad' in text else 0.05
+        return [
+            {'label': 'positive', 'score': positive},
+            {'label': 'negative', 'score': negative},
+            {'label': 'neutral', 'score': 1 - positive - negative},
+        ]
+
+
+def test_polarity_is_positive_minus_negative_probability():
+    assert abs(polarity(FakePipeline.labels('good')) - 0.85) < 1e-9
+    assert abs(polarity([{'label': 'LABEL_0', 'score': 0.7}, {'label': 'LABEL_2', 'score': 0.3}]) + 0.4) < 1e-9
+
+
+def test_scores_come_back_in_input_order_from_batches():
+    pipe = FakePipeline()
+    scores = score(['good news', 'bad roads', 'a long neutral report', 'good'], batch_size=3, pipe=pipe, cache=None)
+
+    np.testing.assert_allclose(scores, [0.85, -0.85, 0, 0.85], atol=1e-6)
+    assert pipe.batches == [3, 1]
+
+
+def test_engagement_weights_grow_with_log_of_weighted_engagement():
+    weights = engagement_weights([None, {'likes': 10, 'retweets': 0}, {'shares': 1000, 'views': 'n/a'}])
+
+    np.testing.assert_allclose(weights, [1, 1 + np.log1p(10), 1 + np.log1p(3000)])
+
+
+def test_aggregate_sums_per_hour_county_and_topic():
+    hour = 1_700_000_000 // 3600 * 3600
+    times = np.array([hour + 5, hour + 3599, hour + 3600, hour + 10])
+    rollups = aggregate(
+        times, ['Nairobi', 'Nairobi', 'Nairobi', 'Mombasa'], ['', '', '', ''],
+        np.array([0.5, -0.5, 1.0, 0.0]), np.array([1.0, 3.0, 1.0, 2.0]),
+    )
+
+    by_key = {(r.bucket.timestamp(), r.county): r for r in rollups}
+    assert len(rollups) == 3
+    first = by_key[(hour, 'Nairobi')]
+    assert (first.item_count, first.positive_count, first.negative_count) == (2, 1, 1)
+    assert first.score_sum == 0
+    assert first.weighted_score_sum == 0.5 - 1.5
+    assert first.weight_sum == 4
+    assert by_key[(hour + 3600, 'Nairobi')].item_count == 1
+    assert by_key[(hour, 'Mombasa')].weighted_score_sum == 0
+
+
+def test_rollup_counts_items_once_for_all_topics_and_once_per_topic():
+    items = [
+        {'content': 'good', 'county': 'Kisumu', 'published_date': '2024-05-01T10:15:00', 'categories': ['Politics', 'Health']},
+        {'content': 'bad', 'county': 'Kisumu', 'published_date': '2024-05-01T10:45:00+00:00', 'topic': 'politics'},
+    ]
+    rollups = rollup(items, np.array([0.8, -0.6]))
+
+    bucket = datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+    by_topic = {r.topic: r for r in rollups}
+    assert {r.bucket for r in rollups} == {bucket}
+    assert set(by_topic) == {'', 'health', 'politics'}
+    assert by_topic[''].item_count == 2
+    assert by_topic['politics'].item_count == 2
+    assert by_topic['health'].item_count == 1
+    assert abs(by_topic['politics'].score_sum - 0.2) < 1e-9
+
+
+def test_merge_adds_rollups_with_the_same_key():
+    bucket = datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+    merged = merge([
+        Rollup(bucket, 'Nakuru', '', 2, 1.0, 2.0, 3.0, 1, 0),
+        Rollup(bucket, 'Nakuru', 'sports', 1, 0.5, 0.5, 1.0, 1, 0),
+        Rollup(bucket, 'Nakuru', '', 1, -1.0, -1.0, 1.0, 0, 1),
+    ])
+
+    assert merged == [
+        Rollup(bucket, 'Nakuru', '', 3, 0.0, 1.0, 4.0, 1, 1),
+        Rollup(bucket, 'Nakuru', 'sports', 1, 0.5, 0.5, 1.0, 1, 0),
+    ]
@@ -0,0 +1,34 @@
+from core.ai.summarizer import MIN_WORDS, length_buckets, summarize
+
+
+class FakePipeline:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts, **kwargs):
+        self.batches.append([len(text.split()) for text in texts])
+        return [{'summary_text': f' summary of {len(text.split())} words '} for text in texts]
+
+
+def text(words):
+    return ' '.join(['habari'] * words)
+
+
+def test_buckets_group_similar_lengths_longest_first():
+    assert length_buckets([5, 900, 60, 880, 70], batch_size=2) == [[1, 3], [4, 2], [0]]
+
+
+def test_summaries_come_back_in_input_order_from_padded_minimal_batches():
+    pipe = FakePipeline()
+    lengths = [900, 80, 870, 95, 400, 410]
+    summaries = summarize([text(n) for n in lengths], batch_size=2, pipe=pipe, cache=None)
+
+    assert summaries == [f'summary of {n} words' for n in lengths]
+    assert pipe.batches == [[900, 870], [410, 400], [95, 80]]
+
+
+def test_short_texts_are_not_sent_to_the_model():
+    pipe = FakePipeline()
+    short = 'Maji yamerudi Kibera leo asubuhi.'
+    assert summarize([short, text(MIN_WORDS)], pipe=pipe, cache=None) == [short, f'summary of {MIN_WORDS} words']
+    assert pipe.batches == [[MIN_WORDS]]